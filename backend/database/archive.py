@@ -0,0 +1,381 @@
+"""
+Raw response archive for the Rotowire scrapers, and rebuilding databases from it
+
+Fixing a parser or adding a column used to mean scraping rotowire.com again.
+With ROTOWIRE_ARCHIVE_DIR set (or enable() called), every session the scrapers
+get from new_session() records each response it receives: the body is gzipped
+under objects/ by its SHA-256 (identical bodies, like the empty box scores of
+teams that did not play, are stored once) and index.db keeps the request key
+(method, URL and sorted query params), status, headers and fetch time.
+
+`reparse` replays the archive through the scrapers' own parsing and saving code:
+new_session() then returns sessions whose transport answers from the archive
+(latest fetch per key, redirects included), so the rebuilt databases match what
+a scrape would have written, at local disk speed.
+
+Usage:
+    python ingest.py --archive rotowire_archive boxscores --start 2879653 --end 2879553
+    ROTOWIRE_ARCHIVE_DIR=rotowire_archive python players.py
+    python archive.py stats --archive rotowire_archive
+    python archive.py reparse --archive rotowire_archive --out rebuilt
+"""
+import argparse
+import atexit
+import gzip
+import hashlib
+import http.client
+import io
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from storage import SQLiteWriter, insert_sql
+
+# Archive every scraper response here when set
+ROTOWIRE_ARCHIVE_DIR = os.environ.get('ROTOWIRE_ARCHIVE_DIR')
+
+RESPONSE_COLUMNS = ['request_key', 'method', 'url', 'params', 'status', 'headers', 'content_sha256',
+                    'content_length', 'fetched_at']
+RESPONSE_INSERT = insert_sql('responses', RESPONSE_COLUMNS)
+# The stored body is already decoded, so these would describe the wrong bytes on replay
+DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'set-cookie', 'connection'}
+
+DATABASES = ['games', 'team_stats', 'player_stats', 'nba_standings']
+
+
+def request_key(method: str, url: str) -> Tuple[str, str, List]:
+    """(key, URL without query, sorted params) for a request; the key ignores query param order"""
+    parts = urlsplit(url)
+    params = sorted(parse_qsl(parts.query, keep_blank_values=True))
+    base = urlunsplit((parts.scheme, parts.netloc, parts.path, '', ''))
+    return f"{method.upper()} {base}?{urlencode(params)}", base, params
+
+
+class ResponseArchive:
+    """Content-addressed store of raw responses with an SQLite index (thread-safe)"""
+
+    def __init__(self, root: str):
+        self.root = root
+        self.objects = os.path.join(root, 'objects')
+        os.makedirs(self.objects, exist_ok=True)
+        self.writer = SQLiteWriter(os.path.join(root, 'index.db'))
+        self.writer.execute('''
+        CREATE TABLE IF NOT EXISTS responses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            request_key TEXT NOT NULL,
+            method TEXT,
+            url TEXT,
+            params TEXT,
+            status INTEGER,
+            headers TEXT,
+            content_sha256 TEXT,
+            content_length INTEGER,
+            fetched_at DATETIME
+        )
+        ''')
+        self.writer.execute('CREATE INDEX IF NOT EXISTS idx_responses_key ON responses (request_key, id)')
+        self.writer.execute('CREATE INDEX IF NOT EXISTS idx_responses_url ON responses (url, id)')
+        self._lock = threading.Lock()
+        self.closed = False
+        self.stored = 0
+        self.deduplicated = 0
+        atexit.register(self.close)
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects, digest[:2], f"{digest}.gz")
+
+    def put(self, method: str, url: str, status: int, headers: Dict[str, str], content: bytes):
+        """Archive one response body with its request key and fetch time"""
+        digest = hashlib.sha256(content).hexdigest()
+        path = self._object_path(digest)
+        existed = os.path.exists(path)
+        if not existed:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temporary = f"{path}.{threading.get_ident()}.tmp"
+            with gzip.open(temporary, 'wb') as f:
+                f.write(content)
+            os.replace(temporary, path)
+        key, base, params = request_key(method, url)
+        kept = {name: value for name, value in headers.items() if name.lower() not in DROPPED_HEADERS}
+        self.writer.write_one(RESPONSE_INSERT, (key, method.upper(), base, json.dumps(params), status,
+                                                json.dumps(kept), digest, len(content), datetime.now()))
+        with self._lock:
+            self.stored += 1
+            self.deduplicated += existed
+
+    def record(self, response: requests.Response, *args, **kwargs):
+        """requests response hook: archive the response and hand it on unchanged"""
+        try:
+            self.put(response.request.method, response.url, response.status_code,
+                     dict(response.headers), response.content)
+        except Exception as e:
+            print(f"Could not archive {response.url}: {e}")
+
+    def get(self, method: str, url: str) -> Optional[Tuple[int, Dict[str, str], bytes]]:
+        """(status, headers, body) of the latest archived response for a request, or None"""
+        rows = self.writer.query('SELECT status, headers, content_sha256 FROM responses '
+                                 'WHERE request_key = ? ORDER BY id DESC LIMIT 1', (request_key(method, url)[0],))
+        if not rows:
+            return None
+        status, headers, digest = rows[0]
+        with gzip.open(self._object_path(digest), 'rb') as f:
+            return status, json.loads(headers), f.read()
+
+    def archived_params(self, url: str) -> List[Dict[str, str]]:
+        """Query params of every distinct successful GET archived for `url` (no query), first fetch first"""
+        rows = self.writer.query("SELECT params FROM responses WHERE url = ? AND method = 'GET' AND status = 200 "
+                                 "GROUP BY params ORDER BY MIN(id)", (url,))
+        return [dict(json.loads(params)) for params, in rows]
+
+    def stats(self) -> Dict[str, int]:
+        """Response, key and object counts with raw and compressed sizes"""
+        responses, keys, raw_bytes = self.writer.query(
+            'SELECT COUNT(*), COUNT(DISTINCT request_key), COALESCE(SUM(content_length), 0) FROM responses')[0]
+        objects = stored_bytes = 0
+        for directory, _, files in os.walk(self.objects):
+            for name in files:
+                if name.endswith('.gz'):
+                    objects += 1
+                    stored_bytes += os.path.getsize(os.path.join(directory, name))
+        return {'responses': responses, 'request_keys': keys, 'objects': objects,
+                'raw_bytes': raw_bytes, 'stored_bytes': stored_bytes}
+
+    def close(self):
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+        self.writer.close()
+
+
+class ReplayAdapter(HTTPAdapter):
+    """Transport that answers from a ResponseArchive; requests it never saw get a 404"""
+
+    def __init__(self, archive: ResponseArchive):
+        super().__init__()
+        self.archive = archive
+        self.misses = 0
+
+    def send(self, request, **kwargs) -> requests.Response:
+        archived = self.archive.get(request.method, request.url)
+        if archived is None:
+            self.misses += 1
+            status, headers, content = 404, {}, b''
+        else:
+            status, headers, content = archived
+        response = requests.Response()
+        response.status_code = status
+        response.reason = 'Not in archive' if archived is None else http.client.responses.get(status, '')
+        response.headers = CaseInsensitiveDict(headers)
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = content
+        response.raw = io.BytesIO(content)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        return response
+
+
+# ========== SESSIONS ==========
+
+_recording: Optional[ResponseArchive] = None
+_replaying: Optional[ReplayAdapter] = None
+_sessions_lock = threading.Lock()
+
+
+def enable(root: str) -> ResponseArchive:
+    """Archive the responses of every session new_session() hands out from now on"""
+    global _recording
+    with _sessions_lock:
+        if _recording is None or _recording.root != root:
+            _recording = ResponseArchive(root)
+        return _recording
+
+
+def replay(archive: ResponseArchive) -> ReplayAdapter:
+    """Serve every session new_session() hands out from now on from `archive` instead of the network"""
+    global _replaying
+    _replaying = ReplayAdapter(archive)
+    return _replaying
+
+
+def recording_archive() -> Optional[ResponseArchive]:
+    """The archive responses are recorded into (ROTOWIRE_ARCHIVE_DIR / enable), None when not archiving or replaying"""
+    if _replaying is not None:
+        return None
+    return _recording or (enable(ROTOWIRE_ARCHIVE_DIR) if ROTOWIRE_ARCHIVE_DIR else None)
+
+
+def replaying_archive() -> Optional[ResponseArchive]:
+    """The archive requests are answered from during a reparse, else None"""
+    return _replaying.archive if _replaying is not None else None
+
+
+def new_session(headers: Optional[Dict[str, str]] = None) -> requests.Session:
+    """A requests session for a scraper: replaying, archiving (ROTOWIRE_ARCHIVE_DIR / enable) or plain"""
+    session = requests.Session()
+    if headers:
+        session.headers.update(headers)
+    if _replaying is not None:
+        session.mount('http://', _replaying)
+        session.mount('https://', _replaying)
+    else:
+        archive = recording_archive()
+        if archive is not None:
+            session.hooks['response'].append(archive.record)
+    return session
+
+
+# ========== REPARSE ==========
+
+def reparse_games(archive: ResponseArchive, db_path: str) -> Dict[str, int]:
+    """games.db: archived team schedules, then every archived box score with its date, then player ratings"""
+    from team_schedule import RotowireScraper
+
+    scraper = RotowireScraper(db_name=db_path)
+    schedule = []
+    for params in archive.archived_params(scraper.schedule_url):
+        schedule.extend(scraper.scrape_team_schedule(params['team']))
+    if schedule:
+        scraper.save_team_schedule(schedule)
+
+    # The teams requested for each game, in the order they were requested
+    game_teams: Dict[int, List[int]] = {}
+    for params in archive.archived_params(scraper.base_url):
+        game_teams.setdefault(int(params['gameGlobalID']), []).append(int(params['teamGlobalID']))
+
+    counts = {'schedule_rows': len(schedule), 'games': 0, 'players': 0, 'team_totals': 0}
+    for game_id in sorted(game_teams, reverse=True):
+        fetched = [(team_id, team_data) for team_id in game_teams[game_id]
+                   for team_data in [scraper.fetch_team(game_id, team_id)] if team_data]
+        if not fetched:
+            continue
+        scraper.game_teams.record(game_id, [team_id for team_id, _ in fetched], source='archive')
+        found = scraper.parse_game(game_id, fetched)
+        players_saved, teams_saved = scraper.save_game(game_id, found, scraper.game_dates.get(game_id))
+        counts['games'] += 1
+        counts['players'] += players_saved
+        counts['team_totals'] += teams_saved
+    if counts['players']:
+        scraper.calculate_player_ratings()
+    scraper.writer.close()
+    return counts
+
+
+def reparse_team_stats(archive: ResponseArchive, db_path: str) -> Dict[str, int]:
+    """team_stats.db: every archived team roster"""
+    from teams import TeamRosterScraper
+
+    scraper = TeamRosterScraper(db_name=db_path)
+    teams = [params['team'] for params in archive.archived_params(scraper.base_url)]
+    for team_code in teams:
+        scraper.scrape_team_roster(team_code)
+    scraper.writer.close()
+    return {'teams': len(teams)}
+
+
+def reparse_player_stats(archive: ResponseArchive, db_path: str) -> Dict[str, int]:
+    """player_stats.db: every archived player page, then names for players whose name pages were archived"""
+    from player_names import PlayerNameScraper
+    from players import PlayerStatsScraper
+
+    scraper = PlayerStatsScraper(db_name=db_path)
+    player_ids = sorted({int(params['id']) for params in archive.archived_params(scraper.base_url)})
+    for player_id in player_ids:
+        scraper.scrape_player_by_id(player_id)
+    scraper.writer.close()
+
+    names = PlayerNameScraper(db_name=db_path)
+    named = 0
+    if archive.writer.query('SELECT 1 FROM responses WHERE url LIKE ? LIMIT 1', (f"{names.base_url}%",)):
+        named = names.scrape_names_for_range(min(player_ids), max(player_ids), delay=0)[0] if player_ids else 0
+    names.writer.close()
+    return {'players': len(player_ids), 'names': named}
+
+
+def reparse_nba_standings(archive: ResponseArchive, db_path: str) -> Dict[str, int]:
+    """nba_standings.db: every archived season"""
+    from nba_standings import RotowireStandingsScraper
+
+    scraper = RotowireStandingsScraper(db_name=db_path)
+    seasons = [int(params['season']) for params in archive.archived_params(scraper.base_url)]
+    for season in seasons:
+        scraper.run_scraper(season=season, export_csv=False)
+    return {'seasons': len(seasons)}
+
+
+REPARSERS = {
+    'games': reparse_games,
+    'team_stats': reparse_team_stats,
+    'player_stats': reparse_player_stats,
+    'nba_standings': reparse_nba_standings,
+}
+
+
+def reparse(archive: ResponseArchive, out_dir: str, databases: List[str] = DATABASES,
+            overwrite: bool = False) -> Dict[str, Dict[str, int]]:
+    """Rebuild `databases` in out_dir from the archive; nothing is requested from the network"""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = {name: os.path.join(out_dir, f"{name}.db") for name in databases}
+    existing = [path for path in paths.values() if os.path.exists(path)]
+    if existing and not overwrite:
+        raise FileExistsError(f"Refusing to replace {', '.join(existing)} (pass overwrite=True / --overwrite)")
+    for path in existing:
+        for suffix in ('', '-wal', '-shm'):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    adapter = replay(archive)
+    results = {}
+    for name in databases:
+        started = time.time()
+        print(f"\n=== REPARSING {name}.db ===")
+        results[name] = REPARSERS[name](archive, paths[name])
+        results[name]['seconds'] = round(time.time() - started, 2)
+    results['archive_misses'] = {'requests': adapter.misses}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect the raw Rotowire response archive or rebuild databases from it')
+    commands = parser.add_subparsers(dest='command', required=True)
+    stats = commands.add_parser('stats', help='Counts and sizes of the archive')
+    stats.add_argument('--archive', default=ROTOWIRE_ARCHIVE_DIR, required=ROTOWIRE_ARCHIVE_DIR is None)
+    rebuild = commands.add_parser('reparse', help='Rebuild databases from archived responses')
+    rebuild.add_argument('--archive', default=ROTOWIRE_ARCHIVE_DIR, required=ROTOWIRE_ARCHIVE_DIR is None)
+    rebuild.add_argument('--out', required=True, help='Directory for the rebuilt .db files')
+    rebuild.add_argument('--only', nargs='+', choices=DATABASES, default=DATABASES)
+    rebuild.add_argument('--overwrite', action='store_true', help='Replace databases already in --out')
+    args = parser.parse_args()
+
+    if not os.path.isdir(os.path.join(args.archive, 'objects')):
+        sys.exit(f"No archive at {args.archive}")
+    archive = ResponseArchive(args.archive)
+    if args.command == 'stats':
+        counts = archive.stats()
+        ratio = counts['raw_bytes'] / counts['stored_bytes'] if counts['stored_bytes'] else 0
+        print(f"{counts['responses']} responses for {counts['request_keys']} requests in {counts['objects']} objects: "
+              f"{counts['raw_bytes']:,} bytes raw, {counts['stored_bytes']:,} stored ({ratio:.1f}x)")
+        return
+
+    try:
+        results = reparse(archive, args.out, args.only, overwrite=args.overwrite)
+    except FileExistsError as e:
+        sys.exit(str(e))
+    print("\n=== REPARSE SUMMARY ===")
+    for name, counts in results.items():
+        print(f"{name}: {', '.join(f'{key} {value}' for key, value in counts.items())}")
+
+
+if __name__ == "__main__":
+    main()
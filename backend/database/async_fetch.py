@@ -0,0 +1,288 @@
+"""
+asyncio fetch backend for the Rotowire scrapers
+
+The scrapers send blocking requests calls one at a time (or one per thread
+with workers > 1). A scraper built with fetch_backend='async' (or run with
+ROTOWIRE_FETCH_BACKEND=async) fetches through an AsyncFetcher instead in
+scrape_games_range, scrape_player_range, scrape_all_teams and
+scrape_all_team_schedules. Each of those runs one aiohttp session with pooled
+keep-alive connections. Every request shares one requests-per-second cap and
+has its own timeout. Connection errors, timeouts, 429 and 5xx are retried
+with jittered exponential backoff. Parsing and saving stay the scrapers' own
+code, run in order once the fetches are done.
+
+Responses go through the raw response archive like the requests sessions do
+(see archive.py): recorded while archiving, answered from it while replaying.
+
+Usage:
+    ROTOWIRE_FETCH_BACKEND=async python teams.py
+    python async_fetch.py --requests 200 --latency 0.2   # requests vs async against a local stand-in
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+from urllib.parse import urljoin
+
+import aiohttp
+import requests
+
+from archive import recording_archive, replaying_archive
+
+FETCH_BACKENDS = ('requests', 'async')
+ROTOWIRE_FETCH_BACKEND = os.environ.get('ROTOWIRE_FETCH_BACKEND', 'requests')
+# Same politeness budget as the threaded scrapers (games.py)
+ROTOWIRE_REQUESTS_PER_SECOND = float(os.environ.get('ROTOWIRE_REQUESTS_PER_SECOND', '4'))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# aiohttp negotiates its own content encoding and connection reuse
+SKIPPED_HEADERS = {'accept-encoding', 'connection', 'te'}
+MAX_REDIRECTS = 10
+
+
+class FetchResult:
+    """A fetched response: final status, URL, headers and body"""
+
+    __slots__ = ('status', 'url', 'headers', 'body')
+
+    def __init__(self, status: int, url: str, headers: Dict[str, str], body: bytes):
+        self.status = status
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+    def json(self) -> Any:
+        return json.loads(self.body)
+
+
+class AsyncRateLimit:
+    """Requests-per-second cap shared by every coroutine on one event loop"""
+
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = 0.0
+
+    async def wait(self):
+        """Sleep until this caller's request slot comes up; slots are `interval` apart"""
+        now = time.monotonic()
+        slot = max(now, self._next_slot)
+        self._next_slot = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncFetcher:
+    """Pooled aiohttp GETs with a global rate cap, per-request timeouts and jittered retries"""
+
+    def __init__(self, headers: Optional[Dict[str, str]] = None,
+                 requests_per_second: float = ROTOWIRE_REQUESTS_PER_SECOND, concurrency: int = 8,
+                 timeout: float = 30.0, retries: int = 3, backoff: float = 0.5):
+        """
+        Args:
+            headers: Sent with every request (hop-by-hop and encoding headers are left to aiohttp)
+            requests_per_second: Cap over all requests in flight, retries included
+            concurrency: Open connections (and fetch coroutines) at most
+            timeout: Seconds per request attempt, connect to last byte
+            retries: Attempts after the first for errors, timeouts, 429 and 5xx
+            backoff: First retry delay in seconds; doubles per attempt, jittered by +-50%
+        """
+        self.headers = {name: value for name, value in (headers or {}).items()
+                        if name.lower() not in SKIPPED_HEADERS}
+        self.requests_per_second = requests_per_second
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.stats = {'requests': 0, 'retries': 0, 'failures': 0, 'seconds': 0.0}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._rate_limit: Optional[AsyncRateLimit] = None
+
+    # ========== RUNNING ==========
+
+    def map(self, fetch_one: Callable[[Any], Awaitable], items: Iterable) -> List:
+        """
+        Await fetch_one(item) for every item, at most `concurrency` at once, on one
+        pooled session; results come back in item order (None where fetch_one raised)
+        """
+        items = list(items)
+        if not items:
+            return []
+        started = time.time()
+        try:
+            return asyncio.run(self._map(fetch_one, items))
+        finally:
+            self.stats['seconds'] += time.time() - started
+
+    async def _map(self, fetch_one, items: List) -> List:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(item):
+            async with semaphore:
+                try:
+                    return await fetch_one(item)
+                except Exception as e:
+                    print(f"Error fetching {item}: {e}")
+                    return None
+
+        self._rate_limit = AsyncRateLimit(self.requests_per_second)
+        connector = aiohttp.TCPConnector(limit=self.concurrency, keepalive_timeout=30)
+        async with aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                         timeout=aiohttp.ClientTimeout(total=self.timeout)) as session:
+            self._session = session
+            try:
+                return await asyncio.gather(*(bounded(item) for item in items))
+            finally:
+                self._session = None
+
+    # ========== REQUESTS ==========
+
+    async def get(self, url: str, params: Optional[Dict] = None) -> Optional[FetchResult]:
+        """
+        GET `url` (redirects followed) inside map(); the last response when retries
+        run out on 429/5xx, None when every attempt raised or timed out
+        """
+        archive = replaying_archive()
+        if archive is not None:
+            self.stats['requests'] += 1
+            return self._replay(archive, url, params)
+
+        result = error = None
+        for attempt in range(self.retries + 1):
+            await self._rate_limit.wait()
+            self.stats['requests'] += 1
+            try:
+                async with self._session.get(url, params=params) as response:
+                    result = FetchResult(response.status, str(response.url), dict(response.headers),
+                                         await response.read())
+                    self._archive(response, result)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result, error = None, repr(e)
+            else:
+                if result.status not in RETRY_STATUSES:
+                    return result
+                error = f"HTTP {result.status}"
+            if attempt < self.retries:
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._backoff_delay(attempt, result))
+        self.stats['failures'] += 1
+        print(f"Giving up on {url} {params or ''} after {self.retries + 1} attempts: {error}")
+        return result
+
+    def _backoff_delay(self, attempt: int, result: Optional[FetchResult]) -> float:
+        delay = self.backoff * 2 ** attempt * random.uniform(0.5, 1.5)
+        retry_after = (result.headers.get('Retry-After', '') if result else '').strip()
+        if result and result.status == 429 and retry_after.isdigit():
+            delay = max(delay, float(retry_after))
+        return delay
+
+    def _archive(self, response: aiohttp.ClientResponse, result: FetchResult):
+        """Record every hop of a response in the raw response archive, when one is enabled"""
+        archive = recording_archive()
+        if archive is None:
+            return
+        try:
+            for hop in response.history:
+                archive.put('GET', str(hop.url), hop.status, dict(hop.headers), b'')
+            archive.put('GET', result.url, result.status, result.headers, result.body)
+        except Exception as e:
+            print(f"Could not archive {result.url}: {e}")
+
+    @staticmethod
+    def _replay(archive, url: str, params: Optional[Dict]) -> FetchResult:
+        """The archived response for a request, following archived redirects; 404 when it was never fetched"""
+        current = requests.Request('GET', url, params=params).prepare().url
+        for _ in range(MAX_REDIRECTS):
+            archived = archive.get('GET', current)
+            if archived is None:
+                return FetchResult(404, current, {}, b'')
+            status, headers, body = archived
+            location = next((value for name, value in headers.items() if name.lower() == 'location'), None)
+            if status not in REDIRECT_STATUSES or not location:
+                return FetchResult(status, current, headers, body)
+            current = urljoin(current, location)
+        return FetchResult(310, current, {}, b'')
+
+    def summary(self) -> Dict:
+        seconds = self.stats['seconds']
+        return {**self.stats, 'seconds': round(seconds, 2),
+                'requests_per_second': round(self.stats['requests'] / seconds, 1) if seconds else None}
+
+
+def async_fetcher(backend: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> Optional[AsyncFetcher]:
+    """An AsyncFetcher for backend 'async', None for 'requests' (the scraper keeps its session)"""
+    if backend not in FETCH_BACKENDS:
+        raise ValueError(f"Unknown fetch backend {backend!r}; expected one of {', '.join(FETCH_BACKENDS)}")
+    return AsyncFetcher(headers, **kwargs) if backend == 'async' else None
+
+
+# ========== BENCHMARK ==========
+
+def _stand_in(latency: float, flaky_every: int) -> ThreadingHTTPServer:
+    """Local JSON endpoint answering after `latency`; every flaky_every-th request gets a 503"""
+    counter = {'requests': 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            with lock:
+                counter['requests'] += 1
+                flaky = flaky_every and counter['requests'] % flaky_every == 0
+            time.sleep(latency)
+            body = json.dumps({'path': self.path}).encode()
+            self.send_response(503 if flaky else 200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare sequential requests with the async fetch backend')
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.2, help='Stand-in response time in seconds')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests-per-second', type=float, default=50)
+    parser.add_argument('--flaky-every', type=int, default=25, help='Answer every Nth request with a 503 (0 = never)')
+    args = parser.parse_args()
+
+    server = _stand_in(args.latency, args.flaky_every)
+    url = f"http://127.0.0.1:{server.server_address[1]}/data"
+
+    session = requests.Session()
+    started = time.time()
+    statuses = [session.get(url, params={'id': i}, timeout=30).status_code for i in range(args.requests)]
+    sequential = time.time() - started
+    print(f"requests, one at a time: {sequential:.2f}s, {statuses.count(200)}/{args.requests} ok (no retries)")
+
+    fetcher = AsyncFetcher(requests_per_second=args.requests_per_second, concurrency=args.concurrency, backoff=0.1)
+
+    async def fetch_one(i):
+        return await fetcher.get(url, {'id': i})
+
+    results = fetcher.map(fetch_one, range(args.requests))
+    ok = sum(1 for result in results if result and result.status == 200)
+    summary = fetcher.summary()
+    print(f"async, {args.concurrency} connections at {args.requests_per_second:g} req/s: {summary['seconds']:.2f}s, "
+          f"{ok}/{args.requests} ok, {summary['retries']} retries")
+    print(f"speedup {sequential / summary['seconds']:.1f}x")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
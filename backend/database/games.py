@@ -2,19 +2,261 @@ import requests
 import pandas as pd
 import time
 import json
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, List, Dict, Optional
 import sqlite3
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime, timedelta
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from player_ratings import PlayerRatingCalculator  # ADD THIS IMPORT
+from archive import enable as enable_archive, new_session
+from async_fetch import ROTOWIRE_FETCH_BACKEND, async_fetcher
+from queries import ensure_indexes
+from row_spec import PLAYER_COLUMNS, TEAM_STATS_COLUMNS, player_rows, team_totals_row
+from storage import SQLiteWriter, changed_sql, insert_sql, upsert_sql
+import argparse
+import os
+
+# Point at a local stand-in (upstream_standin.py) for benchmarks and replays
+ROTOWIRE_BASE_URL = os.environ.get('ROTOWIRE_BASE_URL', 'https://www.rotowire.com').rstrip('/')
+# Politeness budget for rotowire.com shared by every worker of a concurrent scrape
+ROTOWIRE_REQUESTS_PER_SECOND = float(os.environ.get('ROTOWIRE_REQUESTS_PER_SECOND', '4'))
+# Games dated this many days back or later are refetched by every run: they may have been scraped mid-game
+ROTOWIRE_RECHECK_DAYS = int(os.environ.get('ROTOWIRE_RECHECK_DAYS', '1'))
 
 start = 2878571
 end = 2878571
+
+# Teams with a box score in every game
+TEAMS_PER_GAME = 2
+
+GAME_TEAMS_INSERT = insert_sql('game_teams', ['game_id', 'team_id', 'source'], conflict='IGNORE')
+GAME_DATES_INSERT = insert_sql('game_dates', ['game_id', 'game_date', 'source'], conflict='REPLACE')
+# team_schedule keeps the date cell as displayed; only formats that carry a year can be used
+SCHEDULE_DATE_FORMATS = ['%Y-%m-%d', '%m/%d/%Y', '%m/%d/%y', '%b %d, %Y', '%B %d, %Y', '%a %b %d, %Y', '%a, %b %d, %Y']
+PLAYER_GAME_ID = PLAYER_COLUMNS.index('game_id')
+PLAYER_TEAM_ID = PLAYER_COLUMNS.index('team_id')
+# Rows are keyed like the UNIQUE constraints and rewritten in place (same id) only when one of
+# their stats changed: a game scraped mid-game gets its final stats, an unchanged rerun writes
+# nothing. SQLite compares the stored and new values, so the parser does no extra work.
+# A changed player row drops its player_rating, which calculate_player_ratings fills in again.
+PLAYER_KEY = ['player_id', 'game_id', 'team_id']
+TEAM_STATS_KEY = ['game_id', 'team_id']
+UNCOMPARED_COLUMNS = ('player_rating', 'scraped_timestamp')
+PLAYER_UPSERT = upsert_sql('games', PLAYER_COLUMNS, PLAYER_KEY, where=changed_sql(
+    'games', [c for c in PLAYER_COLUMNS if c not in PLAYER_KEY and c not in UNCOMPARED_COLUMNS]))
+TEAM_STATS_UPSERT = upsert_sql('team_stats', TEAM_STATS_COLUMNS, TEAM_STATS_KEY, where=changed_sql(
+    'team_stats', [c for c in TEAM_STATS_COLUMNS if c not in TEAM_STATS_KEY and c not in UNCOMPARED_COLUMNS]))
+
+
+class GameTeamsIndex:
+    """
+    Which rotowire team ids played each game, so a scrape requests two teams instead of thirty
+    
+    Filled from games already scraped (team_stats), from team_schedule rows once
+    their abbreviations are mapped to team ids, and from each scrape as it finds teams.
+    Abbreviations are learned by intersecting, per team id, the abbreviations
+    scheduled in the games it was found in, minus those already pinned to other ids.
+    """
+    
+    def __init__(self, writer: SQLiteWriter):
+        self.writer = writer
+        self._lock = threading.Lock()
+        self._teams: Dict[int, set] = {}
+        conn = writer.conn
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS game_teams (
+            game_id INTEGER NOT NULL,
+            team_id INTEGER NOT NULL,
+            source TEXT,
+            PRIMARY KEY (game_id, team_id)
+        )
+        ''')
+        conn.execute('''
+        CREATE TABLE IF NOT EXISTS team_abbreviations (
+            team_abbreviation TEXT PRIMARY KEY,
+            team_id INTEGER NOT NULL
+        )
+        ''')
+        conn.commit()
+        self.refresh()
+    
+    def _schedule(self, conn) -> Dict[int, set]:
+        """game_id -> team abbreviations, from team_schedule when team_schedule.py has filled it"""
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'team_schedule'").fetchone():
+            return {}
+        schedule = {}
+        for game_id, abbreviation in conn.execute(
+                'SELECT game_id, team_abbreviation FROM team_schedule WHERE game_id IS NOT NULL'):
+            schedule.setdefault(game_id, set()).add(abbreviation)
+        return schedule
+    
+    def learn_abbreviations(self, conn) -> int:
+        """Map team_schedule abbreviations to team ids from the games both sources know; returns new mappings"""
+        schedule = self._schedule(conn)
+        candidates: Dict[int, set] = {}
+        for game_id, team_id in conn.execute('SELECT game_id, team_id FROM game_teams'):
+            if game_id in schedule:
+                abbreviations = schedule[game_id]
+                candidates[team_id] = candidates[team_id] & abbreviations if team_id in candidates else set(abbreviations)
+        
+        known = dict(conn.execute('SELECT team_abbreviation, team_id FROM team_abbreviations'))
+        learned = 0
+        # An abbreviation pinned to one team id is ruled out for the others, which can pin more
+        progress = True
+        while progress:
+            progress = False
+            assigned = {abbreviation for abbreviation, team_id in known.items() if team_id in candidates}
+            for team_id, abbreviations in candidates.items():
+                remaining = abbreviations - {a for a in assigned if known[a] != team_id}
+                if len(remaining) == 1:
+                    abbreviation = next(iter(remaining))
+                    if known.get(abbreviation) != team_id:
+                        known[abbreviation] = team_id
+                        conn.execute('INSERT OR REPLACE INTO team_abbreviations VALUES (?, ?)', (abbreviation, team_id))
+                        learned += 1
+                        progress = True
+        return learned
+    
+    def refresh(self):
+        """Reload the index from the database"""
+        self.writer.flush()
+        conn = self.writer.conn
+        conn.execute('''
+        INSERT OR IGNORE INTO game_teams (game_id, team_id, source)
+        SELECT DISTINCT game_id, team_id, 'team_stats' FROM team_stats
+        ''')
+        self.learn_abbreviations(conn)
+        conn.commit()
+        
+        teams = {}
+        for game_id, team_id in conn.execute('SELECT game_id, team_id FROM game_teams'):
+            teams.setdefault(game_id, set()).add(team_id)
+        abbreviation_ids = dict(conn.execute('SELECT team_abbreviation, team_id FROM team_abbreviations'))
+        for game_id, abbreviations in self._schedule(conn).items():
+            for abbreviation in abbreviations:
+                if abbreviation in abbreviation_ids:
+                    teams.setdefault(game_id, set()).add(abbreviation_ids[abbreviation])
+        
+        with self._lock:
+            self._teams = teams
+    
+    def teams_for(self, game_id: int) -> set:
+        """Team ids known to have played `game_id` (empty if none are known)"""
+        with self._lock:
+            return set(self._teams.get(game_id, ()))
+    
+    def record(self, game_id: int, team_ids: List[int], source: str = 'scrape'):
+        """Remember the teams a scrape found for a game"""
+        with self._lock:
+            self._teams.setdefault(game_id, set()).update(team_ids)
+        self.writer.write(GAME_TEAMS_INSERT, [(game_id, team_id, source) for team_id in team_ids])
+
+
+def normalize_schedule_date(text: Optional[str]) -> Optional[str]:
+    """YYYY-MM-DD for a team_schedule date cell, or None when it has no recognizable year"""
+    if not text:
+        return None
+    for date_format in SCHEDULE_DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).strftime('%Y-%m-%d')
+        except ValueError:
+            continue
+    return None
+
+
+class GameDateCache:
+    """
+    Persistent game_id -> date map, so each game's date is fetched from rotowire at most once
+    
+    Seeded from earlier runs (game_dates, game_info) and from team_schedule dates
+    that carry a year. Misses go through `fetch` (the box score redirect), can be
+    resolved on a thread pool, and are stored in game_dates for the next run.
+    """
+    
+    def __init__(self, writer: SQLiteWriter, fetch: Callable[[int], Optional[str]]):
+        self.writer = writer
+        self.fetch = fetch
+        self._lock = threading.Lock()
+        self._dates: Dict[int, str] = {}
+        self.hits = 0
+        self.fetched = 0
+        writer.conn.execute('''
+        CREATE TABLE IF NOT EXISTS game_dates (
+            game_id INTEGER PRIMARY KEY,
+            game_date TEXT NOT NULL,
+            source TEXT
+        )
+        ''')
+        writer.conn.commit()
+        self.refresh()
+    
+    def refresh(self):
+        """Reload the cache from the database (later sources win: game_info, team_schedule, game_dates)"""
+        conn = self.writer.conn
+        self.writer.flush()
+        dates = dict(conn.execute('SELECT game_id, game_date FROM game_info WHERE game_date IS NOT NULL'))
+        if conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'team_schedule'").fetchone():
+            for game_id, text in conn.execute(
+                    'SELECT game_id, game_date FROM team_schedule WHERE game_id IS NOT NULL'):
+                game_date = normalize_schedule_date(text)
+                if game_date:
+                    dates[game_id] = game_date
+        dates.update(conn.execute('SELECT game_id, game_date FROM game_dates'))
+        with self._lock:
+            self._dates = dates
+    
+    def get(self, game_id: int) -> Optional[str]:
+        """The game's date, fetching and storing it on a miss (None if it could not be found)"""
+        with self._lock:
+            game_date = self._dates.get(game_id)
+            if game_date:
+                self.hits += 1
+                return game_date
+        game_date = self.fetch(game_id)
+        with self._lock:
+            self.fetched += 1
+            if game_date:
+                self._dates[game_id] = game_date
+        if game_date:
+            self.writer.write_one(GAME_DATES_INSERT, (game_id, game_date, 'box_score_url'))
+        return game_date
+    
+    def resolve(self, game_ids: Iterable[int], workers: int = 1) -> Dict[int, Optional[str]]:
+        """Dates for several games, fetching the misses on up to `workers` threads"""
+        game_ids = list(dict.fromkeys(game_ids))
+        if workers > 1 and len(game_ids) > 1:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='game-dates') as executor:
+                return dict(zip(game_ids, executor.map(self.get, game_ids)))
+        return {game_id: self.get(game_id) for game_id in game_ids}
+    
+    def summary(self) -> Dict[str, int]:
+        with self._lock:
+            return {'known': len(self._dates), 'hits': self.hits, 'fetched': self.fetched}
+
+
+class HostRateBudget:
+    """Requests-per-second budget for one host, shared by every thread that calls wait()"""
+    
+    def __init__(self, requests_per_second: float):
+        self.interval = 1.0 / requests_per_second
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def wait(self):
+        """Block until this caller's request slot comes up; slots are `interval` apart"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
       
 
 class RotowireScraper:
-    def __init__(self, db_name: str = "games.db"):
-        self.base_url = "https://www.rotowire.com/basketball/tables/box-score.php"
+    def __init__(self, db_name: str = "games.db", fetch_backend: str = ROTOWIRE_FETCH_BACKEND):
+        self.base_url = f"{ROTOWIRE_BASE_URL}/basketball/tables/box-score.php"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:124.0) Gecko/20100101 Firefox/124.0',
             'Accept': '*/*',
@@ -27,14 +269,34 @@ class RotowireScraper:
             'Sec-Fetch-Site': 'same-origin',
             'TE': 'trailers'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = new_session(self.headers)
+        # 'async' fetches scrape_games_range through an AsyncFetcher (see async_fetch.py)
+        self.fetcher = async_fetcher(fetch_backend, self.headers)
         self.db_name = db_name
+        # Set while a concurrent scrape runs: worker threads get their own sessions and share the budget
+        self.rate_budget: Optional[HostRateBudget] = None
+        self._thread_local = threading.local()
+        self.requests_made = 0
+        self._counter_lock = threading.Lock()
+        # One connection for the whole run; see storage.py
+        self.writer = SQLiteWriter(db_name)
         self.setup_database()
+        self.game_teams = GameTeamsIndex(self.writer)
+        self.game_dates = GameDateCache(self.writer, self.extract_game_date_from_url)
+    
+    def _session(self) -> requests.Session:
+        """The session for the calling thread, after waiting for the host budget if one is set"""
+        if self.rate_budget is None:
+            return self.session
+        self.rate_budget.wait()
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self._thread_local.session = new_session(self.headers)
+        return session
         
     def setup_database(self):
         """Set up the SQLite database with the appropriate tables"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.writer.conn
         cursor = conn.cursor()
         
         # Create games table WITH player_rating column
@@ -122,8 +384,15 @@ class RotowireScraper:
         )
         ''')
         
+        # scrape_status = 'complete' marks a game whose rows were all committed (the resume checkpoint);
+        # 'partial' a game saved with fewer than TEAMS_PER_GAME teams, whose missing teams a rerun retries
+        game_info_columns = {row[1] for row in cursor.execute('PRAGMA table_info(game_info)')}
+        if 'scrape_status' not in game_info_columns:
+            cursor.execute('ALTER TABLE game_info ADD COLUMN scrape_status TEXT')
+        
+        # Secondary indexes for game/player/team lookups (see queries.py)
+        ensure_indexes(conn)
         conn.commit()
-        conn.close()
         
     def get_team_data(self, game_global_id: int, team_global_id: int) -> Optional[Dict]:
         """Get data for a specific team in a specific game"""
@@ -133,7 +402,7 @@ class RotowireScraper:
         }
         
         try:
-            response = self.session.get(self.base_url, params=params)
+            response = self._session().get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             return response.json()
         except requests.exceptions.RequestException as e:
@@ -147,10 +416,10 @@ class RotowireScraper:
         """Extract the game date from the box score URL"""
         try:
             # Construct the URL pattern
-            url = f"https://www.rotowire.com/basketball/box-score/game-{game_id}"
+            url = f"{ROTOWIRE_BASE_URL}/basketball/box-score/game-{game_id}"
             
             # Make a request to get the final URL (after redirects)
-            response = self.session.get(url, timeout=10, allow_redirects=True)
+            response = self._session().get(url, timeout=10, allow_redirects=True)
             
             # Extract date from the final URL using regex
             # Pattern for URLs like: .../timberwolves-vs-warriors-2025-05-14-2878782
@@ -167,269 +436,238 @@ class RotowireScraper:
             print(f"Error extracting date for game {game_id}: {e}")
             return None
     
-    def process_player_data(self, player_data: List[Dict], game_id: int, team_id: int) -> List[Dict]:
-        """Process raw player data and add game/team context"""
-        processed_data = []
+    def process_player_data(self, player_data: List[Dict], game_id: int, team_id: int) -> List[tuple]:
+        """Insert tuples (PLAYER_COLUMNS order) for the players of one team's raw box score"""
+        return player_rows(player_data, game_id, team_id)
+    
+    def extract_team_totals(self, player_data: List[Dict], game_id: int, team_id: int) -> Optional[tuple]:
+        """Insert tuple (TEAM_STATS_COLUMNS order) from the "Game Total" row of a raw box score"""
+        return team_totals_row(player_data, game_id, team_id)
+    
+    def save_to_database(self, data: List[tuple], team_totals_data: List[tuple]):
+        """Save processed data to SQLite database with duplicate prevention"""
+        # Player rows per game in one pass; dates are resolved before the transaction opens
+        rows_per_game = Counter(row[PLAYER_GAME_ID] for row in data)
+        teams_per_game = Counter(game_id for game_id, _ in {(row[PLAYER_GAME_ID], row[PLAYER_TEAM_ID]) for row in data})
+        game_dates = self.resolve_game_dates(rows_per_game)
         
-        for player in player_data:
-            # Skip empty rows but keep team totals (position_sort = 4)
-            position_sort = player.get('positionSort', 0)
-            if (player.get('playerID') == 0 and position_sort != 4) or not player.get('nameLong') or player.get('nameLong') in ['', 'Game Total']:
-                continue
-                
-            # Add game and team context
-            player_with_context = player.copy()
-            player_with_context['game_id'] = game_id
-            player_with_context['team_id'] = team_id
-            
-            # Convert string stats to numeric values where possible
-            # Field Goals
-            if 'fg' in player_with_context and isinstance(player_with_context['fg'], str):
-                fg_parts = player_with_context['fg'].split('-')
-                if len(fg_parts) == 2:
-                    player_with_context['fg_made'] = int(fg_parts[0])
-                    player_with_context['fg_attempted'] = int(fg_parts[1])
-                    player_with_context['fg_percentage'] = round(int(fg_parts[0]) / int(fg_parts[1]) * 100, 1) if int(fg_parts[1]) > 0 else 0
+        with self.writer.transaction():
+            players_saved = self._insert_players(data)
+            teams_saved = self._insert_team_totals(team_totals_data)
             
-            # 3-Point Field Goals
-            if 'pt3' in player_with_context and isinstance(player_with_context['pt3'], str):
-                pt3_parts = player_with_context['pt3'].split('-')
-                if len(pt3_parts) == 2:
-                    player_with_context['three_pt_made'] = int(pt3_parts[0])
-                    player_with_context['three_pt_attempted'] = int(pt3_parts[1])
-                    player_with_context['three_pt_percentage'] = round(int(pt3_parts[0]) / int(pt3_parts[1]) * 100, 1) if int(pt3_parts[1]) > 0 else 0
-            
-            # Free Throws
-            if 'ft' in player_with_context and isinstance(player_with_context['ft'], str):
-                ft_parts = player_with_context['ft'].split('-')
-                if len(ft_parts) == 2:
-                    player_with_context['ft_made'] = int(ft_parts[0])
-                    player_with_context['ft_attempted'] = int(ft_parts[1])
-                    player_with_context['ft_percentage'] = round(int(fg_parts[0]) / int(fg_parts[1]) * 100, 1) if int(fg_parts[1]) > 0 else 0
-            
-            # Convert other numeric fields including position_sort
-            numeric_fields = ['minutes', 'points', 'oreb', 'dreb', 'ast', 'stl', 'blk', 'turnovers', 'personalFouls', 'technicalFouls', 'ejected', 'positionSort']
-            for field in numeric_fields:
-                if field in player_with_context and player_with_context[field] not in ['', '-']:
-                    try:
-                        # Remove HTML tags if present
-                        value = str(player_with_context[field])
-                        if '<' in value:
-                            # Extract numeric value from HTML
-                            import re
-                            numbers = re.findall(r'\d+', value)
-                            if numbers:
-                                player_with_context[field] = int(numbers[0])
-                            else:
-                                player_with_context[field] = 0
-                        else:
-                            player_with_context[field] = int(player_with_context[field])
-                    except (ValueError, TypeError):
-                        player_with_context[field] = 0
-            
-            # Calculate total rebounds
-            oreb = player_with_context.get('oreb', 0)
-            dreb = player_with_context.get('dreb', 0)
-            player_with_context['total_rebounds'] = oreb + dreb
-            
-            processed_data.append(player_with_context)
-        
-        return processed_data
-    
-    def extract_team_totals(self, player_data: List[Dict], game_id: int, team_id: int) -> Optional[Dict]:
-        """Extract team totals from position_sort = 4 data"""
-        for player in player_data:
-            if player.get('positionSort') == 4 and player.get('nameLong') == 'Game Total':
-                team_totals = {
-                    'game_id': game_id,
-                    'team_id': team_id,
-                    'minutes': player.get('minutes', ''),
-                    'points': self._extract_numeric(player.get('points', 0)),
-                    'fg_made': self._extract_numeric(player.get('fg', '0-0').split('-')[0]),
-                    'fg_attempted': self._extract_numeric(player.get('fg', '0-0').split('-')[1]),
-                    'three_pt_made': self._extract_numeric(player.get('pt3', '0-0').split('-')[0]),
-                    'three_pt_attempted': self._extract_numeric(player.get('pt3', '0-0').split('-')[1]),
-                    'ft_made': self._extract_numeric(player.get('ft', '0-0').split('-')[0]),
-                    'ft_attempted': self._extract_numeric(player.get('ft', '0-0').split('-')[1]),
-                    'offensive_rebounds': self._extract_numeric(player.get('oreb', 0)),
-                    'defensive_rebounds': self._extract_numeric(player.get('dreb', 0)),
-                    'assists': self._extract_numeric(player.get('ast', 0)),
-                    'steals': self._extract_numeric(player.get('stl', 0)),
-                    'blocks': self._extract_numeric(player.get('blk', 0)),
-                    'turnovers': self._extract_numeric(player.get('turnovers', 0)),
-                    'personal_fouls': self._extract_numeric(player.get('personalFouls', 0)),
-                    'technical_fouls': player.get('technicalFouls', ''),
-                    'ejected': player.get('ejected', ''),
-                    'ortg': player.get('ortg', ''),
-                    'usg': player.get('usg', ''),
-                    'scraped_timestamp': datetime.now()
-                }
-                
-                # Calculate percentages
-                if team_totals['fg_attempted'] > 0:
-                    team_totals['fg_percentage'] = round(team_totals['fg_made'] / team_totals['fg_attempted'] * 100, 1)
-                if team_totals['three_pt_attempted'] > 0:
-                    team_totals['three_pt_percentage'] = round(team_totals['three_pt_made'] / team_totals['three_pt_attempted'] * 100, 1)
-                if team_totals['ft_attempted'] > 0:
-                    team_totals['ft_percentage'] = round(team_totals['ft_made'] / team_totals['ft_attempted'] * 100, 1)
-                
-                team_totals['total_rebounds'] = team_totals['offensive_rebounds'] + team_totals['defensive_rebounds']
-                
-                return team_totals
-        return None
+            # Update game info table with date information
+            for game_id, teams_found in rows_per_game.items():
+                try:
+                    self._write_game_info(game_id, game_dates[game_id], teams_found,
+                                          complete=teams_per_game[game_id] >= TEAMS_PER_GAME)
+                except Exception as e:
+                    print(f"Error updating game info: {e}")
+        
+        print(f"Saved {players_saved} new or changed player records and {teams_saved} team totals to database")
     
-    def _extract_numeric(self, value):
-        """Extract numeric value from potentially HTML-formatted text"""
-        if isinstance(value, str) and '<' in value:
-            import re
-            numbers = re.findall(r'\d+', value)
-            return int(numbers[0]) if numbers else 0
+    def resolve_game_dates(self, game_ids: Iterable[int], workers: int = 4,
+                           requests_per_second: float = ROTOWIRE_REQUESTS_PER_SECOND) -> Dict[int, Optional[str]]:
+        """Dates for `game_ids` from the date cache, fetching misses concurrently under the host budget"""
+        own_budget = workers > 1 and self.rate_budget is None
+        if own_budget:
+            self.rate_budget = HostRateBudget(requests_per_second)
         try:
-            return int(value)
-        except (ValueError, TypeError):
-            return 0
+            return self.game_dates.resolve(game_ids, workers=workers)
+        finally:
+            if own_budget:
+                self.rate_budget = None
     
-    def save_to_database(self, data: List[Dict], team_totals_data: List[Dict]):
-        """Save processed data to SQLite database with duplicate prevention"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        games_processed = set()
-        players_saved = 0
-        teams_saved = 0
-        
-        # Save player data with ON CONFLICT IGNORE to prevent duplicates
-        for player in data:
-            try:
-                cursor.execute('''
-                INSERT OR IGNORE INTO games (
-                    player_id, player_name, player_name_short, position, position_sort,
-                    game_id, team_id, minutes, points, fg_made, fg_attempted, fg_percentage,
-                    three_pt_made, three_pt_attempted, three_pt_percentage,
-                    ft_made, ft_attempted, ft_percentage,
-                    offensive_rebounds, defensive_rebounds, total_rebounds,
-                    assists, steals, blocks, turnovers, personal_fouls,
-                    technical_fouls, ejected, ortg, usg, url, player_rating, scraped_timestamp
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    player.get('playerID'),
-                    player.get('nameLong'),
-                    player.get('nameShort'),
-                    player.get('position'),
-                    player.get('positionSort', 0),
-                    player.get('game_id'),
-                    player.get('team_id'),
-                    player.get('minutes', 0),
-                    player.get('points', 0),
-                    player.get('fg_made', 0),
-                    player.get('fg_attempted', 0),
-                    player.get('fg_percentage', 0),
-                    player.get('three_pt_made', 0),
-                    player.get('three_pt_attempted', 0),
-                    player.get('three_pt_percentage', 0),
-                    player.get('ft_made', 0),
-                    player.get('ft_attempted', 0),
-                    player.get('ft_percentage', 0),
-                    player.get('oreb', 0),
-                    player.get('dreb', 0),
-                    player.get('total_rebounds', 0),
-                    player.get('ast', 0),
-                    player.get('stl', 0),
-                    player.get('blk', 0),
-                    player.get('turnovers', 0),
-                    player.get('personalFouls', 0),
-                    player.get('technicalFouls', 0),
-                    player.get('ejected', 0),
-                    player.get('ortg', ''),
-                    player.get('usg', ''),
-                    player.get('URL', ''),
-                    None,  # player_rating will be calculated later
-                    datetime.now()
-                ))
-                
-                if cursor.rowcount > 0:  # If a row was actually inserted
-                    players_saved += 1
-                
-                # Track which games we've processed
-                games_processed.add(player.get('game_id'))
-                
-            except Exception as e:
-                print(f"Error inserting player data: {e}")
-        
-        # Save team totals data
-        for team_totals in team_totals_data:
-            try:
-                cursor.execute('''
-                INSERT OR IGNORE INTO team_stats (
-                    game_id, team_id, minutes, points, fg_made, fg_attempted, fg_percentage,
-                    three_pt_made, three_pt_attempted, three_pt_percentage,
-                    ft_made, ft_attempted, ft_percentage,
-                    offensive_rebounds, defensive_rebounds, total_rebounds,
-                    assists, steals, blocks, turnovers, personal_fouls,
-                    technical_fouls, ejected, ortg, usg, scraped_timestamp
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
-                    team_totals['game_id'],
-                    team_totals['team_id'],
-                    team_totals['minutes'],
-                    team_totals['points'],
-                    team_totals['fg_made'],
-                    team_totals['fg_attempted'],
-                    team_totals.get('fg_percentage', 0),
-                    team_totals['three_pt_made'],
-                    team_totals['three_pt_attempted'],
-                    team_totals.get('three_pt_percentage', 0),
-                    team_totals['ft_made'],
-                    team_totals['ft_attempted'],
-                    team_totals.get('ft_percentage', 0),
-                    team_totals['offensive_rebounds'],
-                    team_totals['defensive_rebounds'],
-                    team_totals['total_rebounds'],
-                    team_totals['assists'],
-                    team_totals['steals'],
-                    team_totals['blocks'],
-                    team_totals['turnovers'],
-                    team_totals['personal_fouls'],
-                    team_totals['technical_fouls'],
-                    team_totals['ejected'],
-                    team_totals['ortg'],
-                    team_totals['usg'],
-                    team_totals['scraped_timestamp']
-                ))
-                
-                if cursor.rowcount > 0:
-                    teams_saved += 1
-                    
-            except Exception as e:
-                print(f"Error inserting team totals: {e}")
-        
-        # Update game info table with date information
-        for game_id in games_processed:
-            try:
-                # Extract date from URL
-                game_date = self.extract_game_date_from_url(game_id)
-                
-                cursor.execute('''
-                INSERT OR REPLACE INTO game_info (game_id, game_date, scraped_timestamp, teams_found)
-                VALUES (?, ?, ?, ?)
-                ''', (game_id, game_date, datetime.now(), len([p for p in data if p.get('game_id') == game_id])))
-            except Exception as e:
-                print(f"Error updating game info: {e}")
+    def _insert_players(self, rows: List[tuple]) -> int:
+        """Insert new player rows and update stored ones whose stats changed; returns rows written"""
+        return self.writer.execute_many(PLAYER_UPSERT, rows)
+    
+    def _insert_team_totals(self, rows: List[tuple]) -> int:
+        """Insert new team totals rows and update stored ones whose stats changed; returns rows written"""
+        return self.writer.execute_many(TEAM_STATS_UPSERT, rows)
+    
+    def _write_game_info(self, game_id: int, game_date: Optional[str], teams_found: int, complete: bool = True):
+        """Write a game's metadata and mark it complete (or partial, to be retried)"""
+        self.writer.execute_many('''
+        INSERT OR REPLACE INTO game_info (game_id, game_date, scraped_timestamp, teams_found, scrape_status)
+        VALUES (?, ?, ?, ?, ?)
+        ''', [(game_id, game_date, datetime.now(), teams_found, 'complete' if complete else 'partial')])
+    
+    def scraped_teams(self) -> Dict[int, set]:
+        """game_id -> team ids whose box score is already stored (team_stats)"""
+        scraped = {}
+        for game_id, team_id in self.writer.query('SELECT game_id, team_id FROM team_stats'):
+            scraped.setdefault(game_id, set()).add(team_id)
+        return scraped
+    
+    def completed_games(self, scraped: Optional[Dict[int, set]] = None) -> set:
+        """
+        Game ids that need no more requests: checkpointed complete in game_info, or
+        saved before the checkpoint existed with every team's totals in team_stats
+        """
+        scraped = self.scraped_teams() if scraped is None else scraped
+        return {game_id for game_id, status in self.writer.query('SELECT game_id, scrape_status FROM game_info')
+                if status == 'complete' or len(scraped.get(game_id, ())) >= TEAMS_PER_GAME}
+    
+    def recent_games(self) -> set:
+        """Stored game ids dated within ROTOWIRE_RECHECK_DAYS; they may have been scraped mid-game"""
+        recheck_from = (date.today() - timedelta(days=ROTOWIRE_RECHECK_DAYS)).isoformat()
+        return {game_id for game_id, in self.writer.query(
+            'SELECT game_id FROM game_info WHERE game_date >= ?', (recheck_from,))}
+    
+    def save_game(self, game_id: int, found: List[tuple], game_date: Optional[str], stored_rows: int = 0,
+                  stored_teams: Iterable[int] = ()):
+        """
+        Commit one game's player rows, team totals and checkpoint in a single transaction
         
-        conn.commit()
-        conn.close()
-        print(f"Saved {players_saved} new player records and {teams_saved} team totals to database")
+        `stored_teams` / `stored_rows` are the teams and player rows kept from an earlier run
+        that were not refetched. The game is checkpointed complete once found and stored
+        teams make TEAMS_PER_GAME, partial (retried by the next run) otherwise.
+        """
+        data = [player for _, processed_data, _ in found for player in processed_data]
+        team_totals_data = [team_totals for _, _, team_totals in found if team_totals]
+        with self.writer.transaction():
+            players_saved = self._insert_players(data)
+            teams_saved = self._insert_team_totals(team_totals_data)
+            self._write_game_info(game_id, game_date, stored_rows + len(data),
+                                  complete=len(found) + len(set(stored_teams)) >= TEAMS_PER_GAME)
+        return players_saved, teams_saved
     
     def calculate_player_ratings(self):
         """
         Calculate and add player ratings to the database using your custom formula
         """
+        self.writer.flush()
         calculator = PlayerRatingCalculator(self.db_name)
         calculator.add_ratings_to_database()
         calculator.validate_ratings(sample_size=10)
     
-    def scrape_games_range(self, start_game_id: int, end_game_id: int, team_ids: List[int], delay: float = 1.0):
-        """Scrape data for a range of game IDs"""
+    def fetch_team(self, game_id: int, team_id: int) -> Optional[List[Dict]]:
+        """One team's raw box score rows, or None without data"""
+        with self._counter_lock:
+            self.requests_made += 1
+        return self.get_team_data(game_id, team_id) or None
+    
+    def parse_team(self, game_id: int, team_id: int, team_data: List[Dict]) -> tuple:
+        """(team_id, player rows, team totals) from one team's raw box score rows"""
+        return team_id, self.process_player_data(team_data, game_id, team_id), self.extract_team_totals(team_data, game_id, team_id)
+    
+    def scrape_team(self, game_id: int, team_id: int):
+        """Fetch and process one team's box score: (player rows, team totals), or None without data"""
+        team_data = self.fetch_team(game_id, team_id)
+        if not team_data:
+            return None
+        return self.parse_team(game_id, team_id, team_data)[1:]
+    
+    def fetch_game(self, game_id: int, team_ids: List[int], delay: float = 0.0, verbose: bool = False,
+                   stored_teams: Iterable[int] = ()) -> List[tuple]:
+        """
+        Fetch the raw box scores of the teams that played a game: [(team_id, raw rows)]
+        
+        Only the teams in the game-teams index are requested when it knows both. Otherwise
+        `team_ids` are probed in order (index hits first) until TEAMS_PER_GAME respond,
+        and the teams found are recorded in the index. `stored_teams` are already in the
+        database: they are not requested but count towards TEAMS_PER_GAME.
+        """
+        stored = set(stored_teams)
+        candidates, known = self._team_candidates(game_id, team_ids)
+        
+        fetched = []
+        for team_id in candidates:
+            if team_id in stored:
+                continue
+            if verbose:
+                print(f"  Fetching team {team_id}...")
+            
+            team_data = self.fetch_team(game_id, team_id)
+            
+            if team_data:
+                fetched.append((team_id, team_data))
+            elif verbose:
+                print(f"    No data found for team {team_id}")
+            
+            # Be respectful with delays
+            if delay:
+                time.sleep(delay)
+            
+            if len(fetched) + len(stored) >= TEAMS_PER_GAME:
+                break
+        
+        return self._record_fetched(game_id, fetched, known, team_ids)
+    
+    def _team_candidates(self, game_id: int, team_ids: List[int]) -> tuple:
+        """(team ids to probe in order, teams the game-teams index knows) for a game"""
+        known = self.game_teams.teams_for(game_id)
+        position = {team_id: i for i, team_id in enumerate(team_ids)}
+        ordered_known = sorted(known, key=lambda team_id: position.get(team_id, len(team_ids)))
+        if len(known) >= TEAMS_PER_GAME:
+            return ordered_known, known
+        return ordered_known + [team_id for team_id in team_ids if team_id not in known], known
+    
+    def _record_fetched(self, game_id: int, fetched: List[tuple], known, team_ids: List[int]) -> List[tuple]:
+        """Index the teams found and put them in the order probing every team id would give"""
+        if len(fetched) > len(known):
+            self.game_teams.record(game_id, [team_id for team_id, _ in fetched], source='scrape')
+        position = {team_id: i for i, team_id in enumerate(team_ids)}
+        fetched.sort(key=lambda item: position.get(item[0], len(team_ids)))
+        return fetched
+    
+    async def fetch_team_async(self, game_id: int, team_id: int) -> Optional[List[Dict]]:
+        """fetch_team through the async backend"""
+        with self._counter_lock:
+            self.requests_made += 1
+        response = await self.fetcher.get(self.base_url, {'gameGlobalID': game_id, 'teamGlobalID': team_id})
+        if response is None:
+            return None
+        if response.status != 200:
+            print(f"Error fetching data for game {game_id}, team {team_id}: HTTP {response.status}")
+            return None
+        try:
+            return response.json() or None
+        except ValueError as e:
+            print(f"Error parsing JSON for game {game_id}, team {team_id}: {e}")
+            return None
+    
+    async def fetch_game_async(self, game_id: int, team_ids: List[int],
+                               stored_teams: Iterable[int] = ()) -> List[tuple]:
+        """fetch_game through the async backend: a game's teams are probed in turn, games run concurrently"""
+        stored = set(stored_teams)
+        candidates, known = self._team_candidates(game_id, team_ids)
+        fetched = []
+        for team_id in candidates:
+            if team_id in stored:
+                continue
+            team_data = await self.fetch_team_async(game_id, team_id)
+            if team_data:
+                fetched.append((team_id, team_data))
+            if len(fetched) + len(stored) >= TEAMS_PER_GAME:
+                break
+        return self._record_fetched(game_id, fetched, known, team_ids)
+    
+    def parse_game(self, game_id: int, fetched: List[tuple], verbose: bool = False) -> List[tuple]:
+        """[(team_id, player rows, team totals)] from fetch_game's raw box scores"""
+        found = [self.parse_team(game_id, team_id, team_data) for team_id, team_data in fetched]
+        if verbose:
+            for team_id, processed_data, _ in found:
+                print(f"    Found {len(processed_data)} players and team totals for team {team_id}")
+        return found
+    
+    def scrape_game(self, game_id: int, team_ids: List[int], delay: float = 0.0, verbose: bool = False,
+                    stored_teams: Iterable[int] = ()) -> List[tuple]:
+        """Scrape the teams that played a game: [(team_id, player rows, team totals)] (see fetch_game)"""
+        fetched = self.fetch_game(game_id, team_ids, delay=delay, verbose=verbose, stored_teams=stored_teams)
+        return self.parse_game(game_id, fetched, verbose=verbose)
+    
+    def scrape_games_range(self, start_game_id: int, end_game_id: int, team_ids: List[int], delay: float = 1.0,
+                           workers: int = 1, requests_per_second: float = ROTOWIRE_REQUESTS_PER_SECOND):
+        """
+        Scrape data for a range of game IDs
+        
+        Each game only requests the teams that played it (see scrape_game). With
+        workers > 1 games run on a thread pool paced by a shared requests_per_second
+        budget instead of sleeping `delay` after each request; with the async fetch
+        backend they run on the scraper's AsyncFetcher (its own rate cap). Results
+        are collected in the serial order, so the output is the same.
+        """
         all_player_data = []
         all_team_totals = []
         
@@ -437,44 +675,257 @@ class RotowireScraper:
         game_ids = list(range(start_game_id, end_game_id - 1, -1))
         total_games = len(game_ids)
         
+        if self.fetcher is not None:
+            return self._scrape_async(game_ids, team_ids)
+        if workers > 1:
+            return self._scrape_concurrent(game_ids, team_ids, workers, requests_per_second)
+        
         print(f"Starting scrape of {total_games} games...")
+        requests_before = self.requests_made
         
         for i, game_id in enumerate(game_ids, 1):
             print(f"Processing game {i}/{total_games} (ID: {game_id})...")
             
-            game_has_data = False
-            
-            for team_id in team_ids:
-                print(f"  Fetching team {team_id}...")
-                
-                # Get raw data
-                team_data = self.get_team_data(game_id, team_id)
-                
-                if team_data:
-                    game_has_data = True
-                    # Process player data
-                    processed_data = self.process_player_data(team_data, game_id, team_id)
-                    all_player_data.extend(processed_data)
-                    
-                    # Extract team totals
-                    team_totals = self.extract_team_totals(team_data, game_id, team_id)
-                    if team_totals:
-                        all_team_totals.append(team_totals)
-                    
-                    print(f"    Found {len(processed_data)} players and team totals for team {team_id}")
-                else:
-                    print(f"    No data found for team {team_id}")
-                
-                # Be respectful with delays
-                time.sleep(delay)
+            found = self.scrape_game(game_id, team_ids, delay=delay, verbose=True)
+            for _, processed_data, team_totals in found:
+                all_player_data.extend(processed_data)
+                if team_totals:
+                    all_team_totals.append(team_totals)
             
-            if not game_has_data:
+            if not found:
                 print(f"  No data found for game {game_id}")
         
+        print(f"Made {self.requests_made - requests_before} box score requests for {total_games} games")
+        return all_player_data, all_team_totals
+    
+    def _scrape_concurrent(self, game_ids: List[int], team_ids: List[int], workers: int, requests_per_second: float):
+        """scrape_games_range on a bounded worker pool sharing one per-host request budget"""
+        results = [None] * len(game_ids)
+        report_every = max(1, len(game_ids) // 20)
+        failures = 0
+        requests_before = self.requests_made
+        
+        print(f"Starting concurrent scrape of {len(game_ids)} games "
+              f"({workers} workers, {requests_per_second:g} req/s)...")
+        self.rate_budget = HostRateBudget(requests_per_second)
+        started = time.time()
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rotowire') as executor:
+                futures = {executor.submit(self.scrape_game, game_id, team_ids): index
+                           for index, game_id in enumerate(game_ids)}
+                for done, future in enumerate(as_completed(futures), 1):
+                    index = futures[future]
+                    try:
+                        results[index] = future.result()
+                    except Exception as e:
+                        failures += 1
+                        print(f"  Error processing game {game_ids[index]}: {e}")
+                    if done % report_every == 0 or done == len(game_ids):
+                        elapsed = max(time.time() - started, 1e-9)
+                        remaining = (len(game_ids) - done) / (done / elapsed)
+                        requests = self.requests_made - requests_before
+                        print(f"  {done}/{len(game_ids)} games, {requests} requests in {elapsed:.0f}s "
+                              f"({requests / elapsed:.1f} req/s, ~{remaining:.0f}s left)")
+        finally:
+            self.rate_budget = None
+        
+        all_player_data, all_team_totals, games_with_data = self._collect(game_ids, results)
+        print(f"Scraped {len(game_ids)} games with {self.requests_made - requests_before} requests in "
+              f"{time.time() - started:.1f}s: {games_with_data} with data, {len(all_player_data)} player rows, "
+              f"{failures} errors")
+        
+        return all_player_data, all_team_totals
+    
+    def _scrape_async(self, game_ids: List[int], team_ids: List[int]):
+        """scrape_games_range on the async fetch backend: games fetched concurrently, parsed in range order"""
+        requests_before = self.requests_made
+        print(f"Starting async scrape of {len(game_ids)} games ({self.fetcher.concurrency} connections, "
+              f"{self.fetcher.requests_per_second:g} req/s)...")
+        started = time.time()
+        fetched = self.fetcher.map(lambda game_id: self.fetch_game_async(game_id, team_ids), game_ids)
+        results = [self.parse_game(game_id, teams) if teams else [] for game_id, teams in zip(game_ids, fetched)]
+        
+        all_player_data, all_team_totals, games_with_data = self._collect(game_ids, results)
+        print(f"Scraped {len(game_ids)} games with {self.requests_made - requests_before} requests in "
+              f"{time.time() - started:.1f}s: {games_with_data} with data, {len(all_player_data)} player rows, "
+              f"{sum(1 for teams in fetched if teams is None)} errors")
+        print(f"Async fetches: {self.fetcher.summary()}")
+        
         return all_player_data, all_team_totals
+    
+    def _collect(self, game_ids: List[int], results: List) -> tuple:
+        """(player rows, team totals, games with data) assembled in game order, as the serial loop would"""
+        all_player_data = []
+        all_team_totals = []
+        games_with_data = 0
+        for game_id, found in zip(game_ids, results):
+            if not found:
+                print(f"  No data found for game {game_id}")
+                continue
+            games_with_data += 1
+            for _, processed_data, team_totals in found:
+                all_player_data.extend(processed_data)
+                if team_totals:
+                    all_team_totals.append(team_totals)
+        return all_player_data, all_team_totals, games_with_data
+
+    def _scrape_game_with_date(self, game_id: int, team_ids: List[int], delay: float = 0.0, verbose: bool = False,
+                               stored_teams: Iterable[int] = ()):
+        """scrape_game plus the game date (from the date cache, only looked up when the game had data)"""
+        found = self.scrape_game(game_id, team_ids, delay=delay, verbose=verbose, stored_teams=stored_teams)
+        return found, self.game_dates.get(game_id) if found else None
+    
+    def _scrape_window_async(self, game_ids: List[int], team_ids: List[int], stored_teams: Dict[int, set],
+                             workers: int, requests_per_second: float) -> List[Optional[tuple]]:
+        """
+        _scrape_game_with_date for a window of games on the async backend: (found, game_date)
+        per game in order, None where the fetch raised. Dates of the games with data are
+        resolved afterwards on `workers` threads.
+        """
+        fetched = self.fetcher.map(
+            lambda game_id: self.fetch_game_async(game_id, team_ids, stored_teams=stored_teams.get(game_id, ())),
+            game_ids)
+        dates = self.resolve_game_dates([game_id for game_id, teams in zip(game_ids, fetched) if teams],
+                                        workers=workers, requests_per_second=requests_per_second)
+        return [None if teams is None else (self.parse_game(game_id, teams), dates.get(game_id))
+                for game_id, teams in zip(game_ids, fetched)]
+    
+    def plan_range(self, start_game_id: int, end_game_id: int, refresh: bool = False) -> Dict:
+        """
+        The games of a range still to fetch, from the stored (game, team) pairs loaded once
+        
+        Returns game_ids (range order), stored_teams / stored_rows for games with only some
+        teams stored (a run that stopped between teams), and games_skipped / pairs_skipped.
+        Recent games are refetched in full so their final stats replace a mid-game
+        scrape. With `refresh` nothing is skipped.
+        """
+        game_ids = list(range(start_game_id, end_game_id - 1, -1))
+        plan = {'game_ids': game_ids, 'stored_teams': {}, 'stored_rows': {}, 'games_skipped': 0, 'pairs_skipped': 0}
+        if refresh:
+            return plan
+        
+        scraped = self.scraped_teams()
+        recent = self.recent_games()
+        completed = self.completed_games(scraped) - recent
+        plan['games_skipped'] = sum(1 for game_id in game_ids if game_id in completed)
+        plan['pairs_skipped'] = sum(len(scraped.get(game_id, ())) for game_id in game_ids if game_id in completed)
+        game_ids = plan['game_ids'] = [game_id for game_id in game_ids if game_id not in completed]
+        stored_teams = plan['stored_teams'] = {game_id: scraped[game_id] for game_id in game_ids
+                                               if game_id in scraped and game_id not in recent}
+        if stored_teams:
+            plan['stored_rows'] = dict(self.writer.query(
+                'SELECT game_id, COUNT(*) FROM games WHERE game_id BETWEEN ? AND ? GROUP BY game_id',
+                (min(stored_teams), max(stored_teams))))
+        plan['pairs_skipped'] += sum(len(teams) for teams in stored_teams.values())
+        if plan['games_skipped'] or stored_teams:
+            print(f"Skipping {plan['games_skipped']} games already scraped ({plan['pairs_skipped']} team pairs stored); "
+                  f"{len(game_ids)} games to scrape")
+        return plan
+    
+    def scrape_range_to_database(self, start_game_id: int, end_game_id: int, team_ids: List[int], delay: float = 1.0,
+                                 workers: int = 1, requests_per_second: float = ROTOWIRE_REQUESTS_PER_SECOND,
+                                 refresh: bool = False) -> Dict[str, int]:
+        """
+        Scrape a range of game IDs, committing each game as soon as it is parsed
+        
+        Every game's rows and its game_info checkpoint go in one transaction, so an
+        interrupted run loses at most the games in flight. The games and (game, team)
+        pairs already stored are loaded once up front and not requested again, so a
+        rerun or a daily run over an overlapping range only fetches new (and recent)
+        games; `refresh` refetches everything. Either way only rows whose stats
+        changed are rewritten (see PLAYER_UPSERT). Games are
+        committed in range order; with workers > 1 at most 2 * workers games are
+        held in memory at once. With the async fetch backend games are fetched in
+        windows of 2 * its concurrency, each committed before the next is fetched.
+        """
+        plan = self.plan_range(start_game_id, end_game_id, refresh)
+        game_ids, stored_teams, stored_rows = plan['game_ids'], plan['stored_teams'], plan['stored_rows']
+        
+        totals = {'games': 0, 'games_with_data': 0, 'players_saved': 0, 'teams_saved': 0, 'errors': 0,
+                  'games_skipped': plan['games_skipped'], 'pairs_skipped': plan['pairs_skipped'], 'pairs_fetched': 0}
+        requests_before = self.requests_made
+        started = time.time()
+        
+        def commit(game_id, found, game_date):
+            totals['games'] += 1
+            if not found:
+                print(f"  No data found for game {game_id}")
+                return
+            players_saved, teams_saved = self.save_game(game_id, found, game_date,
+                                                        stored_rows=stored_rows.get(game_id, 0),
+                                                        stored_teams=stored_teams.get(game_id, ()))
+            totals['pairs_fetched'] += len(found)
+            totals['games_with_data'] += 1
+            totals['players_saved'] += players_saved
+            totals['teams_saved'] += teams_saved
+            if workers > 1 or totals['games'] % 10 == 0:
+                elapsed = max(time.time() - started, 1e-9)
+                print(f"  Committed game {game_id} ({totals['games']}/{len(game_ids)}, "
+                      f"{(self.requests_made - requests_before) / elapsed:.1f} req/s)")
+        
+        try:
+            if self.fetcher is not None:
+                window = 2 * self.fetcher.concurrency
+                for start in range(0, len(game_ids), window):
+                    chunk = game_ids[start:start + window]
+                    for game_id, result in zip(chunk, self._scrape_window_async(chunk, team_ids, stored_teams,
+                                                                                workers, requests_per_second)):
+                        if result is None:
+                            # The fetcher has printed the error
+                            totals['errors'] += 1
+                            result = [], None
+                        commit(game_id, *result)
+            elif workers <= 1:
+                for i, game_id in enumerate(game_ids, 1):
+                    print(f"Processing game {i}/{len(game_ids)} (ID: {game_id})...")
+                    commit(game_id, *self._scrape_game_with_date(game_id, team_ids, delay=delay, verbose=True,
+                                                                 stored_teams=stored_teams.get(game_id, ())))
+            else:
+                self.rate_budget = HostRateBudget(requests_per_second)
+                remaining = iter(game_ids)
+                in_flight = {}
+                with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='rotowire') as executor:
+                    def submit_next():
+                        game_id = next(remaining, None)
+                        if game_id is not None:
+                            in_flight[game_id] = executor.submit(self._scrape_game_with_date, game_id, team_ids,
+                                                                 stored_teams=stored_teams.get(game_id, ()))
+                    
+                    for _ in range(workers * 2):
+                        submit_next()
+                    # Commit strictly in range order; later games wait in the window
+                    for game_id in game_ids:
+                        future = in_flight.pop(game_id)
+                        try:
+                            found, game_date = future.result()
+                        except Exception as e:
+                            totals['errors'] += 1
+                            print(f"  Error processing game {game_id}: {e}")
+                            found, game_date = [], None
+                        commit(game_id, found, game_date)
+                        submit_next()
+        finally:
+            self.rate_budget = None
+            self.writer.flush()
+        
+        print(f"Scraped {totals['games']} games with {self.requests_made - requests_before} requests in "
+              f"{time.time() - started:.1f}s: {totals['games_with_data']} with data, {totals['players_saved']} new "
+              f"or changed player records, {totals['teams_saved']} team totals, {totals['errors']} errors")
+        print(f"Team pairs: {totals['pairs_skipped']} skipped (already stored), {totals['pairs_fetched']} fetched")
+        print(f"Game dates: {self.game_dates.summary()}")
+        print(f"Database writes: {self.writer.summary()}")
+        return totals
 
 # Example usage
 def main():
+    parser = argparse.ArgumentParser(description='Scrape Rotowire box scores into games.db')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Refetch games already stored and update the rows that changed (default: skip them)')
+    parser.add_argument('--archive', help='Archive raw responses in this directory (see archive.py)')
+    args = parser.parse_args()
+    if args.archive:
+        enable_archive(args.archive)
+    
     scraper = RotowireScraper(db_name="games.db")
     
     # Define team IDs to scrape
@@ -484,14 +935,15 @@ def main():
     start_game_id = start
     end_game_id = end
     
-    # Scrape data for the range of games
+    # Scrape the range, committing game by game; games already stored are skipped unless --refresh
     print(f"Scraping games from {start_game_id} to {end_game_id}...")
-    player_data, team_totals = scraper.scrape_games_range(start_game_id, end_game_id, common_team_ids, delay=0.5)
+    totals = scraper.scrape_range_to_database(start_game_id, end_game_id, common_team_ids, delay=0.5,
+                                              workers=int(os.environ.get('ROTOWIRE_WORKERS', '1')),
+                                              refresh=args.refresh)
     
     # Save results to database
-    if player_data or team_totals:
-        scraper.save_to_database(player_data, team_totals)
-        print(f"Scraped {len(player_data)} player records and {len(team_totals)} team totals")
+    if totals['games_with_data']:
+        print(f"Saved {totals['players_saved']} player records and {totals['teams_saved']} team totals")
         
         # Calculate player ratings after scraping
         print("\nCalculating player ratings...")
@@ -515,6 +967,8 @@ def main():
         print(game_info_sample)
         
         conn.close()
+    elif totals['games_skipped']:
+        print(f"No new games: {totals['games_skipped']} already scraped (use --refresh to refetch them)")
     else:
         print("No data was scraped")
 
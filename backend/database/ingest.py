@@ -0,0 +1,371 @@
+"""
+Pipelined fetch -> parse -> write ingestion for the Rotowire scrapers
+
+The scrapers fetch, parse and write each item in turn, so every network wait
+also stalls parsing and SQLite. Pipeline runs the three as stages joined by
+bounded queues: `fetch_workers` threads doing HTTP under one requests-per-second
+budget for the host, `parse_workers` threads turning responses into rows, and a
+single writer thread committing through the scraper's SQLiteWriter. Fetchers
+block once `queue_size` responses are waiting, so memory stays flat.
+
+A scraper plugs in as a Source: tasks() lists the work, fetch() is the network
+part, parse() the CPU part and write() the database part (always called on the
+writer thread). Box scores (games.py), team schedules (team_schedule.py) and
+team rosters (teams.py) are defined below.
+
+Usage:
+    python ingest.py boxscores --start 2879553 --end 2879453 [--refresh]
+    python ingest.py schedules [--teams GSW LAL ...]
+    python ingest.py rosters [--refresh]
+"""
+import argparse
+import queue
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+import requests
+
+from archive import enable as enable_archive, new_session
+from async_fetch import ROTOWIRE_FETCH_BACKEND
+from games import ROTOWIRE_REQUESTS_PER_SECOND, HostRateBudget, RotowireScraper
+from team_schedule import RotowireScraper as ScheduleScraper
+from teams import TeamRosterScraper
+
+NBA_TEAM_CODES = [
+    'ATL', 'BOS', 'BKN', 'CHA', 'CHI', 'CLE', 'DAL', 'DEN', 'DET', 'GSW',
+    'HOU', 'IND', 'LAC', 'LAL', 'MEM', 'MIA', 'MIL', 'MIN', 'NOP', 'NYK',
+    'OKC', 'ORL', 'PHI', 'PHX', 'POR', 'SAC', 'SAS', 'TOR', 'UTA', 'WAS'
+]
+BOX_SCORE_TEAM_IDS = list(range(1, 30)) + [5312]
+
+_DONE = object()
+
+
+class Source:
+    """One scraper's stage definitions; fetch and parse run on worker threads, the rest on the writer thread"""
+
+    name = 'source'
+
+    def start(self, budget: HostRateBudget):
+        """Called before any task runs, with the host budget fetches must wait on"""
+
+    def tasks(self) -> Iterable[Any]:
+        raise NotImplementedError
+
+    def fetch(self, task) -> Any:
+        """Network part; None means the task has no data"""
+        raise NotImplementedError
+
+    def parse(self, task, raw) -> Any:
+        """CPU part"""
+        return raw
+
+    def write(self, task, parsed) -> int:
+        """Database part; returns rows written"""
+        raise NotImplementedError
+
+    def missing(self, task):
+        """The task's fetch returned nothing"""
+
+    def failed(self, task, stage: str, error: Exception):
+        print(f"  Error in {stage} for {self.name} {task}: {error}")
+
+    def finish(self):
+        """Called once the writer has drained, also after an error"""
+
+
+class Pipeline:
+    """Bounded fetch -> parse -> write queues with worker pools for the first two stages"""
+
+    def __init__(self, fetch_workers: int = 4, parse_workers: int = 2, queue_size: int = 32,
+                 requests_per_second: float = ROTOWIRE_REQUESTS_PER_SECOND):
+        self.fetch_workers = fetch_workers
+        self.parse_workers = parse_workers
+        self.queue_size = queue_size
+        self.requests_per_second = requests_per_second
+
+    def run(self, source: Source) -> Dict:
+        """Run every task of `source` through the stages; returns per-stage counts and timings"""
+        tasks = queue.Queue(self.queue_size)
+        fetched = queue.Queue(self.queue_size)
+        parsed = queue.Queue(self.queue_size)
+        lock = threading.Lock()
+        stats = {
+            'tasks': 0, 'written': 0, 'rows': 0, 'missing': 0, 'errors': 0,
+            'busy_seconds': {'fetch': 0.0, 'parse': 0.0, 'write': 0.0},
+        }
+
+        def timed(stage, fn, *args):
+            started = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                with lock:
+                    stats['busy_seconds'][stage] += time.perf_counter() - started
+
+        def fetch_worker():
+            while True:
+                task = tasks.get()
+                if task is _DONE:
+                    return
+                try:
+                    raw = timed('fetch', source.fetch, task)
+                    fetched.put(('ok', task, raw) if raw is not None else ('missing', task, None))
+                except Exception as e:
+                    fetched.put(('error', task, ('fetch', e)))
+
+        def parse_worker():
+            while True:
+                item = fetched.get()
+                if item is _DONE:
+                    return
+                kind, task, payload = item
+                if kind == 'ok':
+                    try:
+                        item = ('ok', task, timed('parse', source.parse, task, payload))
+                    except Exception as e:
+                        item = ('error', task, ('parse', e))
+                parsed.put(item)
+
+        def write_worker():
+            while True:
+                item = parsed.get()
+                if item is _DONE:
+                    return
+                kind, task, payload = item
+                try:
+                    if kind == 'ok':
+                        rows = timed('write', source.write, task, payload)
+                        stats['written'] += 1
+                        stats['rows'] += rows or 0
+                    elif kind == 'missing':
+                        stats['missing'] += 1
+                        source.missing(task)
+                    else:
+                        stats['errors'] += 1
+                        source.failed(task, *payload)
+                except Exception as e:
+                    stats['errors'] += 1
+                    source.failed(task, 'write', e)
+
+        def start_threads(target, count, prefix):
+            threads = [threading.Thread(target=target, name=f"{prefix}-{i}", daemon=True) for i in range(count)]
+            for thread in threads:
+                thread.start()
+            return threads
+
+        started = time.time()
+        source.start(HostRateBudget(self.requests_per_second))
+        try:
+            fetchers = start_threads(fetch_worker, self.fetch_workers, f"{source.name}-fetch")
+            parsers = start_threads(parse_worker, self.parse_workers, f"{source.name}-parse")
+            writer = start_threads(write_worker, 1, f"{source.name}-write")
+
+            for task in source.tasks():
+                tasks.put(task)
+                stats['tasks'] += 1
+            # Shut the stages down in order, each after the one feeding it has drained
+            for _ in fetchers:
+                tasks.put(_DONE)
+            for thread in fetchers:
+                thread.join()
+            for _ in parsers:
+                fetched.put(_DONE)
+            for thread in parsers:
+                thread.join()
+            parsed.put(_DONE)
+            writer[0].join()
+        finally:
+            source.finish()
+
+        stats['seconds'] = round(time.time() - started, 2)
+        busy = stats['busy_seconds']
+        for stage in busy:
+            busy[stage] = round(busy[stage], 2)
+        print(f"{source.name}: {stats['tasks']} tasks in {stats['seconds']}s "
+              f"({stats['written']} written, {stats['rows']} rows, {stats['missing']} without data, "
+              f"{stats['errors']} errors); busy fetch {busy['fetch']}s over {self.fetch_workers} workers, "
+              f"parse {busy['parse']}s over {self.parse_workers}, write {busy['write']}s")
+        return stats
+
+
+# ========== SOURCES ==========
+
+class BoxScoreSource(Source):
+    """games.py box scores: one task per game id, committed game by game with its checkpoint"""
+
+    name = 'boxscores'
+
+    def __init__(self, scraper: RotowireScraper, start_game_id: int, end_game_id: int,
+                 team_ids: List[int] = BOX_SCORE_TEAM_IDS, refresh: bool = False):
+        self.scraper = scraper
+        self.start_game_id = start_game_id
+        self.end_game_id = end_game_id
+        self.team_ids = team_ids
+        self.refresh = refresh
+        self.plan: Dict = {}
+
+    def start(self, budget: HostRateBudget):
+        # Games (and team pairs) already stored are skipped unless refresh
+        self.plan = self.scraper.plan_range(self.start_game_id, self.end_game_id, self.refresh)
+        self.scraper.rate_budget = budget
+
+    def tasks(self) -> Iterable[int]:
+        return self.plan['game_ids']
+
+    def fetch(self, game_id: int):
+        fetched = self.scraper.fetch_game(game_id, self.team_ids,
+                                          stored_teams=self.plan['stored_teams'].get(game_id, ()))
+        if not fetched:
+            return None
+        return fetched, self.scraper.game_dates.get(game_id)
+
+    def parse(self, game_id: int, raw):
+        fetched, game_date = raw
+        return self.scraper.parse_game(game_id, fetched), game_date
+
+    def write(self, game_id: int, parsed) -> int:
+        found, game_date = parsed
+        players_saved, teams_saved = self.scraper.save_game(
+            game_id, found, game_date, stored_rows=self.plan['stored_rows'].get(game_id, 0),
+            stored_teams=self.plan['stored_teams'].get(game_id, ()))
+        return players_saved + teams_saved
+
+    def finish(self):
+        self.scraper.rate_budget = None
+        self.scraper.writer.flush()
+
+
+class ScheduleSource(Source):
+    """team_schedule.py schedules: one task per team abbreviation"""
+
+    name = 'schedules'
+
+    def __init__(self, scraper: ScheduleScraper, teams: List[str] = NBA_TEAM_CODES):
+        self.scraper = scraper
+        self.teams = teams
+
+    def start(self, budget: HostRateBudget):
+        self.scraper.rate_budget = budget
+
+    def tasks(self) -> Iterable[str]:
+        return self.teams
+
+    def fetch(self, team: str) -> Optional[bytes]:
+        return self.scraper.fetch_team_schedule(team)
+
+    def parse(self, team: str, page: bytes) -> List[Dict]:
+        return self.scraper.parse_team_schedule(page, team)
+
+    def write(self, team: str, schedule_data: List[Dict]) -> int:
+        return self.scraper.save_team_schedule(schedule_data, refresh_indexes=False)
+
+    def finish(self):
+        self.scraper.rate_budget = None
+        self.scraper.game_teams.refresh()
+        self.scraper.game_dates.refresh()
+
+
+class RosterSource(Source):
+    """teams.py rosters: one task per team code, logged in team_scraping_log like scrape_all_teams"""
+
+    name = 'rosters'
+
+    def __init__(self, scraper: TeamRosterScraper, team_codes: List[str] = NBA_TEAM_CODES, refresh: bool = False):
+        self.scraper = scraper
+        self.team_codes = team_codes
+        self.refresh = refresh
+        self.budget: Optional[HostRateBudget] = None
+        self._thread_local = threading.local()
+
+    def start(self, budget: HostRateBudget):
+        self.budget = budget
+
+    def tasks(self) -> Iterable[str]:
+        if self.refresh:
+            return list(self.team_codes)
+        logged = {row[0] for row in self.scraper.writer.query('SELECT team_code FROM team_scraping_log')}
+        return [team_code for team_code in self.team_codes if team_code not in logged]
+
+    def _session(self) -> requests.Session:
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self._thread_local.session = new_session(self.scraper.headers)
+        return session
+
+    def fetch(self, team_code: str) -> Optional[Dict]:
+        self.budget.wait()
+        return self.scraper.get_team_data(team_code, session=self._session())
+
+    def parse(self, team_code: str, data: Dict) -> tuple:
+        return (
+            self.scraper.process_bio_data(data.get('bio', []), team_code),
+            self.scraper.process_totals_data(data.get('totals', []), team_code),
+            self.scraper.process_per_game_data(data.get('perGame', []), team_code),
+            self.scraper.process_other_data(data.get('other', []), team_code),
+        )
+
+    def write(self, team_code: str, parsed: tuple) -> int:
+        self.scraper.save_to_database(team_code, *parsed)
+        self.scraper.log_scraping_attempt(team_code, True, "")
+        return sum(len(rows) for rows in parsed)
+
+    def missing(self, team_code: str):
+        self.scraper.log_scraping_attempt(team_code, False, "No data returned from API")
+
+    def failed(self, team_code: str, stage: str, error: Exception):
+        error_msg = f"Error in {stage} for team {team_code}: {error}"
+        print(error_msg)
+        self.scraper.log_scraping_attempt(team_code, False, error_msg)
+
+    def finish(self):
+        self.scraper.writer.flush()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a Rotowire scraper through the fetch/parse/write pipeline')
+    parser.add_argument('--fetch-workers', type=int, default=4)
+    parser.add_argument('--parse-workers', type=int, default=2)
+    parser.add_argument('--queue-size', type=int, default=32)
+    parser.add_argument('--requests-per-second', type=float, default=ROTOWIRE_REQUESTS_PER_SECOND)
+    parser.add_argument('--archive', help='Archive raw responses in this directory (see archive.py)')
+    sources = parser.add_subparsers(dest='source', required=True)
+
+    boxscores = sources.add_parser('boxscores', help='Box scores into games.db')
+    boxscores.add_argument('--start', type=int, required=True, help='First game id (the range runs downwards)')
+    boxscores.add_argument('--end', type=int, required=True, help='Last game id')
+    boxscores.add_argument('--refresh', action='store_true', help='Refetch games already stored')
+    boxscores.add_argument('--db', default='games.db')
+
+    schedules = sources.add_parser('schedules', help='Team schedules into games.db')
+    schedules.add_argument('--teams', nargs='+', default=NBA_TEAM_CODES)
+    schedules.add_argument('--db', default='games.db')
+
+    rosters = sources.add_parser('rosters', help='Team rosters into team_stats.db')
+    rosters.add_argument('--refresh', action='store_true', help='Refetch teams already logged')
+    rosters.add_argument('--db', default='team_stats.db')
+    args = parser.parse_args()
+    if args.archive:
+        enable_archive(args.archive)
+    # The pipeline's fetch workers are its concurrency; the scrapers' async backend is not used here
+    if ROTOWIRE_FETCH_BACKEND != 'requests':
+        print(f"Note: ROTOWIRE_FETCH_BACKEND={ROTOWIRE_FETCH_BACKEND} is ignored by the pipeline; "
+              f"fetching on {args.fetch_workers} worker threads")
+
+    if args.source == 'boxscores':
+        source = BoxScoreSource(RotowireScraper(db_name=args.db, fetch_backend='requests'), args.start, args.end,
+                                refresh=args.refresh)
+    elif args.source == 'schedules':
+        source = ScheduleSource(ScheduleScraper(db_name=args.db, fetch_backend='requests'), args.teams)
+    else:
+        source = RosterSource(TeamRosterScraper(db_name=args.db, fetch_backend='requests'), refresh=args.refresh)
+
+    pipeline = Pipeline(fetch_workers=args.fetch_workers, parse_workers=args.parse_workers,
+                        queue_size=args.queue_size, requests_per_second=args.requests_per_second)
+    pipeline.run(source)
+    print(f"Database writes: {source.scraper.writer.summary()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,16 @@ import pandas as pd
 from typing import Dict, List
 import sqlite3
 from datetime import datetime
+import os
+
+from archive import new_session
+
+# Point at a local stand-in (upstream_standin.py) for benchmarks and replays
+ROTOWIRE_BASE_URL = os.environ.get('ROTOWIRE_BASE_URL', 'https://www.rotowire.com').rstrip('/')
 
 class RotowireStandingsScraper:
     def __init__(self, db_name: str = "nba_standings.db"):
-        self.base_url = "https://www.rotowire.com/basketball/ajax/standings-page-data.php"
+        self.base_url = f"{ROTOWIRE_BASE_URL}/basketball/ajax/standings-page-data.php"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
             'Accept': 'application/json, text/javascript, */*; q=0.01',
@@ -20,8 +26,7 @@ class RotowireStandingsScraper:
             'Sec-Fetch-Site': 'same-origin',
             'X-Requested-With': 'XMLHttpRequest'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = new_session(self.headers)
         self.db_name = db_name
         self.setup_database()
     
@@ -114,7 +119,7 @@ class RotowireStandingsScraper:
         params = {'season': season}
         
         try:
-            response = self.session.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             
             data = response.json()
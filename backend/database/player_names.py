@@ -5,14 +5,24 @@ import time
 from datetime import datetime
 import pandas as pd
 import re
+import os
+
+from archive import new_session
+from storage import SQLiteWriter
+
+# Point at a local stand-in (upstream_standin.py) for benchmarks and replays
+ROTOWIRE_BASE_URL = os.environ.get('ROTOWIRE_BASE_URL', 'https://www.rotowire.com').rstrip('/')
 
 class PlayerNameScraper:
     def __init__(self, db_name: str = "player_stats.db"):
         self.db_name = db_name
-        self.base_url = "https://www.rotowire.com/basketball/player/"
+        self.writer = SQLiteWriter(db_name)
+        self.name_column_ready = False
+        self.base_url = f"{ROTOWIRE_BASE_URL}/basketball/player/"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:124.0) Gecko/20100101 Firefox/124.0',
         }
+        self.session = new_session(self.headers)
         # Cache of known player ID to name mappings
         self.known_players = {
             3014: "stephen-curry",
@@ -23,63 +33,44 @@ class PlayerNameScraper:
     
     def ensure_player_name_column(self):
         """Make sure the players table has a player_name column"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
         try:
             # Check if player_name column exists
-            cursor.execute("PRAGMA table_info(players)")
-            columns = [column[1] for column in cursor.fetchall()]
+            columns = [column[1] for column in self.writer.query("PRAGMA table_info(players)")]
             
             if 'player_name' not in columns:
                 print("Adding player_name column to players table...")
-                cursor.execute("ALTER TABLE players ADD COLUMN player_name TEXT")
-                conn.commit()
+                self.writer.execute("ALTER TABLE players ADD COLUMN player_name TEXT")
                 print("player_name column added successfully")
             else:
                 print("player_name column already exists")
+            self.name_column_ready = True
                 
         except Exception as e:
             print(f"Error ensuring player_name column exists: {e}")
-        finally:
-            conn.close()
     
     def get_player_ids_in_range(self, start_id, end_id):
         """Get player IDs in a specific range from the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT player_id FROM players WHERE player_id BETWEEN ? AND ? ORDER BY player_id", 
-                      (start_id, end_id))
-        player_ids = [row[0] for row in cursor.fetchall()]
-        
-        conn.close()
-        return player_ids
+        rows = self.writer.query("SELECT player_id FROM players WHERE player_id BETWEEN ? AND ? ORDER BY player_id", 
+                                 (start_id, end_id))
+        return [row[0] for row in rows]
     
     def player_has_name(self, player_id):
         """Check if a player already has a name in the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
         try:
             # First check if the column exists
-            cursor.execute("PRAGMA table_info(players)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'player_name' not in columns:
-                return False  # Column doesn't exist, so no players have names
+            if not self.name_column_ready:
+                columns = [column[1] for column in self.writer.query("PRAGMA table_info(players)")]
+                if 'player_name' not in columns:
+                    return False  # Column doesn't exist, so no players have names
             
             # Check if this player has a name
-            cursor.execute("SELECT player_name FROM players WHERE player_id = ?", (player_id,))
-            result = cursor.fetchone()
+            result = self.writer.query("SELECT player_name FROM players WHERE player_id = ?", (player_id,))
             
-            return result and result[0] is not None
+            return bool(result) and result[0][0] is not None
             
         except Exception as e:
             print(f"Error checking if player {player_id} has name: {e}")
             return False
-        finally:
-            conn.close()
     
     def extract_name_from_known_players(self, player_id):
         """Try to get name from our known players mapping"""
@@ -90,7 +81,7 @@ class PlayerNameScraper:
         url = f"{self.base_url}{player_id}"
         
         try:
-            response = requests.get(url, headers=self.headers, timeout=10, allow_redirects=True)
+            response = self.session.get(url, timeout=10, allow_redirects=True)
             response.raise_for_status()
             
             # If we were redirected, extract name from the redirected URL
@@ -126,12 +117,12 @@ class PlayerNameScraper:
     
     def try_search_method(self, player_id):
         """Alternative method: search for the player using Rotowire's search"""
-        search_url = "https://www.rotowire.com/basketball/search.php"
+        search_url = f"{ROTOWIRE_BASE_URL}/basketball/search.php"
         
         try:
             # First try to search by ID
             params = {"search": str(player_id)}
-            response = requests.get(search_url, params=params, headers=self.headers, timeout=10)
+            response = self.session.get(search_url, params=params, timeout=10)
             response.raise_for_status()
             
             soup = BeautifulSoup(response.content, 'html.parser')
@@ -188,7 +179,7 @@ class PlayerNameScraper:
             test_url = f"{self.base_url}{test_name}-{player_id}"
             
             try:
-                response = requests.get(test_url, headers=self.headers, timeout=5, allow_redirects=True)
+                response = self.session.get(test_url, timeout=5, allow_redirects=True)
                 
                 # If we get a successful response and it's not a redirect to a different ID
                 if response.status_code == 200:
@@ -236,31 +227,22 @@ class PlayerNameScraper:
         return None
     
     def update_player_name(self, player_id, player_name):
-        """Update the player name in the database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
+        """Queue the player name update on the shared writer"""
         try:
             # First, make sure the column exists
-            cursor.execute("PRAGMA table_info(players)")
-            columns = [column[1] for column in cursor.fetchall()]
-            
-            if 'player_name' not in columns:
-                cursor.execute("ALTER TABLE players ADD COLUMN player_name TEXT")
+            if not self.name_column_ready:
+                self.ensure_player_name_column()
             
             # Update the player name
-            cursor.execute(
+            self.writer.write_one(
                 "UPDATE players SET player_name = ?, scraped_timestamp = ? WHERE player_id = ?",
                 (player_name, datetime.now(), player_id)
             )
             
-            conn.commit()
             print(f"Updated player {player_id} with name: {player_name}")
             
         except Exception as e:
             print(f"Error updating player {player_id}: {e}")
-        finally:
-            conn.close()
     
     def scrape_names_for_range(self, start_id, end_id, delay=1.0):
         """Scrape names for players in a specific ID range"""
@@ -306,6 +288,8 @@ class PlayerNameScraper:
             
             time.sleep(delay)  # Be respectful to the server
         
+        self.writer.flush()
+        print(f"Database writes: {self.writer.summary()}")
         print(f"Finished scraping player names. Successful: {successful}, Failed: {failed}")
         return successful, failed
 
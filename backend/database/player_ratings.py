@@ -1,8 +1,30 @@
+"""
+Player ratings for the games table
+
+add_ratings_to_database rates every player row at once with the vectorized
+formula (excel_formula_vectorized) and writes the ratings that changed in one
+transaction. excel_formula_to_python is the same formula for a single row.
+
+Usage:
+    python player_ratings.py --db games.db
+    python player_ratings.py --benchmark 300000   # parity and timings on a synthetic games table
+"""
+import argparse
+import os
 import sqlite3
+import tempfile
+import time
 from typing import Dict
+import numpy as np
 import pandas as pd
 import math
 
+# Stat columns the rating formula reads, in the order add_ratings_to_database selects them.
+# `ejected` stays out: ratings have always been calculated without it (the formula reads 0).
+RATING_COLUMNS = ['points', 'assists', 'offensive_rebounds', 'defensive_rebounds', 'steals', 'blocks',
+                  'turnovers', 'personal_fouls', 'fg_made', 'fg_attempted', 'three_pt_made',
+                  'ft_made', 'ft_attempted']
+
 class PlayerRatingCalculator:
     def __init__(self, db_path: str):
         """
@@ -90,6 +112,58 @@ class PlayerRatingCalculator:
     
         return round(rating, 2)
     
+    def excel_formula_vectorized(self, stats: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        excel_formula_to_python over whole columns at once
+        
+        Args:
+            stats: RATING_COLUMNS (and optionally 'ejected') -> equal-length arrays (a DataFrame
+                works); missing values count as 0
+        
+        Returns the ratings as a float array, equal to the scalar formula row by row
+        """
+        (points, assists, offrebounds, defrebounds, steals, blocks, turnovers, fouls,
+         fg_made, fg_attempted, three_pt_made, ft_made, ft_attempted) = (
+            np.nan_to_num(np.asarray(stats[column], dtype=np.float64)) for column in RATING_COLUMNS)
+        ejections = np.nan_to_num(np.asarray(stats['ejected'], dtype=np.float64)) if 'ejected' in stats else 0.0
+        fg_missed = fg_attempted - fg_made
+        ft_missed = ft_attempted - ft_made
+        
+        # Double-double/triple-double bonuses; only the first matching branch applies
+        scorer = points > 10
+        rebounder = (offrebounds + defrebounds) > 10
+        passer = assists > 10
+        tdd = np.where(scorer & passer & rebounder, 1.24, 0.0)
+        rdd = np.where(scorer & rebounder & ~passer, 0.38, 0.0)
+        add = np.where(scorer & passer & ~rebounder, 0.44, 0.0)
+        
+        foulrating = np.where(fouls > 5, 2.0, (0.3 * np.log1p(fouls)) + (0.05 * fouls))
+        
+        # Same terms in the same order as the scalar formula, so the sums round identically
+        rating = (
+            ((0.17 * np.log1p(points)) + (0.02 * points)) +
+            ((0.33 * np.log1p(assists)) + (0.06 * assists)) +
+            ((0.17 * np.log1p(offrebounds)) + (0.02 * offrebounds)) +
+            ((0.13 * np.log1p(defrebounds)) + (0.01 * defrebounds)) +
+            ((0.37 * np.log1p(steals)) + (0.06 * steals)) +
+            ((0.34 * np.log1p(blocks)) + (0.05 * blocks)) -
+            ((0.45 * np.log1p(turnovers)) + (0.03 * turnovers)) -
+            foulrating +
+            ((0.11 * np.log1p(fg_made)) + (0.02 * fg_made)) -
+            ((0.12 * np.log1p(fg_missed)) + (0.03 * fg_missed)) +
+            ((0.11 * np.log1p(three_pt_made)) + (0.03 * three_pt_made)) +
+            ((0.01 * np.log1p(ft_attempted))) +
+            ((0.04 * np.log1p(ft_made)) + (0.005 * ft_made)) -
+            ((0.07 * np.log1p(ft_missed)) + (0.02 * ft_missed)) -
+            ((2.5 * np.log1p(ejections))) +
+            tdd +
+            rdd +
+            add
+        )
+        
+        # Python's round, not np.round: they disagree at half-way values (2.675 -> 2.67 vs 2.68)
+        return np.array([round(value, 2) for value in np.clip(6 + rating, 0, 10).tolist()], dtype=np.float64)
+    
     def add_ratings_to_database(self):
         """
         Add ratings to all player records in the games table
@@ -107,44 +181,32 @@ class PlayerRatingCalculator:
             conn.commit()
             print("Added player_rating column to games table")
         
-        # Get all player records (excluding team totals)
-        query = """
-        SELECT id, player_id, game_id, team_id, minutes, points, 
-               fg_made, fg_attempted, fg_percentage,
-               three_pt_made, three_pt_attempted, three_pt_percentage,
-               ft_made, ft_attempted, ft_percentage,
-               offensive_rebounds, defensive_rebounds, total_rebounds,
-               assists, steals, blocks, turnovers, personal_fouls
+        # Stats of all player records (excluding team totals), one array per column
+        query = f"""
+        SELECT id, player_rating, {', '.join(RATING_COLUMNS)}
         FROM games
         WHERE position_sort != 4  -- Exclude team totals
         """
         
-        df = pd.read_sql_query(query, conn)
-        
-        updated_count = 0
-        for _, row in df.iterrows():
-            player_data = row.to_dict()
-            
-            # Calculate rating using your custom Excel formula
-            rating = self.excel_formula_to_python(player_data)
-            
-            # Update the database
-            cursor.execute(
+        rows = cursor.execute(query).fetchall()
+        if not rows:
+            conn.close()
+            print("No player records to rate")
+            return
+        table = np.array(rows, dtype=np.float64)  # NULL -> nan
+        ids, current = table[:, 0].astype(np.int64), table[:, 1]
+        ratings = self.excel_formula_vectorized(dict(zip(RATING_COLUMNS, table[:, 2:].T)))
+        
+        # One transaction; rows whose rating is already current are left alone
+        changed = ratings != current
+        with conn:
+            conn.executemany(
                 "UPDATE games SET player_rating = ? WHERE id = ?",
-                (rating, player_data['id'])
+                zip(ratings[changed].tolist(), ids[changed].tolist())
             )
-            
-            updated_count += 1
-            
-            # Commit every 100 records to avoid locking the database
-            if updated_count % 100 == 0:
-                conn.commit()
-                print(f"Updated {updated_count} records...")
-        
-        conn.commit()
         conn.close()
         
-        print(f"Successfully updated ratings for {updated_count} player records")
+        print(f"Successfully updated ratings for {len(rows)} player records ({int(changed.sum())} changed)")
     
     def validate_ratings(self, sample_size: int = 5):
         """
@@ -170,13 +232,144 @@ class PlayerRatingCalculator:
         
         return df
 
-# Example usage
-if __name__ == "__main__":
+# ========== BENCHMARK ==========
+
+def _legacy_add_ratings(calculator: PlayerRatingCalculator):
+    """The row-at-a-time update this module used before: iterrows, scalar formula, one UPDATE per row"""
+    conn = sqlite3.connect(calculator.db_path)
+    cursor = conn.cursor()
+    query = """
+    SELECT id, player_id, game_id, team_id, minutes, points,
+           fg_made, fg_attempted, fg_percentage,
+           three_pt_made, three_pt_attempted, three_pt_percentage,
+           ft_made, ft_attempted, ft_percentage,
+           offensive_rebounds, defensive_rebounds, total_rebounds,
+           assists, steals, blocks, turnovers, personal_fouls
+    FROM games
+    WHERE position_sort != 4  -- Exclude team totals
+    """
+    df = pd.read_sql_query(query, conn)
+    updated_count = 0
+    for _, row in df.iterrows():
+        player_data = row.to_dict()
+        rating = calculator.excel_formula_to_python(player_data)
+        cursor.execute("UPDATE games SET player_rating = ? WHERE id = ?", (rating, player_data['id']))
+        updated_count += 1
+        if updated_count % 100 == 0:
+            conn.commit()
+    conn.commit()
+    conn.close()
+
+
+def synthetic_games(db_path: str, rows: int, seed: int = 0):
+    """A games table of `rows` random box score lines (every branch of the formula included, ejections too)"""
+    rng = np.random.default_rng(seed)
+    fg_attempted = rng.integers(0, 30, rows)
+    ft_attempted = rng.integers(0, 15, rows)
+    three_pt_made = rng.integers(0, 8, rows)
+    fg_made = np.minimum(rng.binomial(fg_attempted, 0.47), fg_attempted)
+    ft_made = rng.binomial(ft_attempted, 0.78)
+    stats = {
+        'position_sort': rng.integers(1, 4, rows),
+        'player_id': rng.integers(1, 600, rows),
+        'game_id': np.arange(rows) // 20,
+        'team_id': rng.integers(1, 31, rows),
+        'minutes': rng.integers(0, 48, rows),
+        'points': 2 * fg_made + np.minimum(three_pt_made, fg_made) + ft_made,
+        'assists': rng.poisson(4, rows) + 8 * (rng.random(rows) < 0.05),
+        'offensive_rebounds': rng.poisson(1.5, rows),
+        'defensive_rebounds': rng.poisson(4, rows) + 8 * (rng.random(rows) < 0.08),
+        'steals': rng.poisson(1, rows),
+        'blocks': rng.poisson(0.6, rows),
+        'turnovers': rng.poisson(1.8, rows),
+        'personal_fouls': rng.integers(0, 7, rows),
+        'fg_made': fg_made,
+        'fg_attempted': fg_attempted,
+        'three_pt_made': np.minimum(three_pt_made, fg_made),
+        'ft_made': ft_made,
+        'ft_attempted': ft_attempted,
+        'ejected': (rng.random(rows) < 0.002).astype(int),
+        'three_pt_attempted': three_pt_made + rng.integers(0, 6, rows),
+        'total_rebounds': 0,
+    }
+    stats['total_rebounds'] = stats['offensive_rebounds'] + stats['defensive_rebounds']
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"""
+    CREATE TABLE games (id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        {', '.join(f'{column} INTEGER' for column in stats)},
+                        fg_percentage REAL, three_pt_percentage REAL, ft_percentage REAL, player_rating REAL)
+    """)
+    columns = list(stats)
+    values = np.column_stack([stats[column] for column in columns])
+    with conn:
+        conn.executemany(f"INSERT INTO games ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                         values.tolist())
+    conn.close()
+
+
+def check_parity(calculator: PlayerRatingCalculator, db_path: str) -> int:
+    """Rows where the vectorized formula disagrees with excel_formula_to_python, ejections included"""
+    conn = sqlite3.connect(db_path)
+    df = pd.read_sql_query(f"SELECT {', '.join(RATING_COLUMNS)}, ejected FROM games WHERE position_sort != 4", conn)
+    conn.close()
+    vectorized = calculator.excel_formula_vectorized(df).tolist()
+    scalar = [calculator.excel_formula_to_python(row) for row in df.to_dict('records')]
+    return sum(a != b for a, b in zip(vectorized, scalar))
+
+
+def benchmark(rows: int, seed: int = 0):
+    """Parity and timings of the row-at-a-time and vectorized updates over a synthetic games table"""
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, 'games.db')
+        synthetic_games(db_path, rows, seed)
+        calculator = PlayerRatingCalculator(db_path)
+        print(f"{rows:,} synthetic rows: {check_parity(calculator, db_path)} ratings differ from the scalar formula")
+        
+        started = time.perf_counter()
+        _legacy_add_ratings(calculator)
+        legacy = time.perf_counter() - started
+        conn = sqlite3.connect(db_path)
+        expected = conn.execute('SELECT id, player_rating FROM games ORDER BY id').fetchall()
+        conn.execute('UPDATE games SET player_rating = NULL')
+        conn.commit()
+        conn.close()
+        
+        started = time.perf_counter()
+        calculator.add_ratings_to_database()
+        vectorized = time.perf_counter() - started
+        conn = sqlite3.connect(db_path)
+        stored = conn.execute('SELECT id, player_rating FROM games ORDER BY id').fetchall()
+        conn.close()
+        
+        started = time.perf_counter()
+        calculator.add_ratings_to_database()
+        rerun = time.perf_counter() - started
+        
+        print(f"  row-at-a-time: {legacy:.2f}s ({rows / legacy:,.0f} rows/s)")
+        print(f"  vectorized:    {vectorized:.2f}s ({rows / vectorized:,.0f} rows/s), rerun {rerun:.2f}s")
+        print(f"  speedup {legacy / vectorized:.1f}x, stored ratings identical: {stored == expected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Add player ratings to games.db')
+    parser.add_argument('--db', default='games.db')
+    parser.add_argument('--benchmark', type=int, metavar='ROWS',
+                        help='Check parity and time both implementations on a synthetic table instead')
+    args = parser.parse_args()
+    
+    if args.benchmark:
+        benchmark(args.benchmark)
+        return
+    
     # Initialize the calculator
-    calculator = PlayerRatingCalculator("games.db")
+    calculator = PlayerRatingCalculator(args.db)
     
     # Add ratings to all players in the database using your custom formula
     calculator.add_ratings_to_database()
     
     # Validate the results
-    calculator.validate_ratings(sample_size=10)
\ No newline at end of file
+    calculator.validate_ratings(sample_size=10)
+
+
+if __name__ == "__main__":
+    main()
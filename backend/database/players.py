@@ -5,10 +5,18 @@ import json
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
+import os
+
+from archive import new_session
+from async_fetch import ROTOWIRE_FETCH_BACKEND, async_fetcher
+from storage import SQLiteWriter
+
+# Point at a local stand-in (upstream_standin.py) for benchmarks and replays
+ROTOWIRE_BASE_URL = os.environ.get('ROTOWIRE_BASE_URL', 'https://www.rotowire.com').rstrip('/')
 
 class PlayerStatsScraper:
-    def __init__(self, db_name: str = "player_stats.db"):
-        self.base_url = "https://www.rotowire.com/basketball/ajax/player-page-data.php"
+    def __init__(self, db_name: str = "player_stats.db", fetch_backend: str = ROTOWIRE_FETCH_BACKEND):
+        self.base_url = f"{ROTOWIRE_BASE_URL}/basketball/ajax/player-page-data.php"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:124.0) Gecko/20100101 Firefox/124.0',
             'Accept': 'application/json, text/javascript, */*; q=0.01',
@@ -21,14 +29,16 @@ class PlayerStatsScraper:
             'Sec-Fetch-Site': 'same-origin',
             'TE': 'trailers'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = new_session(self.headers)
+        # 'async' fetches scrape_player_range through an AsyncFetcher (see async_fetch.py)
+        self.fetcher = async_fetcher(fetch_backend, self.headers)
         self.db_name = db_name
+        self.writer = SQLiteWriter(db_name)
         self.setup_database()
         
     def setup_database(self):
         """Set up the SQLite database for player statistics"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.writer.conn
         cursor = conn.cursor()
         
         # Player basic info table (simplified as requested)
@@ -202,7 +212,6 @@ class PlayerStatsScraper:
         ''')
         
         conn.commit()
-        conn.close()
     
     def get_player_data(self, player_id: int) -> Optional[Dict]:
         """Get comprehensive player data"""
@@ -213,7 +222,7 @@ class PlayerStatsScraper:
         }
     
         try:
-            response = self.session.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
         
@@ -223,7 +232,7 @@ class PlayerStatsScraper:
         
             # If no data, try with a common team parameter
             params['team'] = 'GSW'
-            response = self.session.get(self.base_url, params=params)
+            response = self.session.get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
         
@@ -238,6 +247,27 @@ class PlayerStatsScraper:
         except json.JSONDecodeError as e:
             print(f"Error parsing JSON for player {player_id}: {e}")
             return None
+    
+    async def get_player_data_async(self, player_id: int) -> Optional[Dict]:
+        """get_player_data through the async backend (same retry with team=GSW)"""
+        params = {'id': player_id, 'nba': 'true'}
+        for team in (None, 'GSW'):
+            if team:
+                params['team'] = team
+            response = await self.fetcher.get(self.base_url, dict(params))
+            if response is None:
+                return None
+            if response.status != 200:
+                print(f"Error fetching data for player {player_id}: HTTP {response.status}")
+                return None
+            try:
+                data = response.json()
+            except ValueError as e:
+                print(f"Error parsing JSON for player {player_id}: {e}")
+                return None
+            if data and isinstance(data, dict) and 'basic' in data:
+                return data
+        return None
         
     def debug_player_info(self, player_id: int):
         """Debug method to help identify extraction issues"""
@@ -528,13 +558,10 @@ class PlayerStatsScraper:
     def save_to_database(self, player_info: Dict, season_stats: List[Dict], 
                         game_logs: List[Dict], advanced_stats: List[Dict], 
                         ratings: List[Dict], splits: List[Dict]):
-        """Save all player data to database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
+        """Queue all player data on the shared writer (committed with the next batch)"""
         # Save player info (simplified to match the new table structure)
         try:
-            cursor.execute('''
+            self.writer.write_one('''
             INSERT OR REPLACE INTO players 
             (player_id, team, current_age, scraped_timestamp)
             VALUES (?, ?, ?, ?)
@@ -548,17 +575,10 @@ class PlayerStatsScraper:
             print(f"Error saving player info: {e}")
         
         # Save season stats
+        rows = []
         for stats in season_stats:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO player_season_stats 
-                (player_id, season, age, team, games, minutes, points, rebounds, assists, steals, blocks,
-                 three_point_made, fg_percentage, ft_percentage, turnovers, offensive_rebounds, defensive_rebounds,
-                 three_point_attempted, three_point_percentage, fg_made, fg_attempted, ft_made, ft_attempted,
-                 three_point_made_total, three_point_attempted_total, fg_made_total, fg_attempted_total,
-                 ft_made_total, ft_attempted_total, stat_type, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     stats['player_id'], stats['season'], stats['age'], stats['team'], stats['games'], 
                     stats['minutes'], stats['points'], stats['rebounds'], stats['assists'], stats['steals'], 
                     stats['blocks'], stats['three_point_made'], stats['fg_percentage'], stats['ft_percentage'], 
@@ -570,18 +590,21 @@ class PlayerStatsScraper:
                 ))
             except Exception as e:
                 print(f"Error saving season stats: {e}")
+        self.writer.write('''
+            INSERT OR REPLACE INTO player_season_stats 
+            (player_id, season, age, team, games, minutes, points, rebounds, assists, steals, blocks,
+             three_point_made, fg_percentage, ft_percentage, turnovers, offensive_rebounds, defensive_rebounds,
+             three_point_attempted, three_point_percentage, fg_made, fg_attempted, ft_made, ft_attempted,
+             three_point_made_total, three_point_attempted_total, fg_made_total, fg_attempted_total,
+             ft_made_total, ft_attempted_total, stat_type, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
         
         # Save game logs
+        rows = []
         for game in game_logs:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO player_game_logs 
-                (player_id, game_id, date, full_date, game_date, opponent, home_away, score, minutes, points,
-                 rebounds, assists, steals, blocks, turnovers, fg_made, fg_attempted, ft_made, ft_attempted,
-                 three_point_made, three_point_attempted, offensive_rebounds, defensive_rebounds, fouls,
-                 played_game, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     game['player_id'], game['game_id'], game['date'], game['full_date'], game['game_date'],
                     game['opponent'], game['home_away'], game['score'], game['minutes'], game['points'],
                     game['rebounds'], game['assists'], game['steals'], game['blocks'], game['turnovers'],
@@ -591,32 +614,38 @@ class PlayerStatsScraper:
                 ))
             except Exception as e:
                 print(f"Error saving game log: {e}")
+        self.writer.write('''
+            INSERT OR REPLACE INTO player_game_logs 
+            (player_id, game_id, date, full_date, game_date, opponent, home_away, score, minutes, points,
+             rebounds, assists, steals, blocks, turnovers, fg_made, fg_attempted, ft_made, ft_attempted,
+             three_point_made, three_point_attempted, offensive_rebounds, defensive_rebounds, fouls,
+             played_game, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
         
         # Save advanced stats
+        rows = []
         for stats in advanced_stats:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO player_advanced_stats 
-                (player_id, season, team, games, mpg, true_shooting, efg, assist_ratio, turnover_ratio,
-                 ast_to_ratio, efficiency, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     stats['player_id'], stats['season'], stats['team'], stats['games'], stats['mpg'],
                     stats['true_shooting'], stats['efg'], stats['assist_ratio'], stats['turnover_ratio'],
                     stats['ast_to_ratio'], stats['efficiency'], stats['scraped_timestamp']
                 ))
             except Exception as e:
                 print(f"Error saving advanced stats: {e}")
+        self.writer.write('''
+            INSERT OR REPLACE INTO player_advanced_stats 
+            (player_id, season, team, games, mpg, true_shooting, efg, assist_ratio, turnover_ratio,
+             ast_to_ratio, efficiency, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
         
         # Save ratings
+        rows = []
         for rating in ratings:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO player_ratings 
-                (player_id, season, team, pts_rating, reb_rating, ast_rating, stl_rating, blk_rating,
-                 pt3m_rating, fgpct_rating, ftpct_rating, overall_rating, rank, rating_type, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     rating['player_id'], rating['season'], rating['team'], rating['pts_rating'], 
                     rating['reb_rating'], rating['ast_rating'], rating['stl_rating'], rating['blk_rating'],
                     rating['pt3m_rating'], rating['fgpct_rating'], rating['ftpct_rating'], 
@@ -624,18 +653,18 @@ class PlayerStatsScraper:
                 ))
             except Exception as e:
                 print(f"Error saving ratings: {e}")
+        self.writer.write('''
+            INSERT OR REPLACE INTO player_ratings 
+            (player_id, season, team, pts_rating, reb_rating, ast_rating, stl_rating, blk_rating,
+             pt3m_rating, fgpct_rating, ftpct_rating, overall_rating, rank, rating_type, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
         
         # Save splits
+        rows = []
         for split in splits:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO player_splits 
-                (player_id, split_type, split_category, games, minutes, points, rebounds, assists, steals, blocks,
-                 three_point_made, fg_percentage, ft_percentage, turnovers, offensive_rebounds, defensive_rebounds,
-                 three_point_attempted, three_point_percentage, fg_made, fg_attempted, ft_made, ft_attempted,
-                 scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     split['player_id'], split['split_type'], split['split_category'], split['games'],
                     split['minutes'], split['points'], split['rebounds'], split['assists'], split['steals'],
                     split['blocks'], split['three_point_made'], split['fg_percentage'], split['ft_percentage'],
@@ -645,29 +674,30 @@ class PlayerStatsScraper:
                 ))
             except Exception as e:
                 print(f"Error saving splits: {e}")
-        
-        conn.commit()
-        conn.close()
+        self.writer.write('''
+            INSERT OR REPLACE INTO player_splits 
+            (player_id, split_type, split_category, games, minutes, points, rebounds, assists, steals, blocks,
+             three_point_made, fg_percentage, ft_percentage, turnovers, offensive_rebounds, defensive_rebounds,
+             three_point_attempted, three_point_percentage, fg_made, fg_attempted, ft_made, ft_attempted,
+             scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
     
     def log_scraping_attempt(self, player_id: int, team: str, success: bool, error_message: str = ""):
         """Log scraping attempts to track progress"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        self.writer.write_one('''
         INSERT OR REPLACE INTO scraping_log 
         (player_id, team, success, error_message, scraped_timestamp)
         VALUES (?, ?, ?, ?, ?)
         ''', (player_id, team, success, error_message, datetime.now()))
-        
-        conn.commit()
-        conn.close()
     
     def scrape_player_by_id(self, player_id: int):
         """Scrape a player by ID"""
         print(f"Attempting to scrape player {player_id}...")
-        
-        data = self.get_player_data(player_id)
+        self.save_player_data(player_id, self.get_player_data(player_id))
+    
+    def save_player_data(self, player_id: int, data: Optional[Dict]):
+        """Process and save a player's page data (logging why when it is missing or not an NBA player)"""
         if not data:
             print(f"No data found for player {player_id}")
             self.log_scraping_attempt(player_id, "UNKNOWN", False, "No data returned from API")
@@ -723,16 +753,15 @@ class PlayerStatsScraper:
         """Scrape a range of player IDs"""
         total_players = end_id - start_id + 1
         print(f"Starting to scrape {total_players} players from ID {start_id} to {end_id}")
+        if self.fetcher is not None:
+            self._scrape_players_async(list(range(start_id, end_id + 1)))
+            return
         
         for i, player_id in enumerate(range(start_id, end_id + 1), 1):
             print(f"Processing player {i}/{total_players} (ID: {player_id})")
             
             # Check if we've already processed this player
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT success FROM scraping_log WHERE player_id = ?", (player_id,))
-            result = cursor.fetchone()
-            conn.close()
+            result = self.writer.query("SELECT success FROM scraping_log WHERE player_id = ?", (player_id,))
             
             if result:
                 print(f"Player {player_id} already processed, skipping...")
@@ -741,6 +770,26 @@ class PlayerStatsScraper:
             self.scrape_player_by_id(player_id)
             time.sleep(delay)
         
+        self.writer.flush()
+        print(f"Database writes: {self.writer.summary()}")
+        print("Finished scraping player range")
+    
+    def _scrape_players_async(self, player_ids: List[int]):
+        """scrape_player_range on the async fetch backend: pages fetched concurrently, saved in id order"""
+        if not player_ids:
+            return
+        logged = {row[0] for row in self.writer.query("SELECT player_id FROM scraping_log WHERE player_id BETWEEN ? AND ?",
+                                                      (player_ids[0], player_ids[-1]))}
+        pending = [player_id for player_id in player_ids if player_id not in logged]
+        if len(pending) < len(player_ids):
+            print(f"{len(player_ids) - len(pending)} players already processed, skipping them")
+        
+        for player_id, data in zip(pending, self.fetcher.map(self.get_player_data_async, pending)):
+            self.save_player_data(player_id, data)
+        
+        self.writer.flush()
+        print(f"Async fetches: {self.fetcher.summary()}")
+        print(f"Database writes: {self.writer.summary()}")
         print("Finished scraping player range")
 
 # Example usage
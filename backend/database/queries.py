@@ -0,0 +1,182 @@
+"""
+Indexed, parameterized lookups against games.db
+
+The scrapers only created the UNIQUE constraints, so fetching one game, one
+player's log or one team's games scanned whole tables. ensure_indexes() adds
+the secondary indexes those lookups need (setup_database in games.py calls it,
+so existing databases are migrated on the next scrape), and GamesDB wraps the
+lookups with keyset pagination: pass the last game_id of a page as
+`before_game_id` to get the next one.
+
+Usage:
+    python queries.py --db games.db   # EXPLAIN QUERY PLAN check for every accessor
+"""
+import argparse
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence
+
+# name -> (table, columns); UNIQUE(player_id, game_id, team_id) already serves player lookups
+INDEXES = {
+    'idx_games_game_team': ('games', ['game_id', 'team_id', 'position_sort']),
+    'idx_games_team_game': ('games', ['team_id', 'game_id']),
+    'idx_team_stats_team_game': ('team_stats', ['team_id', 'game_id']),
+    'idx_game_info_date': ('game_info', ['game_date', 'game_id']),
+}
+
+MAX_PAGE_SIZE = 500
+
+BOX_SCORE_SQL = '''
+    SELECT g.*, gi.game_date
+    FROM games g
+    LEFT JOIN game_info gi ON gi.game_id = g.game_id
+    WHERE g.game_id = ? {team_filter}
+    ORDER BY g.team_id, g.position_sort, g.id
+    LIMIT ? OFFSET ?
+'''
+
+PLAYER_GAME_LOG_SQL = '''
+    SELECT g.*, gi.game_date
+    FROM games g
+    LEFT JOIN game_info gi ON gi.game_id = g.game_id
+    WHERE g.player_id = ? AND g.game_id < ?
+    ORDER BY g.game_id DESC
+    LIMIT ?
+'''
+
+TEAM_GAMES_SQL = '''
+    SELECT ts.*, gi.game_date
+    FROM team_stats ts
+    LEFT JOIN game_info gi ON gi.game_id = ts.game_id
+    WHERE ts.team_id = ? AND ts.game_id < ?
+    ORDER BY ts.game_id DESC
+    LIMIT ?
+'''
+
+# Larger than any rotowire game id: the first page of a keyset-paginated query
+FIRST_PAGE = 2 ** 62
+
+
+def ensure_indexes(conn: sqlite3.Connection) -> List[str]:
+    """Create the missing secondary indexes on tables that exist; returns the names created"""
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    created = []
+    for name, (table, columns) in INDEXES.items():
+        if table in tables and name not in existing:
+            conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+            created.append(name)
+    if created:
+        conn.execute('ANALYZE')
+        conn.commit()
+    return created
+
+
+def _page_size(limit: int) -> int:
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+class GamesDB:
+    """Read accessors for games.db; rows come back as dicts"""
+
+    def __init__(self, db_path: str = "games.db", migrate: bool = True):
+        """
+        Args:
+            db_path: games.db written by games.py
+            migrate: Create missing indexes on open (needs write access)
+        """
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if migrate:
+            ensure_indexes(self.conn)
+
+    def _rows(self, sql: str, params: Sequence) -> List[Dict[str, Any]]:
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    # ========== ACCESSORS ==========
+
+    def box_score(self, game_id: int, team_id: Optional[int] = None,
+                  limit: int = 100, offset: int = 0) -> List[Dict[str, Any]]:
+        """Player rows of one game (optionally one team), grouped by team in lineup order"""
+        sql, params = self._box_score_query(game_id, team_id, limit, offset)
+        return self._rows(sql, params)
+
+    def player_game_log(self, player_id: int, limit: int = 20,
+                        before_game_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A player's games, newest first; pass the last game_id returned to get the next page"""
+        sql, params = self._player_game_log_query(player_id, limit, before_game_id)
+        return self._rows(sql, params)
+
+    def team_games(self, team_id: int, limit: int = 20,
+                   before_game_id: Optional[int] = None) -> List[Dict[str, Any]]:
+        """A team's totals per game, newest first; pass the last game_id returned to get the next page"""
+        sql, params = self._team_games_query(team_id, limit, before_game_id)
+        return self._rows(sql, params)
+
+    # ========== SQL ==========
+
+    def _box_score_query(self, game_id: int, team_id: Optional[int], limit: int, offset: int):
+        if team_id is None:
+            return BOX_SCORE_SQL.format(team_filter=''), (game_id, _page_size(limit), max(0, offset))
+        return (BOX_SCORE_SQL.format(team_filter='AND g.team_id = ?'),
+                (game_id, team_id, _page_size(limit), max(0, offset)))
+
+    def _player_game_log_query(self, player_id: int, limit: int, before_game_id: Optional[int]):
+        return PLAYER_GAME_LOG_SQL, (player_id, before_game_id or FIRST_PAGE, _page_size(limit))
+
+    def _team_games_query(self, team_id: int, limit: int, before_game_id: Optional[int]):
+        return TEAM_GAMES_SQL, (team_id, before_game_id or FIRST_PAGE, _page_size(limit))
+
+    def query_plans(self) -> Dict[str, List[str]]:
+        """EXPLAIN QUERY PLAN detail lines for every accessor"""
+        queries = {
+            'box_score': self._box_score_query(1, None, 100, 0),
+            'box_score (team)': self._box_score_query(1, 1, 100, 0),
+            'player_game_log': self._player_game_log_query(1, 20, None),
+            'team_games': self._team_games_query(1, 20, None),
+        }
+        return {name: [row[-1] for row in self.conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+                for name, (sql, params) in queries.items()}
+
+    def close(self):
+        self.conn.close()
+
+
+def full_scans(plan: List[str]) -> List[str]:
+    """Plan lines that walk a whole table or index instead of searching it"""
+    return [line for line in plan if line.startswith('SCAN')]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that the games.db accessors use indexes')
+    parser.add_argument('--db', default='games.db', help='games.db to check (missing indexes are created)')
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(args.db)
+    created = ensure_indexes(conn)
+    conn.close()
+    print(f"Created indexes: {', '.join(created) or 'none (already present)'}")
+
+    db = GamesDB(args.db, migrate=False)
+    failed = False
+    for name, plan in db.query_plans().items():
+        scans = full_scans(plan)
+        failed = failed or bool(scans)
+        print(f"{'FULL SCAN' if scans else 'ok':9} {name}")
+        for line in plan:
+            print(f"            {line}")
+
+    sample = db.conn.execute('SELECT game_id, team_id, player_id FROM games LIMIT 1').fetchone()
+    if sample:
+        started = time.perf_counter()
+        rows = (len(db.box_score(sample['game_id'])) + len(db.player_game_log(sample['player_id']))
+                + len(db.team_games(sample['team_id'])))
+        print(f"Sample lookups returned {rows} rows in {(time.perf_counter() - started) * 1000:.1f} ms")
+    db.close()
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,367 @@
+"""
+Declarative column specs that turn raw Rotowire box score rows into insert tuples
+
+process_player_data used to copy every player dict, split fg/pt3/ft and call
+int() on the parts several times, import re inside the loop and convert each
+numeric field through its own try/except; extract_team_totals repeated it and
+_insert_players then rebuilt a tuple from the dict. Here each table is a list
+of (column, kind, source) entries, compiled once at import into one function
+that reads the raw row and returns the insert tuple directly: every shooting
+split is parsed once with a precompiled regex and nothing is copied.
+
+Usage:
+    python row_spec.py --repeat 200   # rows/s before and after over the checked-in CSV fixtures
+"""
+import argparse
+import csv
+import glob
+import os
+import re
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+SHOT_SPLIT = re.compile(r'\s*(\d+)\s*-\s*(\d+)\s*$')
+FIRST_NUMBER = re.compile(r'\d+')
+
+# Column kinds
+RAW = 'raw'                # raw value, None when missing
+TEXT = 'text'              # raw value, '' when missing
+INT = 'int'                # integer; HTML-wrapped numbers are unwrapped, anything else is 0
+MADE = 'made'              # made part of a "made-attempted" split
+ATTEMPTED = 'attempted'    # attempted part of the split
+PERCENTAGE = 'percentage'  # made / attempted * 100 to one decimal, 0 without attempts
+SUM = 'sum'                # sum of other columns of the row
+GAME_ID = 'game_id'
+TEAM_ID = 'team_id'
+NULL = 'null'
+TIMESTAMP = 'timestamp'
+
+# (column in games, kind, raw key or source columns); order is the insert order
+PLAYER_SPEC = [
+    ('player_id', RAW, 'playerID'),
+    ('player_name', RAW, 'nameLong'),
+    ('player_name_short', RAW, 'nameShort'),
+    ('position', RAW, 'position'),
+    ('position_sort', INT, 'positionSort'),
+    ('game_id', GAME_ID, None),
+    ('team_id', TEAM_ID, None),
+    ('minutes', INT, 'minutes'),
+    ('points', INT, 'points'),
+    ('fg_made', MADE, 'fg'),
+    ('fg_attempted', ATTEMPTED, 'fg'),
+    ('fg_percentage', PERCENTAGE, 'fg'),
+    ('three_pt_made', MADE, 'pt3'),
+    ('three_pt_attempted', ATTEMPTED, 'pt3'),
+    ('three_pt_percentage', PERCENTAGE, 'pt3'),
+    ('ft_made', MADE, 'ft'),
+    ('ft_attempted', ATTEMPTED, 'ft'),
+    ('ft_percentage', PERCENTAGE, 'ft'),
+    ('offensive_rebounds', INT, 'oreb'),
+    ('defensive_rebounds', INT, 'dreb'),
+    ('total_rebounds', SUM, ('offensive_rebounds', 'defensive_rebounds')),
+    ('assists', INT, 'ast'),
+    ('steals', INT, 'stl'),
+    ('blocks', INT, 'blk'),
+    ('turnovers', INT, 'turnovers'),
+    ('personal_fouls', INT, 'personalFouls'),
+    ('technical_fouls', INT, 'technicalFouls'),
+    ('ejected', INT, 'ejected'),
+    ('ortg', TEXT, 'ortg'),
+    ('usg', TEXT, 'usg'),
+    ('url', TEXT, 'URL'),
+    ('player_rating', NULL, None),
+    ('scraped_timestamp', TIMESTAMP, None),
+]
+
+# Team totals come from the "Game Total" row; minutes, technicals and ejections stay as sent
+TEAM_STATS_SPEC = [
+    ('game_id', GAME_ID, None),
+    ('team_id', TEAM_ID, None),
+    ('minutes', TEXT, 'minutes'),
+    ('points', INT, 'points'),
+    ('fg_made', MADE, 'fg'),
+    ('fg_attempted', ATTEMPTED, 'fg'),
+    ('fg_percentage', PERCENTAGE, 'fg'),
+    ('three_pt_made', MADE, 'pt3'),
+    ('three_pt_attempted', ATTEMPTED, 'pt3'),
+    ('three_pt_percentage', PERCENTAGE, 'pt3'),
+    ('ft_made', MADE, 'ft'),
+    ('ft_attempted', ATTEMPTED, 'ft'),
+    ('ft_percentage', PERCENTAGE, 'ft'),
+    ('offensive_rebounds', INT, 'oreb'),
+    ('defensive_rebounds', INT, 'dreb'),
+    ('total_rebounds', SUM, ('offensive_rebounds', 'defensive_rebounds')),
+    ('assists', INT, 'ast'),
+    ('steals', INT, 'stl'),
+    ('blocks', INT, 'blk'),
+    ('turnovers', INT, 'turnovers'),
+    ('personal_fouls', INT, 'personalFouls'),
+    ('technical_fouls', TEXT, 'technicalFouls'),
+    ('ejected', TEXT, 'ejected'),
+    ('ortg', TEXT, 'ortg'),
+    ('usg', TEXT, 'usg'),
+    ('scraped_timestamp', TIMESTAMP, None),
+]
+
+PLAYER_COLUMNS = [column for column, _, _ in PLAYER_SPEC]
+TEAM_STATS_COLUMNS = [column for column, _, _ in TEAM_STATS_SPEC]
+
+
+def to_int(value) -> int:
+    """int for a raw stat: numbers and digit strings as is, '<b>3</b>' -> 3, '', '-' and junk -> 0"""
+    if value.__class__ is int:
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        if isinstance(value, str) and '<' in value:
+            match = FIRST_NUMBER.search(value)
+            return int(match.group()) if match else 0
+        return 0
+
+
+def split_made_attempted(value) -> tuple:
+    """(made, attempted) for a "5-13" split, (0, 0) when it is missing or malformed"""
+    match = SHOT_SPLIT.match(value) if isinstance(value, str) else None
+    if match is None:
+        return 0, 0
+    return int(match.group(1)), int(match.group(2))
+
+
+def compile_spec(spec: List[tuple], name: str):
+    """Build `name(raw, game_id, team_id, timestamp) -> tuple` for a spec; the source is kept on `.source`"""
+    columns = [column for column, _, _ in spec]
+    splits = []
+    lines = [f"def {name}(raw, game_id, team_id, timestamp):", "    get = raw.get"]
+    for column, kind, source in spec:
+        if kind in (MADE, ATTEMPTED, PERCENTAGE) and source not in splits:
+            # Fast path for a clean "5-13"; anything else goes through the regex
+            splits.append(source)
+            lines += [f"    value = get({source!r})",
+                      "    made, _, attempted = value.partition('-') if value.__class__ is str else ('', '', '')",
+                      "    if made.isdecimal() and attempted.isdecimal():",
+                      f"        {source}_made, {source}_attempted = int(made), int(attempted)",
+                      "    else:",
+                      f"        {source}_made, {source}_attempted = split_made_attempted(value)"]
+    for index, (column, kind, source) in enumerate(spec):
+        if kind == RAW:
+            value = f"get({source!r})"
+        elif kind == TEXT:
+            value = f"get({source!r}, '')"
+        elif kind == INT:
+            lines.append(f"    value = get({source!r}, 0)")
+            value = ("value if value.__class__ is int else "
+                     "int(value) if value.__class__ is str and value.isdecimal() else to_int(value)")
+        elif kind == MADE:
+            value = f"{source}_made"
+        elif kind == ATTEMPTED:
+            value = f"{source}_attempted"
+        elif kind == PERCENTAGE:
+            value = (f"round({source}_made / {source}_attempted * 100, 1) "
+                     f"if {source}_attempted > 0 else 0")
+        elif kind == SUM:
+            value = ' + '.join(f"c{columns.index(part)}" for part in source)
+        elif kind in (GAME_ID, TEAM_ID, TIMESTAMP):
+            value = kind
+        elif kind == NULL:
+            value = "None"
+        else:
+            raise ValueError(f"Unknown column kind {kind!r} for {column}")
+        lines.append(f"    c{index} = {value}")
+    lines.append(f"    return ({', '.join(f'c{index}' for index in range(len(spec)))},)")
+    source = '\n'.join(lines) + '\n'
+    namespace = {'split_made_attempted': split_made_attempted, 'to_int': to_int}
+    exec(compile(source, f"<row_spec {name}>", 'exec'), namespace)
+    function = namespace[name]
+    function.source = source
+    return function
+
+
+player_row = compile_spec(PLAYER_SPEC, 'player_row')
+team_stats_row = compile_spec(TEAM_STATS_SPEC, 'team_stats_row')
+
+
+def is_player_row(raw: Dict) -> bool:
+    """Rotowire pads box scores with empty rows and a "Game Total" row; those are not players"""
+    name = raw.get('nameLong')
+    if not name or name == 'Game Total':
+        return False
+    return not (raw.get('playerID') == 0 and raw.get('positionSort', 0) != 4)
+
+
+def player_rows(raw_rows: List[Dict], game_id: int, team_id: int,
+                timestamp: Optional[datetime] = None) -> List[tuple]:
+    """Insert tuples (PLAYER_COLUMNS order) for the player rows of one team's box score"""
+    timestamp = timestamp or datetime.now()
+    return [player_row(raw, game_id, team_id, timestamp) for raw in raw_rows if is_player_row(raw)]
+
+
+def team_totals_row(raw_rows: List[Dict], game_id: int, team_id: int,
+                    timestamp: Optional[datetime] = None) -> Optional[tuple]:
+    """Insert tuple (TEAM_STATS_COLUMNS order) from the "Game Total" row, or None without one"""
+    for raw in raw_rows:
+        if raw.get('positionSort') == 4 and raw.get('nameLong') == 'Game Total':
+            return team_stats_row(raw, game_id, team_id, timestamp or datetime.now())
+    return None
+
+
+# ========== BENCHMARK ==========
+
+def _legacy_extract_numeric(value):
+    if isinstance(value, str) and '<' in value:
+        import re
+        numbers = re.findall(r'\d+', value)
+        return int(numbers[0]) if numbers else 0
+    try:
+        return int(value)
+    except (ValueError, TypeError):
+        return 0
+
+
+def _legacy_rows(player_data: List[Dict], game_id: int, team_id: int):
+    """The dict-based process_player_data / extract_team_totals / _insert_* path this module replaced"""
+    processed_data = []
+    for player in player_data:
+        position_sort = player.get('positionSort', 0)
+        if (player.get('playerID') == 0 and position_sort != 4) or not player.get('nameLong') or player.get('nameLong') in ['', 'Game Total']:
+            continue
+        player_with_context = player.copy()
+        player_with_context['game_id'] = game_id
+        player_with_context['team_id'] = team_id
+        for key, prefix in (('fg', 'fg'), ('pt3', 'three_pt'), ('ft', 'ft')):
+            if key in player_with_context and isinstance(player_with_context[key], str):
+                parts = player_with_context[key].split('-')
+                if len(parts) == 2:
+                    player_with_context[f'{prefix}_made'] = int(parts[0])
+                    player_with_context[f'{prefix}_attempted'] = int(parts[1])
+                    player_with_context[f'{prefix}_percentage'] = round(int(parts[0]) / int(parts[1]) * 100, 1) if int(parts[1]) > 0 else 0
+        numeric_fields = ['minutes', 'points', 'oreb', 'dreb', 'ast', 'stl', 'blk', 'turnovers', 'personalFouls', 'technicalFouls', 'ejected', 'positionSort']
+        for field in numeric_fields:
+            if field in player_with_context and player_with_context[field] not in ['', '-']:
+                try:
+                    value = str(player_with_context[field])
+                    if '<' in value:
+                        import re
+                        numbers = re.findall(r'\d+', value)
+                        player_with_context[field] = int(numbers[0]) if numbers else 0
+                    else:
+                        player_with_context[field] = int(player_with_context[field])
+                except (ValueError, TypeError):
+                    player_with_context[field] = 0
+        player_with_context['total_rebounds'] = player_with_context.get('oreb', 0) + player_with_context.get('dreb', 0)
+        processed_data.append(player_with_context)
+
+    rows = [(
+        p.get('playerID'), p.get('nameLong'), p.get('nameShort'), p.get('position'), p.get('positionSort', 0),
+        p.get('game_id'), p.get('team_id'), p.get('minutes', 0), p.get('points', 0),
+        p.get('fg_made', 0), p.get('fg_attempted', 0), p.get('fg_percentage', 0),
+        p.get('three_pt_made', 0), p.get('three_pt_attempted', 0), p.get('three_pt_percentage', 0),
+        p.get('ft_made', 0), p.get('ft_attempted', 0), p.get('ft_percentage', 0),
+        p.get('oreb', 0), p.get('dreb', 0), p.get('total_rebounds', 0), p.get('ast', 0), p.get('stl', 0),
+        p.get('blk', 0), p.get('turnovers', 0), p.get('personalFouls', 0), p.get('technicalFouls', 0),
+        p.get('ejected', 0), p.get('ortg', ''), p.get('usg', ''), p.get('URL', ''), None, datetime.now()
+    ) for p in processed_data]
+
+    totals = None
+    for player in player_data:
+        if player.get('positionSort') == 4 and player.get('nameLong') == 'Game Total':
+            t = {
+                'minutes': player.get('minutes', ''),
+                'points': _legacy_extract_numeric(player.get('points', 0)),
+                'fg_made': _legacy_extract_numeric(player.get('fg', '0-0').split('-')[0]),
+                'fg_attempted': _legacy_extract_numeric(player.get('fg', '0-0').split('-')[1]),
+                'three_pt_made': _legacy_extract_numeric(player.get('pt3', '0-0').split('-')[0]),
+                'three_pt_attempted': _legacy_extract_numeric(player.get('pt3', '0-0').split('-')[1]),
+                'ft_made': _legacy_extract_numeric(player.get('ft', '0-0').split('-')[0]),
+                'ft_attempted': _legacy_extract_numeric(player.get('ft', '0-0').split('-')[1]),
+                'oreb': _legacy_extract_numeric(player.get('oreb', 0)),
+                'dreb': _legacy_extract_numeric(player.get('dreb', 0)),
+            }
+            pct = {key: round(t[f'{key}_made'] / t[f'{key}_attempted'] * 100, 1) if t[f'{key}_attempted'] > 0 else 0
+                   for key in ('fg', 'three_pt', 'ft')}
+            totals = (
+                game_id, team_id, t['minutes'], t['points'], t['fg_made'], t['fg_attempted'], pct['fg'],
+                t['three_pt_made'], t['three_pt_attempted'], pct['three_pt'], t['ft_made'], t['ft_attempted'], pct['ft'],
+                t['oreb'], t['dreb'], t['oreb'] + t['dreb'],
+                _legacy_extract_numeric(player.get('ast', 0)), _legacy_extract_numeric(player.get('stl', 0)),
+                _legacy_extract_numeric(player.get('blk', 0)), _legacy_extract_numeric(player.get('turnovers', 0)),
+                _legacy_extract_numeric(player.get('personalFouls', 0)), player.get('technicalFouls', ''),
+                player.get('ejected', ''), player.get('ortg', ''), player.get('usg', ''), datetime.now()
+            )
+            break
+    return rows, totals
+
+
+def load_fixture_box_scores(pattern: str) -> Dict[tuple, List[Dict]]:
+    """Raw box scores per (game, team) rebuilt from the rotowire_data_games_*.csv exports, with a Game Total row"""
+    raw_fields = ['playerID', 'URL', 'nameShort', 'nameLong', 'position', 'positionSort', 'minutes', 'ortg', 'usg',
+                  'fg', 'pt3', 'ft', 'stl', 'turnovers', 'oreb', 'dreb', 'ast', 'blk', 'personalFouls',
+                  'technicalFouls', 'ejected', 'points']
+    box_scores: Dict[tuple, List[Dict]] = {}
+    for path in sorted(glob.glob(pattern)):
+        with open(path, newline='') as f:
+            for row in csv.DictReader(f):
+                raw = {field: row[field] for field in raw_fields}
+                # JSON numbers in the API response; everything else arrives as text
+                raw['playerID'] = int(raw['playerID'])
+                raw['positionSort'] = int(raw['positionSort'])
+                box_scores.setdefault((int(row['gameGlobalID']), int(row['teamGlobalID'])), []).append(raw)
+
+    for raw_rows in box_scores.values():
+        total = {'playerID': 0, 'nameLong': 'Game Total', 'positionSort': 4, 'minutes': '240', 'ortg': '', 'usg': '',
+                 'technicalFouls': '0', 'ejected': '0'}
+        for key in ('fg', 'pt3', 'ft'):
+            made = sum(split_made_attempted(raw[key])[0] for raw in raw_rows)
+            attempted = sum(split_made_attempted(raw[key])[1] for raw in raw_rows)
+            total[key] = f"{made}-{attempted}"
+        for key in ('points', 'oreb', 'ast', 'stl', 'blk', 'turnovers', 'personalFouls'):
+            total[key] = str(sum(to_int(raw[key]) for raw in raw_rows))
+        total['dreb'] = f"<b>{sum(to_int(raw['dreb']) for raw in raw_rows)}</b>"
+        raw_rows.append(total)
+    return box_scores
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the dict-based box score parser with the compiled row specs')
+    parser.add_argument('--fixtures', default=os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                                                           'rotowire_data_games_*.csv'))
+    parser.add_argument('--repeat', type=int, default=200, help='Passes over the fixture box scores')
+    args = parser.parse_args()
+
+    box_scores = load_fixture_box_scores(args.fixtures)
+    if not box_scores:
+        sys.exit(f"No fixtures match {args.fixtures}")
+    rows_per_pass = sum(len(raw_rows) for raw_rows in box_scores.values())
+
+    # Same tuples apart from the timestamp
+    mismatches = 0
+    for (game_id, team_id), raw_rows in box_scores.items():
+        legacy_players, legacy_totals = _legacy_rows(raw_rows, game_id, team_id)
+        players = player_rows(raw_rows, game_id, team_id)
+        totals = team_totals_row(raw_rows, game_id, team_id)
+        mismatches += sum(a[:-1] != b[:-1] for a, b in zip(legacy_players, players))
+        mismatches += len(legacy_players) != len(players)
+        mismatches += (legacy_totals is None) != (totals is None) or (totals and legacy_totals[:-1] != totals[:-1])
+
+    def timed(parse):
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            for (game_id, team_id), raw_rows in box_scores.items():
+                parse(raw_rows, game_id, team_id)
+        return time.perf_counter() - started
+
+    legacy = timed(_legacy_rows)
+    compiled = timed(lambda raw_rows, game_id, team_id: (player_rows(raw_rows, game_id, team_id),
+                                                         team_totals_row(raw_rows, game_id, team_id)))
+    total_rows = rows_per_pass * args.repeat
+    print(f"{len(box_scores)} team box scores ({rows_per_pass} raw rows) x {args.repeat}")
+    print(f"  dict-based parser: {legacy:.2f}s ({total_rows / legacy:,.0f} rows/s)")
+    print(f"  compiled row spec: {compiled:.2f}s ({total_rows / compiled:,.0f} rows/s)")
+    print(f"  speedup {legacy / compiled:.1f}x, {mismatches} rows differ")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Shared SQLite writer for the scrapers in this directory
+
+Every scraper used to open a fresh connection per save, run one INSERT per
+row and commit with rollback journaling and full sync. SQLiteWriter keeps one
+connection for the whole run (WAL, synchronous=NORMAL, a bigger page cache),
+queues rows per statement and writes them with executemany, committing a
+batch once it reaches `batch_rows` rows or `batch_seconds` seconds. Each batch
+is one transaction, so rows queued together land together. Batch timings are
+kept for the run summary.
+
+Usage:
+    python storage.py --rows 30000   # per-row inserts vs SQLiteWriter on a scratch database
+"""
+import argparse
+import contextlib
+import io
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Sequence
+
+BATCH_ROWS = int(os.environ.get('SCRAPER_DB_BATCH_ROWS', '5000'))
+BATCH_SECONDS = float(os.environ.get('SCRAPER_DB_BATCH_SECONDS', '5'))
+
+
+def insert_sql(table: str, columns: Sequence[str], conflict: Optional[str] = None) -> str:
+    """INSERT [OR <conflict>] INTO table (columns) VALUES (?, ...)"""
+    verb = f"INSERT OR {conflict}" if conflict else "INSERT"
+    return f"{verb} INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+
+
+def upsert_sql(table: str, columns: Sequence[str], key: Sequence[str], update: Optional[Sequence[str]] = None,
+               where: Optional[str] = None) -> str:
+    """
+    INSERT ... ON CONFLICT(key) DO UPDATE SET every non-key column (or `update`) to the new value;
+    with `where` the stored row is only updated when that condition holds
+    """
+    update = [c for c in columns if c not in key] if update is None else update
+    assignments = ', '.join(f"{c} = excluded.{c}" for c in update)
+    sql = f"{insert_sql(table, columns)} ON CONFLICT({', '.join(key)}) DO UPDATE SET {assignments}"
+    return f"{sql} WHERE {where}" if where else sql
+
+
+def changed_sql(table: str, columns: Sequence[str]) -> str:
+    """Upsert `where` condition: any of `columns` differs between the stored row and the new one (NULL-safe)"""
+    stored = ', '.join(f"{table}.{c}" for c in columns)
+    new = ', '.join(f"excluded.{c}" for c in columns)
+    return f"({stored}) IS NOT ({new})"
+
+
+def open_connection(db_path: str, synchronous: str = 'NORMAL', cache_size_kib: int = 65536) -> sqlite3.Connection:
+    """A connection tuned for bulk writes: WAL journal, relaxed sync, large page cache"""
+    conn = sqlite3.connect(db_path, timeout=30, check_same_thread=False)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(f'PRAGMA synchronous={synchronous}')
+    conn.execute(f'PRAGMA cache_size=-{cache_size_kib}')
+    conn.execute('PRAGMA temp_store=MEMORY')
+    return conn
+
+
+class SQLiteWriter:
+    """One long-lived connection with batched executemany writes (thread-safe)"""
+
+    def __init__(self, db_path: str, batch_rows: int = BATCH_ROWS, batch_seconds: float = BATCH_SECONDS,
+                 synchronous: str = 'NORMAL', cache_size_kib: int = 65536):
+        """
+        Args:
+            db_path: SQLite file
+            batch_rows: Commit once this many rows are queued
+            batch_seconds: Commit queued rows at the next write after this many seconds
+            synchronous: PRAGMA synchronous (NORMAL is durable across crashes of the process in WAL mode)
+            cache_size_kib: Page cache size
+        """
+        self.db_path = db_path
+        self.batch_rows = batch_rows
+        self.batch_seconds = batch_seconds
+        self.conn = open_connection(db_path, synchronous, cache_size_kib)
+        self._lock = threading.RLock()
+        self._pending: Dict[str, List[Sequence]] = {}
+        self._pending_rows = 0
+        self._last_flush = time.monotonic()
+        self.batches: List[Dict] = []
+        self.failed_rows = 0
+
+    # ========== WRITES ==========
+
+    def write(self, sql: str, rows: Iterable[Sequence]):
+        """Queue rows for `sql`; the batch is committed when it is full or old enough"""
+        with self._lock:
+            queue = self._pending.setdefault(sql, [])
+            before = len(queue)
+            queue.extend(rows)
+            self._pending_rows += len(queue) - before
+            if (self._pending_rows >= self.batch_rows
+                    or time.monotonic() - self._last_flush >= self.batch_seconds):
+                self.flush()
+
+    def write_one(self, sql: str, row: Sequence):
+        self.write(sql, (row,))
+
+    def flush(self) -> int:
+        """Commit everything queued in one transaction; returns rows changed"""
+        with self._lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_rows:
+                return 0
+            pending, rows = self._pending, self._pending_rows
+            self._pending, self._pending_rows = {}, 0
+
+            started = time.perf_counter()
+            changed = 0
+            with self.conn:
+                for sql, params in pending.items():
+                    changed += self._execute_many(sql, params)
+            self.batches.append({'rows': rows, 'changed': changed, 'seconds': time.perf_counter() - started})
+            return changed
+
+    def _execute_many(self, sql: str, rows: List[Sequence]) -> int:
+        # A savepoint inside the open transaction, so a failed executemany can be undone on its own
+        if not self.conn.in_transaction:
+            self.conn.execute('BEGIN')
+        self.conn.execute('SAVEPOINT execute_many')
+        try:
+            changed = self.conn.executemany(sql, rows).rowcount
+        except sqlite3.Error:
+            # executemany stops at the first bad row with the rows before it applied; undo those,
+            # then redo row by row so only bad rows are lost (and none is written twice)
+            self.conn.execute('ROLLBACK TO execute_many')
+            changed = 0
+            for row in rows:
+                try:
+                    changed += self.conn.execute(sql, row).rowcount
+                except sqlite3.Error as e:
+                    self.failed_rows += 1
+                    print(f"Error writing row to {self.db_path}: {e}")
+        self.conn.execute('RELEASE execute_many')
+        return changed
+
+    def execute_many(self, sql: str, rows: Iterable[Sequence]) -> int:
+        """Run `sql` for every row right away (inside transaction() to share its commit); returns rows changed"""
+        with self._lock:
+            rows = list(rows)
+            return self._execute_many(sql, rows) if rows else 0
+
+    @contextmanager
+    def transaction(self):
+        """Flush the queue, then run the block's writes as one transaction"""
+        with self._lock:
+            self.flush()
+            started = time.perf_counter()
+            changes_before = self.conn.total_changes
+            with self.conn:
+                yield self
+            changed = self.conn.total_changes - changes_before
+            self.batches.append({'rows': changed, 'changed': changed, 'seconds': time.perf_counter() - started})
+
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Run one statement now and commit it (schema changes, one-off updates)"""
+        with self._lock:
+            self.flush()
+            with self.conn:
+                return self.conn.execute(sql, params)
+
+    # ========== READS ==========
+
+    def query(self, sql: str, params: Sequence = ()) -> List[tuple]:
+        """Rows of a SELECT, after flushing the queue so it sees every write"""
+        with self._lock:
+            self.flush()
+            return self.conn.execute(sql, params).fetchall()
+
+    # ========== LIFECYCLE ==========
+
+    def summary(self) -> Dict:
+        seconds = sum(b['seconds'] for b in self.batches)
+        rows = sum(b['rows'] for b in self.batches)
+        return {
+            'batches': len(self.batches),
+            'rows': rows,
+            'seconds': round(seconds, 3),
+            'rows_per_second': round(rows / seconds) if seconds else None,
+            'slowest_batch_ms': round(max((b['seconds'] for b in self.batches), default=0) * 1000, 1),
+            'failed_rows': self.failed_rows,
+        }
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    """Insert the same synthetic box score rows the old way (connect + execute per row per save) and through SQLiteWriter"""
+    parser = argparse.ArgumentParser(description='Compare per-row SQLite inserts with SQLiteWriter')
+    parser.add_argument('--rows', type=int, default=30000, help='Player rows (about 26 per game)')
+    args = parser.parse_args()
+
+    columns = ['player_id', 'game_id', 'team_id', 'minutes', 'points', 'rebounds', 'assists', 'player_name']
+    schema = '''
+        CREATE TABLE games (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, player_id INTEGER, game_id INTEGER, team_id INTEGER,
+            minutes INTEGER, points INTEGER, rebounds INTEGER, assists INTEGER, player_name TEXT,
+            UNIQUE(player_id, game_id, team_id)
+        )
+    '''
+    games = {}
+    for i in range(args.rows):
+        game_id = 2870000 + i // 26
+        games.setdefault(game_id, []).append((i % 600, game_id, i % 30, 30, i % 40, i % 12, i % 9, f"Player {i % 600}"))
+    sql = insert_sql('games', columns, conflict='IGNORE')
+
+    with tempfile.TemporaryDirectory() as work:
+        legacy_path = os.path.join(work, 'legacy.db')
+        conn = sqlite3.connect(legacy_path)
+        conn.execute(schema)
+        conn.close()
+        started = time.perf_counter()
+        for rows in games.values():
+            conn = sqlite3.connect(legacy_path)
+            cursor = conn.cursor()
+            for row in rows:
+                cursor.execute(sql, row)
+            conn.commit()
+            conn.close()
+        legacy = time.perf_counter() - started
+
+        writer_path = os.path.join(work, 'writer.db')
+        with SQLiteWriter(writer_path) as writer:
+            writer.execute(schema)
+            started = time.perf_counter()
+            for rows in games.values():
+                writer.write(sql, rows)
+            writer.flush()
+            batched = time.perf_counter() - started
+            summary = writer.summary()
+
+        count = lambda path: sqlite3.connect(path).execute('SELECT COUNT(*) FROM games').fetchone()[0]
+        print(f"{args.rows} rows in {len(games)} game saves")
+        print(f"  per-row execute, commit per save: {legacy:.2f}s ({args.rows / legacy:,.0f} rows/s)")
+        print(f"  SQLiteWriter:                      {batched:.2f}s ({args.rows / batched:,.0f} rows/s), {summary}")
+        print(f"  speedup {legacy / batched:.1f}x, rows written {count(legacy_path)} / {count(writer_path)}")
+
+        # A batch with a bad row keeps the good rows once each, inside the same transaction
+        with SQLiteWriter(os.path.join(work, 'fallback.db')) as writer:
+            writer.execute('CREATE TABLE t (k TEXT, v INTEGER NOT NULL)')
+            with contextlib.redirect_stdout(io.StringIO()):
+                changed = writer.execute_many('INSERT INTO t VALUES (?, ?)', [('a', 1), ('b', 2), ('c', None), ('d', 4)])
+            writer.flush()
+            stored = [k for k, in writer.query('SELECT k FROM t ORDER BY rowid')]
+        ok = stored == ['a', 'b', 'd'] and changed == 3 and writer.failed_rows == 1
+        print(f"  bad row in a batch: stored {stored}, {changed} changed, {writer.failed_rows} failed "
+              f"({'ok' if ok else 'WRONG'})")
+
+
+if __name__ == "__main__":
+    main()
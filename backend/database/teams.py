@@ -1,13 +1,20 @@
 import requests
-import sqlite3
 import json
 import time
 from datetime import datetime
 from typing import Dict, List, Optional
+import os
+
+from archive import new_session
+from async_fetch import ROTOWIRE_FETCH_BACKEND, async_fetcher
+from storage import SQLiteWriter
+
+# Point at a local stand-in (upstream_standin.py) for benchmarks and replays
+ROTOWIRE_BASE_URL = os.environ.get('ROTOWIRE_BASE_URL', 'https://www.rotowire.com').rstrip('/')
 
 class TeamRosterScraper:
-    def __init__(self, db_name: str = "team_stats.db"):
-        self.base_url = "https://www.rotowire.com/basketball/ajax/team-page-roster-data.php"
+    def __init__(self, db_name: str = "team_stats.db", fetch_backend: str = ROTOWIRE_FETCH_BACKEND):
+        self.base_url = f"{ROTOWIRE_BASE_URL}/basketball/ajax/team-page-roster-data.php"
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10.15; rv:124.0) Gecko/20100101 Firefox/124.0',
             'Accept': 'application/json, text/javascript, */*; q=0.01',
@@ -20,14 +27,16 @@ class TeamRosterScraper:
             'Sec-Fetch-Site': 'same-origin',
             'TE': 'trailers'
         }
-        self.session = requests.Session()
-        self.session.headers.update(self.headers)
+        self.session = new_session(self.headers)
+        # 'async' fetches scrape_all_teams through an AsyncFetcher (see async_fetch.py)
+        self.fetcher = async_fetcher(fetch_backend, self.headers)
         self.db_name = db_name
+        self.writer = SQLiteWriter(db_name)
         self.setup_database()
         
     def setup_database(self):
         """Set up the SQLite database for team roster data"""
-        conn = sqlite3.connect(self.db_name)
+        conn = self.writer.conn
         cursor = conn.cursor()
         
         # Team roster bio table
@@ -146,16 +155,15 @@ class TeamRosterScraper:
         ''')
         
         conn.commit()
-        conn.close()
     
-    def get_team_data(self, team_code: str) -> Optional[Dict]:
-        """Get team roster data"""
+    def get_team_data(self, team_code: str, session: Optional[requests.Session] = None) -> Optional[Dict]:
+        """Get team roster data (through `session` when a worker thread brings its own)"""
         params = {
             'team': team_code
         }
     
         try:
-            response = self.session.get(self.base_url, params=params)
+            response = (session or self.session).get(self.base_url, params=params, timeout=30)
             response.raise_for_status()
             data = response.json()
             
@@ -170,6 +178,21 @@ class TeamRosterScraper:
             print(f"Error parsing JSON for team {team_code}: {e}")
             return None
     
+    async def get_team_data_async(self, team_code: str) -> Optional[Dict]:
+        """get_team_data through the async backend"""
+        response = await self.fetcher.get(self.base_url, {'team': team_code})
+        if response is None:
+            return None
+        if response.status != 200:
+            print(f"Error fetching data for team {team_code}: HTTP {response.status}")
+            return None
+        try:
+            data = response.json()
+        except ValueError as e:
+            print(f"Error parsing JSON for team {team_code}: {e}")
+            return None
+        return data if data and isinstance(data, dict) else None
+    
     def process_bio_data(self, data: List[Dict], team_code: str) -> List[Dict]:
         """Process bio data from team roster"""
         bio_data = []
@@ -310,19 +333,12 @@ class TeamRosterScraper:
     def save_to_database(self, team_code: str, bio_data: List[Dict], 
                         totals_data: List[Dict], per_game_data: List[Dict], 
                         other_data: List[Dict]):
-        """Save all team roster data to database"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
+        """Queue all team roster data on the shared writer (committed with the next batch)"""
         # Save bio data
+        rows = []
         for bio in bio_data:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO team_roster_bio 
-                (team_code, player_id, player_url, name_long, name_short, position, jersey, 
-                 height_inches, height, weight, draft, school, age, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     bio['team_code'], bio['player_id'], bio['player_url'], bio['name_long'], 
                     bio['name_short'], bio['position'], bio['jersey'], bio['height_inches'], 
                     bio['height'], bio['weight'], bio['draft'], bio['school'], bio['age'], 
@@ -330,19 +346,18 @@ class TeamRosterScraper:
                 ))
             except Exception as e:
                 print(f"Error saving bio data for player {bio['player_id']}: {e}")
+        self.writer.write('''
+            INSERT OR REPLACE INTO team_roster_bio 
+            (team_code, player_id, player_url, name_long, name_short, position, jersey, 
+             height_inches, height, weight, draft, school, age, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
         
         # Save totals data
+        rows = []
         for totals in totals_data:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO team_roster_totals 
-                (team_code, player_id, player_url, name_long, name_short, position, games, 
-                 minutes, field_goals_pct, three_pointers_pct, free_throws_pct, steals, 
-                 turnovers, offensive_rebounds, defensive_rebounds, total_rebounds, assists, 
-                 blocks, fouls, points, fg_made, fg_attempted, three_pt_made, three_pt_attempted, 
-                 ft_made, ft_attempted, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     totals['team_code'], totals['player_id'], totals['player_url'], 
                     totals['name_long'], totals['name_short'], totals['position'], 
                     totals['games'], totals['minutes'], totals['field_goals_pct'], 
@@ -355,17 +370,21 @@ class TeamRosterScraper:
                 ))
             except Exception as e:
                 print(f"Error saving totals data for player {totals['player_id']}: {e}")
+        self.writer.write('''
+            INSERT OR REPLACE INTO team_roster_totals 
+            (team_code, player_id, player_url, name_long, name_short, position, games, 
+             minutes, field_goals_pct, three_pointers_pct, free_throws_pct, steals, 
+             turnovers, offensive_rebounds, defensive_rebounds, total_rebounds, assists, 
+             blocks, fouls, points, fg_made, fg_attempted, three_pt_made, three_pt_attempted, 
+             ft_made, ft_attempted, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
         
         # Save per game data
+        rows = []
         for per_game in per_game_data:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO team_roster_per_game 
-                (team_code, player_id, player_url, name_long, name_short, position, games, 
-                 minutes, points, rebounds, assists, steals, blocks, three_point_made, 
-                 turnovers, fouls, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     per_game['team_code'], per_game['player_id'], per_game['player_url'], 
                     per_game['name_long'], per_game['name_short'], per_game['position'], 
                     per_game['games'], per_game['minutes'], per_game['points'], 
@@ -375,17 +394,19 @@ class TeamRosterScraper:
                 ))
             except Exception as e:
                 print(f"Error saving per game data for player {per_game['player_id']}: {e}")
+        self.writer.write('''
+            INSERT OR REPLACE INTO team_roster_per_game 
+            (team_code, player_id, player_url, name_long, name_short, position, games, 
+             minutes, points, rebounds, assists, steals, blocks, three_point_made, 
+             turnovers, fouls, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
         
         # Save other data
+        rows = []
         for other in other_data:
             try:
-                cursor.execute('''
-                INSERT OR REPLACE INTO team_roster_other 
-                (team_code, player_id, player_url, name_long, name_short, position, 
-                 games_started, ejected, high_points, triple_double, double_double, 
-                 plus_minus, scraped_timestamp)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (
+                rows.append((
                     other['team_code'], other['player_id'], other['player_url'], 
                     other['name_long'], other['name_short'], other['position'], 
                     other['games_started'], other['ejected'], other['high_points'], 
@@ -394,29 +415,29 @@ class TeamRosterScraper:
                 ))
             except Exception as e:
                 print(f"Error saving other data for player {other['player_id']}: {e}")
-        
-        conn.commit()
-        conn.close()
+        self.writer.write('''
+            INSERT OR REPLACE INTO team_roster_other 
+            (team_code, player_id, player_url, name_long, name_short, position, 
+             games_started, ejected, high_points, triple_double, double_double, 
+             plus_minus, scraped_timestamp)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
     
     def log_scraping_attempt(self, team_code: str, success: bool, error_message: str = ""):
         """Log scraping attempts to track progress"""
-        conn = sqlite3.connect(self.db_name)
-        cursor = conn.cursor()
-        
-        cursor.execute('''
+        self.writer.write_one('''
         INSERT OR REPLACE INTO team_scraping_log 
         (team_code, success, error_message, scraped_timestamp)
         VALUES (?, ?, ?, ?)
         ''', (team_code, success, error_message, datetime.now()))
-        
-        conn.commit()
-        conn.close()
     
     def scrape_team_roster(self, team_code: str):
         """Scrape a team's roster data"""
         print(f"Attempting to scrape team {team_code} roster...")
-        
-        data = self.get_team_data(team_code)
+        self.save_team_roster(team_code, self.get_team_data(team_code))
+    
+    def save_team_roster(self, team_code: str, data: Optional[Dict]):
+        """Process and save a team's roster response (logging a failure when there is none)"""
         if not data:
             print(f"No data found for team {team_code}")
             self.log_scraping_attempt(team_code, False, "No data returned from API")
@@ -451,16 +472,15 @@ class TeamRosterScraper:
         ]
         
         print(f"Starting to scrape {len(nba_teams)} NBA teams")
+        if self.fetcher is not None:
+            self._scrape_teams_async(nba_teams)
+            return
         
         for i, team_code in enumerate(nba_teams, 1):
             print(f"Processing team {i}/{len(nba_teams)} ({team_code})")
             
             # Check if we've already processed this team
-            conn = sqlite3.connect(self.db_name)
-            cursor = conn.cursor()
-            cursor.execute("SELECT success FROM team_scraping_log WHERE team_code = ?", (team_code,))
-            result = cursor.fetchone()
-            conn.close()
+            result = self.writer.query("SELECT success FROM team_scraping_log WHERE team_code = ?", (team_code,))
             
             if result:
                 print(f"Team {team_code} already processed, skipping...")
@@ -469,6 +489,23 @@ class TeamRosterScraper:
             self.scrape_team_roster(team_code)
             time.sleep(delay)
         
+        self.writer.flush()
+        print(f"Database writes: {self.writer.summary()}")
+        print("Finished scraping all teams")
+    
+    def _scrape_teams_async(self, team_codes: List[str]):
+        """scrape_all_teams on the async fetch backend: rosters fetched concurrently, saved in order"""
+        logged = {row[0] for row in self.writer.query("SELECT team_code FROM team_scraping_log")}
+        pending = [team_code for team_code in team_codes if team_code not in logged]
+        if len(pending) < len(team_codes):
+            print(f"{len(team_codes) - len(pending)} teams already processed, skipping them")
+        
+        for team_code, data in zip(pending, self.fetcher.map(self.get_team_data_async, pending)):
+            self.save_team_roster(team_code, data)
+        
+        self.writer.flush()
+        print(f"Async fetches: {self.fetcher.summary()}")
+        print(f"Database writes: {self.writer.summary()}")
         print("Finished scraping all teams")
 
 # Example usage
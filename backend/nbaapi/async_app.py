@@ -0,0 +1,448 @@
+"""
+ASGI serving mode for the NBA games API
+
+Serves the same routes and payloads as games.py, but a request that is waiting
+on an upstream no longer pins a server thread for the whole wait:
+
+- cdn.nba.com box score fetches run as non-blocking aiohttp requests, paced
+  through the box score client's shared request slots
+- /api/game/<id>/live streams are coroutines fed by games.live_poller, so an
+  idle viewer costs no thread
+- every other route (the sync-only nba_api endpoints) runs the Flask app on a
+  bounded thread pool, so a slow stats.nba.com can only tie up that many threads
+
+Run with:
+    uvicorn async_app:app --port 5000 --workers 4
+"""
+import asyncio
+import io
+import logging
+import os
+import random
+import re
+import sys
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+import aiohttp
+from flask import jsonify
+
+import games
+from boxscore_views import canonical_boxscore, full_view, simple_view
+from live_games import SSE_HEARTBEAT, format_sse
+from offline import offline_mode, UpstreamOffline
+
+logger = logging.getLogger(__name__)
+
+# Threads available to sync-only work (nba_api calls, the WSGI fallback)
+EXECUTOR_WORKERS = int(os.environ.get('NBA_API_EXECUTOR_WORKERS', '8'))
+
+
+BOXSCORE_ROUTE = re.compile(r'^/api/game/(?P<game_id>[^/]+)/(?P<kind>boxscore|simple-boxscore)$')
+LIVE_ROUTE = re.compile(r'^/api/game/(?P<game_id>[^/]+)/live$')
+
+
+class AsyncNBAApp:
+    """
+    ASGI application wrapping the Flask app from games.py
+
+    Box score routes are served natively on the event loop; everything else is
+    handed to the Flask WSGI app on a bounded executor.
+    """
+
+    def __init__(self, flask_app, executor_workers: int = EXECUTOR_WORKERS, native_boxscore: bool = True):
+        """
+        Args:
+            flask_app: The Flask application to fall back to
+            executor_workers: Size of the thread pool for sync-only work
+            native_boxscore: Serve box score routes on the event loop (False routes them through Flask)
+        """
+        self.flask_app = flask_app
+        self.executor_workers = executor_workers
+        self.native_boxscore = native_boxscore
+        self.executor = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix='nba-api')
+        self.http: Optional[aiohttp.ClientSession] = None
+        self._inflight: Dict[str, asyncio.Future] = {}  # box score fetches by game id
+        self._fills: Dict[str, asyncio.Future] = {}  # cache fills by cache key
+        self.stats = {
+            'in_flight': 0,
+            'peak_in_flight': 0,
+            'served': 0,
+            'upstream_requests': 0,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        self.stats['in_flight'] += 1
+        self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+        try:
+            match = BOXSCORE_ROUTE.match(scope['path'])
+            live = LIVE_ROUTE.match(scope['path'])
+            if self.native_boxscore and match and scope['method'] == 'GET':
+                await self._serve_boxscore(scope, send, match.group('game_id'), match.group('kind'))
+            elif self.native_boxscore and live and scope['method'] == 'GET':
+                await self._serve_live(scope, receive, send, live.group('game_id'))
+            else:
+                await self._serve_wsgi(scope, receive, send)
+        finally:
+            self.stats['in_flight'] -= 1
+            self.stats['served'] += 1
+
+    async def _lifespan(self, receive, send):
+        """Open the upstream session on startup and release resources on shutdown"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await self._ensure_session()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self.http is not None:
+                    await self.http.close()
+                self.executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        if self.http is None or self.http.closed:
+            client = games.boxscore_client
+            self.http = aiohttp.ClientSession(
+                headers=dict(client.session.headers),
+                timeout=aiohttp.ClientTimeout(total=30),
+            )
+        return self.http
+
+    # ========== NATIVE BOX SCORE ROUTES ==========
+
+    async def _serve_boxscore(self, scope, send, game_id: str, kind: str):
+        """Async twin of get_game_boxscore / get_simple_boxscore in games.py"""
+        provenance = {'sources': [], 'stored_at': None}
+        games.data_provenance.set(provenance)
+        async def fetch_canonical():
+            # Like games.fetch_canonical_boxscore, a fetched game goes into the player line store
+            data = canonical_boxscore(await self._fetch_player_stats(game_id))
+            await asyncio.to_thread(games.player_lines.add, data)
+            return data
+
+        if kind == 'boxscore':
+            try:
+                data = await self._cached(games.boxscore_cache_key(game_id), games.boxscore_payload_ttl,
+                                          fetch_canonical, lambda: games.boxscore_from_local_cache(game_id))
+                if data['success']:
+                    payload, status = full_view(data), 200
+                else:
+                    payload, status = {
+                        'success': False,
+                        'error': data.get('error', 'Box score not available'),
+                        'game_id': game_id
+                    }, 404
+            except Exception as e:
+                payload, status = {'success': False, 'error': str(e), 'game_id': game_id}, 500
+        else:
+            try:
+                data = await self._cached(games.boxscore_cache_key(game_id), games.boxscore_payload_ttl,
+                                          fetch_canonical, lambda: games.boxscore_from_local_cache(game_id))
+                if not data.get('success', False):
+                    raise Exception(data.get('error', 'Unknown error'))
+                payload, status = simple_view(game_id, data), 200
+            except KeyError as e:
+                payload, status = {'success': False, 'error': f'Missing data key: {str(e)}', 'game_id': game_id}, 500
+            except Exception as e:
+                payload, status = {'success': False, 'error': f'Server error: {str(e)}', 'game_id': game_id}, 500
+
+        await self._send_json(scope, send, payload, status, games.provenance_headers(provenance))
+
+    async def _cached(self, cache_key: str, ttl_func, fetch, local_fallback):
+        """Same cache/offline/stale-fallback semantics as games.cached_nba_data, with an async fetch"""
+        # to_thread (not run_in_executor) so cache reads can note provenance for this request
+        data = await asyncio.to_thread(games.read_cached, cache_key, ttl_func=ttl_func)
+        if data is not games._CACHE_MISS:
+            return data
+
+        async def fallback():
+            for read in (lambda: games.read_stale_cached(cache_key), lambda: games.read_local_fallback(local_fallback)):
+                data = await asyncio.to_thread(read)
+                if data is not games._CACHE_MISS:
+                    return data
+            return games._CACHE_MISS
+
+        if offline_mode.is_offline('cdn'):
+            data = await fallback()
+            if data is not games._CACHE_MISS:
+                return data
+            raise UpstreamOffline(f"{games.UPSTREAMS['cdn']} is offline and no local copy of {cache_key} exists")
+
+        # One fill per key in this process; the others wait for it and share its result
+        data, record = await self._single_flight(self._fills, cache_key,
+                                                 lambda: self._fill(cache_key, ttl_func, fetch, fallback))
+        for source in record['sources']:
+            games.note_data_source(source, record['stored_at'])
+        return data
+
+    async def _fill(self, cache_key: str, ttl_func, fetch, fallback) -> Tuple[object, Dict]:
+        """
+        Fetch and store a cache key under games.cache_fill_lock (single flight across
+        worker processes, as in cached_nba_data); returns the data and its provenance record
+        """
+        record = {'sources': [], 'stored_at': None}
+        token = games.data_provenance.set(record)
+        lock = games.cache_fill_lock(cache_key)
+        entering = asyncio.ensure_future(asyncio.to_thread(lock.__enter__))
+        try:
+            await asyncio.shield(entering)
+        except asyncio.CancelledError:
+            # The lock may still be taken on its thread; release it once it is
+            entering.add_done_callback(lambda _: lock.__exit__(None, None, None))
+            games.data_provenance.reset(token)
+            raise
+        try:
+            # Another worker may have fetched it while we waited for the lock
+            data = await asyncio.to_thread(games.read_cached, cache_key, ttl_func=ttl_func)
+            if data is not games._CACHE_MISS:
+                return data, record
+            try:
+                data = await fetch()
+            except Exception:
+                data = await fallback()
+                if data is not games._CACHE_MISS:
+                    return data, record
+                raise
+            await asyncio.to_thread(games.write_cached, cache_key, data)
+            games.note_data_source('upstream', datetime.now())
+            return data, record
+        finally:
+            await asyncio.to_thread(lock.__exit__, None, None, None)
+            games.data_provenance.reset(token)
+
+    async def _single_flight(self, inflight: Dict[str, asyncio.Future], key: str, start):
+        """Await start() once per key at a time; concurrent callers for the same key share its result"""
+        pending = inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        inflight[key] = future
+        try:
+            result = await start()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved when nobody else was waiting
+            raise
+        finally:
+            del inflight[key]
+
+    async def _fetch_player_stats(self, game_id: str) -> Dict:
+        client = games.boxscore_client
+        boxscore = None
+        if client.is_valid_game_id(game_id):
+            loop = asyncio.get_running_loop()
+            if await loop.run_in_executor(None, client.cached_unavailable, game_id):
+                return client.build_player_stats(game_id, None)
+            boxscore = await loop.run_in_executor(None, client._load_from_cache, game_id)
+            if not boxscore:
+                boxscore = await self._fetch_boxscore(game_id)
+        return client.build_player_stats(game_id, boxscore)
+
+    async def _fetch_boxscore(self, game_id: str) -> Optional[Dict]:
+        """Fetch one box score upstream; concurrent requests for the same game share the fetch"""
+        return await self._single_flight(self._inflight, game_id, lambda: self._request_boxscore(game_id))
+
+    async def _request_boxscore(self, game_id: str) -> Optional[Dict]:
+        """Non-blocking equivalent of a NBABoxScoreClient dispatcher send, paced through the same request slots"""
+        client = games.boxscore_client
+        loop = asyncio.get_running_loop()
+        http = await self._ensure_session()
+        data = None
+        if offline_mode.is_offline('cdn'):
+            return None
+        try:
+            await asyncio.sleep(client.reserve_request_slot())
+
+            logger.info(f"Requesting box score for game {game_id}")
+            self.stats['upstream_requests'] += 1
+            async with http.get(client.boxscore_url(game_id), headers=client.request_headers(game_id)) as response:
+                client.record_upstream_status(response.status)
+                if response.status == 200:
+                    data = await response.json(content_type=None)
+                elif response.status == 429:
+                    logger.warning(f"Rate limited (429) for game {game_id}")
+                    client.defer_requests(5 + random.uniform(0, 5))
+                elif response.status == 404:
+                    logger.info(f"Box score not found (404) for game {game_id}")
+                    await loop.run_in_executor(None, client.mark_unavailable, game_id)
+                else:
+                    logger.warning(f"HTTP {response.status} for game {game_id}")
+        except Exception as e:
+            offline_mode.record('cdn', ok=False)
+            logger.error(f"Error for game {game_id}: {e}")
+            return None
+
+        return await loop.run_in_executor(None, client.accept_boxscore, game_id, data)
+
+    async def _serve_live(self, scope, receive, send, game_id: str):
+        """Async twin of get_live_boxscore: one coroutine per viewer, events from the shared poller"""
+        if not games.boxscore_client.is_valid_game_id(game_id):
+            await self._send_json(scope, send, {'success': False, 'error': 'Invalid game id', 'game_id': game_id},
+                                  400, games.provenance_headers(None))
+            return
+
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+
+        def deliver(event):
+            # Called on the poller thread
+            loop.call_soon_threadsafe(events.put_nowait, event)
+
+        async def wait_for_disconnect():
+            while (await receive())['type'] != 'http.disconnect':
+                pass
+
+        headers = [
+            (b'content-type', b'text/event-stream; charset=utf-8'),
+            (b'cache-control', b'no-cache'),
+            (b'x-accel-buffering', b'no'),
+        ]
+        headers.extend(self._cors_headers(scope))
+        await send({'type': 'http.response.start', 'status': 200, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+
+        disconnected = asyncio.ensure_future(wait_for_disconnect())
+        games.live_poller.subscribe(game_id, deliver)
+        try:
+            while True:
+                next_event = asyncio.ensure_future(events.get())
+                done, _ = await asyncio.wait({next_event, disconnected}, timeout=SSE_HEARTBEAT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnected in done:
+                    next_event.cancel()
+                    return
+                if next_event not in done:
+                    next_event.cancel()
+                    await send({'type': 'http.response.body', 'body': b': keepalive\n\n', 'more_body': True})
+                    continue
+                event = next_event.result()
+                final = event['event'] == 'final'
+                await send({'type': 'http.response.body', 'body': format_sse(event).encode('utf-8'),
+                            'more_body': not final})
+                if final:
+                    return
+        finally:
+            games.live_poller.unsubscribe(game_id, deliver)
+            disconnected.cancel()
+
+    async def _send_json(self, scope, send, payload, status: int, extra_headers: Dict[str, str]):
+        """Render through Flask's jsonify so bodies match the WSGI routes byte for byte"""
+        with self.flask_app.app_context():
+            response = jsonify(payload)
+        response.headers.update(extra_headers)
+        headers = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in response.headers.items()]
+        headers.extend(self._cors_headers(scope))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': response.get_data()})
+
+    def _cors_headers(self, scope) -> List[Tuple[bytes, bytes]]:
+        origin = _header(scope, b'origin')
+        if origin and origin.decode('latin-1') in games.CORS_ORIGINS:
+            return [
+                (b'access-control-allow-origin', origin),
+                (b'access-control-allow-credentials', b'true'),
+                (b'vary', b'Origin'),
+            ]
+        return []
+
+    # ========== WSGI FALLBACK ==========
+
+    async def _serve_wsgi(self, scope, receive, send):
+        """Run the Flask app for this request on the bounded executor"""
+        body = b''
+        while True:
+            message = await receive()
+            body += message.get('body', b'')
+            if not message.get('more_body', False):
+                break
+
+        environ = _build_environ(scope, body)
+        loop = asyncio.get_running_loop()
+        status, headers, content = await loop.run_in_executor(self.executor, self._call_wsgi, environ)
+
+        await send({
+            'type': 'http.response.start',
+            'status': int(status.split(' ', 1)[0]),
+            'headers': [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers],
+        })
+        await send({'type': 'http.response.body', 'body': content})
+
+    def _call_wsgi(self, environ) -> Tuple[str, list, bytes]:
+        response = {}
+        chunks = []
+
+        def start_response(status, headers, exc_info=None):
+            response['status'] = status
+            response['headers'] = headers
+            return chunks.append
+
+        result = self.flask_app(environ, start_response)
+        try:
+            for chunk in result:
+                chunks.append(chunk)
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        return response['status'], response['headers'], b''.join(chunks)
+
+
+def _header(scope, name: bytes) -> Optional[bytes]:
+    for key, value in scope.get('headers', []):
+        if key == name:
+            return value
+    return None
+
+
+def _build_environ(scope, body: bytes) -> Dict:
+    """Translate an ASGI HTTP scope into a WSGI environ"""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('127.0.0.1', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': str(server[0]),
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': io.BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    for key, value in scope.get('headers', []):
+        name = key.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif name == 'CONTENT_LENGTH':
+            continue
+        else:
+            name = f'HTTP_{name}'
+            environ[name] = f"{environ[name]},{value}" if name in environ else value
+    return environ
+
+
+app = AsyncNBAApp(games.app)
+
+if __name__ == '__main__':
+    import uvicorn
+    uvicorn.run('async_app:app', host='0.0.0.0', port=5000,
+                workers=int(os.environ.get('WEB_CONCURRENCY', '1')))
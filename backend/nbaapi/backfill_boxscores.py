@@ -0,0 +1,262 @@
+"""
+Backfill box scores for a season (or a list of games) ahead of page views
+
+Fetches cdn.nba.com box scores with a bounded number of worker threads. All
+of them queue on the box score client's dispatcher in its backfill lane, so
+the politeness spacing is the same as for page views and any user-facing
+request in the same process goes first; concurrency only keeps the queue fed. Results land in the
+client cache (what the API serves from) or, with --output sqlite, in a
+SQLite table holding the raw documents.
+
+Progress is checkpointed per game in a SQLite file. A rerun with the same
+checkpoint skips every game already done (or known to have no box score)
+and retries the ones that failed, so an interrupted backfill just resumes.
+Only final box scores count as done: scheduled and live games are stored
+as they are, checkpointed 'not_final' and fetched again by the next run.
+
+Usage:
+    python backfill_boxscores.py --season 2025-26 --concurrency 4
+    python backfill_boxscores.py --schedule nba_cache/nba_games_2025_26.pkl
+    python backfill_boxscores.py --game-ids 0022500001 0022500002 --output sqlite --db boxscores.db
+"""
+import argparse
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from nba_boxscore_safe import NBABoxScoreClient, GAME_FINAL, PRIORITY_BACKFILL
+
+REGULAR_SEASON_GAMES = 1230
+DEFAULT_CHECKPOINT = 'backfill_checkpoint.db'
+
+
+def season_game_ids(season: str, games: int = REGULAR_SEASON_GAMES) -> List[str]:
+    """Regular season game ids for a season like '2025-26' (002 + two-digit year + game number)"""
+    year = season.split('-')[0][-2:]
+    return [f"002{year}{number:05d}" for number in range(1, games + 1)]
+
+
+def schedule_game_ids(path: str) -> List[str]:
+    """Game ids from a cached /api/nba-games payload (nba_cache/nba_games_*.pkl)"""
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    return sorted({game['game_id'] for game in data['games']})
+
+
+class Checkpoint:
+    """Per-game backfill progress in SQLite, written only by the coordinating thread"""
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS progress (
+                game_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                bytes INTEGER,
+                error TEXT,
+                updated_at TEXT NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def pending(self, game_ids: List[str], max_attempts: int, retry_missing: bool) -> List[str]:
+        """The games still to fetch: never tried, or failed fewer than max_attempts times"""
+        done = {}
+        for game_id, status, attempts in self.conn.execute('SELECT game_id, status, attempts FROM progress'):
+            done[game_id] = (status, attempts)
+        todo = []
+        for game_id in game_ids:
+            status, attempts = done.get(game_id, (None, 0))
+            if status == 'done':
+                continue
+            if status == 'missing' and not retry_missing:
+                continue
+            if status == 'error' and attempts >= max_attempts:
+                continue
+            todo.append(game_id)
+        return todo
+
+    def record(self, game_id: str, status: str, size: Optional[int] = None, error: Optional[str] = None):
+        self.conn.execute('''
+            INSERT INTO progress (game_id, status, attempts, bytes, error, updated_at)
+            VALUES (?, ?, 1, ?, ?, ?)
+            ON CONFLICT(game_id) DO UPDATE SET
+                status = excluded.status, attempts = attempts + 1,
+                bytes = excluded.bytes, error = excluded.error, updated_at = excluded.updated_at
+        ''', (game_id, status, size, error, datetime.now().isoformat()))
+        self.conn.commit()
+
+    def summary(self) -> Dict[str, int]:
+        return dict(self.conn.execute('SELECT status, COUNT(*) FROM progress GROUP BY status').fetchall())
+
+
+class SQLiteOutput:
+    """Raw box score documents in a SQLite table"""
+
+    def __init__(self, db_path: str):
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS boxscores (
+                game_id TEXT PRIMARY KEY,
+                game_status INTEGER,
+                fetched_at TEXT NOT NULL,
+                document TEXT NOT NULL
+            )
+        ''')
+        self.conn.commit()
+
+    def write(self, game_id: str, boxscore: Dict) -> int:
+        document = json.dumps(boxscore, separators=(',', ':'))
+        self.conn.execute('INSERT OR REPLACE INTO boxscores VALUES (?, ?, ?, ?)',
+                          (game_id, boxscore['game'].get('gameStatus'), datetime.now().isoformat(), document))
+        self.conn.commit()
+        return len(document)
+
+
+def fetch_one(client: NBABoxScoreClient, game_id: str, retries_429: int = 3) -> Dict:
+    """
+    Fetch one game in a worker thread; returns {'status', 'boxscore', 'error'} (final games already
+    cached are skipped). A box score whose game is not final yet comes back as 'not_final'.
+    """
+    entry = client.cache_entry(game_id)
+    if entry and entry['compact_bytes'] is not None and entry['game_status'] == GAME_FINAL:
+        return {'status': 'cached', 'boxscore': None, 'error': None, 'bytes': entry['compact_bytes']}
+
+    for attempt in range(retries_429 + 1):
+        status, boxscore, _ = client.fetch_if_changed(game_id, priority=PRIORITY_BACKFILL)
+        if status == 200 and boxscore is not None:
+            final = boxscore.get('game', {}).get('gameStatus') == GAME_FINAL
+            return {'status': 'done' if final else 'not_final', 'boxscore': boxscore, 'error': None}
+        if status == 404:
+            return {'status': 'missing', 'boxscore': None, 'error': None}
+        if status == 429 and attempt < retries_429:
+            continue  # the client already pushed every request slot back
+        return {'status': 'error', 'boxscore': None,
+                'error': 'offline or request failed' if status is None else f"HTTP {status}"}
+
+
+def backfill(client: NBABoxScoreClient, game_ids: List[str], checkpoint: Checkpoint,
+             output: Optional[SQLiteOutput] = None, concurrency: int = 4, report_every: int = 25) -> Dict:
+    """Fetch `game_ids` with at most `concurrency` in flight; returns the run's totals"""
+    totals = {'done': 0, 'not_final': 0, 'cached': 0, 'missing': 0, 'error': 0, 'bytes': 0}
+    stop = threading.Event()
+    start = time.time()
+
+    def finished():
+        return sum(totals[k] for k in ('done', 'not_final', 'cached', 'missing', 'error'))
+
+    def report(final=False):
+        elapsed = max(time.time() - start, 1e-9)
+        print(f"[BACKFILL] {'finished' if final else 'progress'} {finished()}/{len(game_ids)} games "
+              f"in {elapsed:.0f}s: {totals['done']} fetched, {totals['not_final']} not final yet, "
+              f"{totals['cached']} already cached, "
+              f"{totals['missing']} without box score, {totals['error']} errors, "
+              f"{totals['bytes'] / 1024:.0f} KiB written, {totals['done'] / elapsed * 60:.1f} games/min")
+
+    def complete(game_id, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'status': 'error', 'boxscore': None, 'error': str(e)}
+
+        size = result.get('bytes')
+        if result['status'] == 'cached' and output is not None:
+            document = client.load_raw(game_id)
+            if document is not None:
+                size = output.write(game_id, document)
+                totals['bytes'] += size
+        if result['status'] in ('done', 'not_final'):
+            if output is not None:
+                size = output.write(game_id, result['boxscore'])
+            else:
+                entry = client.cache_entry(game_id) or {}
+                size = (entry.get('compact_bytes') or 0) + (entry.get('raw_bytes') or 0)
+            totals['bytes'] += size
+        elif result['status'] == 'error':
+            print(f"[BACKFILL] {game_id}: {result['error']}")
+        totals[result['status']] += 1
+        checkpoint.record(game_id, 'done' if result['status'] == 'cached' else result['status'],
+                          size, result.get('error'))
+
+    remaining = iter(game_ids)
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='backfill') as executor:
+        in_flight = {}
+
+        def submit_next():
+            game_id = next(remaining, None)
+            if game_id is not None and not stop.is_set():
+                in_flight[executor.submit(fetch_one, client, game_id)] = game_id
+
+        for _ in range(concurrency):
+            submit_next()
+
+        try:
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    complete(in_flight.pop(future), future)
+                    submit_next()
+                    if report_every and finished() % report_every == 0:
+                        report()
+        except KeyboardInterrupt:
+            # Let in-flight games finish and be checkpointed; the rest resume next run
+            print("[BACKFILL] Interrupted, finishing in-flight games")
+            stop.set()
+            for future, game_id in list(in_flight.items()):
+                complete(game_id, future)
+
+    report(final=True)
+    totals['elapsed'] = time.time() - start
+    return totals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Backfill NBA box scores into the cache')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--season', help="Every regular season game id of a season, e.g. 2025-26")
+    source.add_argument('--schedule', help='Cached /api/nba-games payload (.pkl) to take game ids from')
+    source.add_argument('--game-ids', nargs='+', help='Explicit game ids')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--output', choices=['cache', 'sqlite'], default='cache',
+                        help='cache: the client cache the API serves from; sqlite: raw documents in --db')
+    parser.add_argument('--db', default='boxscores.db', help='SQLite file for --output sqlite')
+    parser.add_argument('--cache-dir', help='Box score cache directory (default: NBA_BOXSCORE_CACHE_DIR or ./boxscore_cache)')
+    parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    parser.add_argument('--max-attempts', type=int, default=3, help='Give up on a game after this many failed runs')
+    parser.add_argument('--retry-missing', action='store_true', help='Retry games that had no box score last time')
+    parser.add_argument('--min-delay', type=float, help='Override the client spacing between requests (seconds)')
+    parser.add_argument('--limit', type=int, help='Only backfill the first N pending games')
+    args = parser.parse_args()
+
+    if args.season:
+        game_ids = season_game_ids(args.season)
+    elif args.schedule:
+        game_ids = schedule_game_ids(args.schedule)
+    else:
+        game_ids = args.game_ids
+
+    client = NBABoxScoreClient(cache_dir=args.cache_dir)
+    if args.min_delay is not None:
+        client.min_delay = args.min_delay
+
+    checkpoint = Checkpoint(args.checkpoint)
+    todo = checkpoint.pending(game_ids, args.max_attempts, args.retry_missing)
+    print(f"[BACKFILL] {len(game_ids)} games requested, {len(game_ids) - len(todo)} already checkpointed")
+    if args.limit:
+        todo = todo[:args.limit]
+    print(f"[BACKFILL] Fetching {len(todo)} games with concurrency {args.concurrency}")
+
+    output = SQLiteOutput(args.db) if args.output == 'sqlite' else None
+    backfill(client, todo, checkpoint, output, concurrency=args.concurrency)
+    print(f"[BACKFILL] Checkpoint {os.path.abspath(args.checkpoint)}: {checkpoint.summary()}")
+
+
+if __name__ == "__main__":
+    main()
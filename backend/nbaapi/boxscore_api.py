@@ -4,6 +4,8 @@ Flask API endpoints for box scores
 from flask import Flask, jsonify, request
 from flask_cors import CORS
 from nba_boxscore_safe import get_boxscore_client
+from boxscore_views import canonical_boxscore, frontend_view
+from rate_limiter import create_rate_limiter
 import logging
 from datetime import datetime
 import time
@@ -35,27 +37,7 @@ def get_boxscore(game_id):
         if data['success']:
             if simple_format:
                 # Return simplified version for frontend
-                simplified = {
-                    'success': True,
-                    'game_id': game_id,
-                    'home_team': data['game']['home_team'],
-                    'away_team': data['game']['away_team'],
-                    'players': [
-                        {
-                            'name': p['name'],
-                            'team': p['team_city'],
-                            'points': p['points'],
-                            'rebounds': p['rebounds'],
-                            'assists': p['assists'],
-                            'minutes': p['minutes'],
-                            'fg': f"{p['fg_made']}/{p['fg_attempted']}",
-                            'three': f"{p['three_made']}/{p['three_attempted']}"
-                        }
-                        for p in data['players']
-                    ],
-                    'attribution': data['attribution']
-                }
-                return jsonify(simplified)
+                return jsonify(frontend_view(game_id, canonical_boxscore(data)))
             else:
                 return jsonify(data)
         else:
@@ -86,11 +68,9 @@ def health_check():
 @app.route('/api/boxscore/cache/clear', methods=['POST'])
 def clear_cache():
     """Clear the cache (admin endpoint)"""
-    import shutil
     try:
         if os.path.exists(client.cache_dir):
-            shutil.rmtree(client.cache_dir)
-            os.makedirs(client.cache_dir, exist_ok=True)
+            client.clear_cache()
             return jsonify({'success': True, 'message': 'Cache cleared'})
         else:
             return jsonify({'success': False, 'error': 'Cache directory not found'}), 404
@@ -98,11 +78,22 @@ def clear_cache():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 # Rate limiting middleware
+RATE_LIMIT_REQUESTS = int(os.environ.get('BOXSCORE_API_RATE_LIMIT', '10'))  # per client per minute
+rate_limiter = create_rate_limiter(limit=RATE_LIMIT_REQUESTS, window=60, namespace='boxscore_api')
+
 @app.before_request
 def rate_limit():
-    """Simple rate limiting"""
+    """Sliding-window rate limiting per client address"""
     from flask import g
     g.request_start_time = time.time()
+    if request.endpoint == 'health_check':
+        return None
+    g.rate_limit = rate_limiter.hit(request.remote_addr)
+    if not g.rate_limit.allowed:
+        return jsonify({
+            'success': False,
+            'error': 'Rate limit exceeded'
+        }), 429
 
 @app.after_request
 def add_rate_limit_headers(response):
@@ -110,8 +101,8 @@ def add_rate_limit_headers(response):
     from flask import g
     if hasattr(g, 'request_start_time'):
         response.headers['X-Response-Time'] = time.time() - g.request_start_time
-    response.headers['X-RateLimit-Limit'] = '10'
-    response.headers['X-RateLimit-Remaining'] = '9'  # Simplified
+    if hasattr(g, 'rate_limit'):
+        response.headers.update(g.rate_limit.headers())
     return response
 
 if __name__ == '__main__':
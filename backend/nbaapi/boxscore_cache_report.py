@@ -0,0 +1,115 @@
+"""
+Disk footprint and load latency of the box score cache, old format vs compact
+
+Copies a cache directory of old-format <md5>.json files to a temporary
+directory, converts the copy with NBABoxScoreClient.migrate_legacy_cache(),
+and reports:
+  - bytes on disk before, and after split into compact / raw / index
+  - latency of a cached get_player_stats() load in each format
+  - latency of a freshness check (index row vs parsing the whole file)
+  - that build_player_stats() returns identical output from both formats
+
+The source directory is never modified.
+
+Usage:
+    python boxscore_cache_report.py
+    python boxscore_cache_report.py --cache-dir ./boxscore_cache --repeat 5
+"""
+import argparse
+import glob
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from nba_boxscore_safe import NBABoxScoreClient
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boxscore_cache')
+
+
+def dir_bytes(path, pattern='**/*'):
+    return sum(os.path.getsize(p) for p in glob.glob(os.path.join(path, pattern), recursive=True)
+               if os.path.isfile(p))
+
+
+def time_each(game_ids, load, repeat):
+    """Median per-game latency of load(game_id) in microseconds"""
+    samples = []
+    for _ in range(repeat):
+        for game_id in game_ids:
+            start = time.perf_counter()
+            load(game_id)
+            samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1e6
+
+
+def legacy_freshness(client, game_id):
+    with open(client._get_cache_path(game_id), 'r') as f:
+        return json.load(f)['_cache_metadata']['cached_at']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare old and compact box score cache formats')
+    parser.add_argument('--cache-dir', default=CORPUS_DIR, help='Directory of old-format cache files')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-raw', action='store_true', help='Do not keep the gzipped originals')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix='boxscore_report_')
+    try:
+        legacy_dir = os.path.join(work_dir, 'legacy')
+        compact_dir = os.path.join(work_dir, 'compact_cache')
+        shutil.copytree(args.cache_dir, legacy_dir)
+        shutil.copytree(args.cache_dir, compact_dir)
+
+        legacy = NBABoxScoreClient(cache_dir=legacy_dir, max_cache_days=100000)
+        compact = NBABoxScoreClient(cache_dir=compact_dir, max_cache_days=100000, keep_raw=not args.no_raw)
+
+        game_ids = []
+        for path in sorted(glob.glob(os.path.join(legacy_dir, '*.json'))):
+            with open(path, 'r') as f:
+                game_ids.append(json.load(f)['_cache_metadata']['game_id'])
+        before = dir_bytes(legacy_dir, '*.json')
+
+        converted = compact.migrate_legacy_cache()
+        compact_bytes = dir_bytes(compact_dir, 'compact/*.json')
+        raw_bytes = dir_bytes(compact_dir, 'raw/*.json.gz')
+        index_bytes = dir_bytes(compact_dir, 'index.db')
+
+        # Time the legacy reads with a client whose index stays empty, so nothing gets converted;
+        # compact reads ignore the cache TTLs so parity compares stored content, not freshness
+        def legacy_load(game_id):
+            with open(legacy._get_cache_path(game_id), 'r') as f:
+                return legacy.build_player_stats(game_id, json.load(f))
+
+        def compact_load(game_id):
+            return compact.build_player_stats(game_id, compact._load_from_cache(game_id, any_age=True))
+
+        mismatches = [game_id for game_id in game_ids if legacy_load(game_id) != compact_load(game_id)]
+
+        legacy_us = time_each(game_ids, legacy_load, args.repeat)
+        compact_us = time_each(game_ids, compact_load, args.repeat)
+        legacy_fresh_us = time_each(game_ids, lambda g: legacy_freshness(legacy, g), args.repeat)
+        compact_fresh_us = time_each(game_ids, compact.cache_entry, args.repeat)
+
+        print(f"games: {len(game_ids)} ({converted} converted)")
+        print(f"disk, old format:      {before / 1024:9.1f} KiB")
+        print(f"disk, compact:         {compact_bytes / 1024:9.1f} KiB ({compact_bytes / before:.1%} of old)")
+        print(f"disk, raw (gzip):      {raw_bytes / 1024:9.1f} KiB")
+        print(f"disk, index:           {index_bytes / 1024:9.1f} KiB")
+        print(f"disk, compact+index:   {(compact_bytes + index_bytes) / 1024:9.1f} KiB")
+        print(f"disk, all new files:   {(compact_bytes + raw_bytes + index_bytes) / 1024:9.1f} KiB "
+              f"({(compact_bytes + raw_bytes + index_bytes) / before:.1%} of old)")
+        print(f"player stats load:     {legacy_us:9.0f} us old, {compact_us:.0f} us compact "
+              f"({legacy_us / compact_us:.1f}x)")
+        print(f"freshness check:       {legacy_fresh_us:9.0f} us old, {compact_fresh_us:.0f} us index "
+              f"({legacy_fresh_us / compact_fresh_us:.1f}x)")
+        print(f"parity:                {'identical' if not mismatches else f'{len(mismatches)} games differ: {mismatches[:5]}'}")
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
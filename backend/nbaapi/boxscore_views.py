@@ -0,0 +1,101 @@
+"""
+One processed box score per game, with the response shapes projected from it
+
+The box score endpoints used to cache the processed payload and the simple
+payload separately, each a list of per-player dicts repeating every key.
+The canonical form keeps the game info once and each player as a tuple in
+PLAYER_COLUMNS order; full_view, simple_view and frontend_view build the
+response shapes from it when a request is served.
+"""
+from typing import Dict
+
+# Field order of a player row; matches NBABoxScoreClient._process_player_data
+PLAYER_COLUMNS = (
+    'player_id', 'name', 'first_name', 'last_name', 'jersey', 'position', 'team_id', 'team_city',
+    'starter', 'minutes', 'points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers', 'fouls',
+    'fg_made', 'fg_attempted', 'fg_percentage', 'three_made', 'three_attempted', 'three_percentage',
+    'ft_made', 'ft_attempted', 'ft_percentage', 'plus_minus',
+)
+_COLUMN = {name: index for index, name in enumerate(PLAYER_COLUMNS)}
+
+# Player fields of the /api/game/<id>/simple-boxscore payload
+SIMPLE_PLAYER_FIELDS = (
+    'name', 'player_id', 'team_id', 'team_city', 'position', 'jersey', 'starter', 'minutes',
+    'points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers', 'fouls',
+    'fg_made', 'fg_attempted', 'fg_percentage', 'three_made', 'three_attempted', 'three_percentage',
+    'ft_made', 'ft_attempted', 'ft_percentage', 'plus_minus',
+)
+_SIMPLE_INDEXES = tuple(_COLUMN[name] for name in SIMPLE_PLAYER_FIELDS)
+
+ATTRIBUTION = {
+    'source': 'NBA.com',
+    'disclaimer': 'Data for educational/demo purposes',
+    'copyright': '© NBA Media Ventures, LLC.'
+}
+
+
+def canonical_boxscore(payload: Dict) -> Dict:
+    """
+    Canonical form of a get_player_stats payload: {'success', 'game', 'rows'}.
+    Failure payloads are returned unchanged.
+    """
+    if not payload.get('success'):
+        return payload
+    return {
+        'success': True,
+        'game': payload['game'],
+        'rows': [tuple(player[name] for name in PLAYER_COLUMNS) for player in payload['players']],
+    }
+
+
+def full_view(canonical: Dict) -> Dict:
+    """The /api/game/<id>/boxscore payload, identical to get_player_stats"""
+    return {
+        'success': True,
+        'game': canonical['game'],
+        'players': [dict(zip(PLAYER_COLUMNS, row)) for row in canonical['rows']],
+        'attribution': ATTRIBUTION,
+    }
+
+
+def simple_view(game_id: str, canonical: Dict) -> Dict:
+    """The /api/game/<id>/simple-boxscore payload"""
+    game = canonical['game']
+    return {
+        'success': True,
+        'game_id': game_id,
+        'game_status': game.get('game_status'),
+        'date': game['date'],
+        'home_team': {key: game['home_team'][key] for key in ('name', 'city', 'score')},
+        'away_team': {key: game['away_team'][key] for key in ('name', 'city', 'score')},
+        'players': [
+            dict(zip(SIMPLE_PLAYER_FIELDS, (row[index] for index in _SIMPLE_INDEXES)))
+            for row in canonical['rows']
+        ],
+    }
+
+
+def frontend_view(game_id: str, canonical: Dict) -> Dict:
+    """The boxscore_api.py ?simple=true payload"""
+    game = canonical['game']
+    column = _COLUMN
+    return {
+        'success': True,
+        'game_id': game_id,
+        'home_team': game['home_team'],
+        'away_team': game['away_team'],
+        'players': [
+            {
+                'name': row[column['name']],
+                'team': row[column['team_city']],
+                'points': row[column['points']],
+                'rebounds': row[column['rebounds']],
+                'assists': row[column['assists']],
+                'minutes': row[column['minutes']],
+                'fg': f"{row[column['fg_made']]}/{row[column['fg_attempted']]}",
+                'three': f"{row[column['three_made']]}/{row[column['three_attempted']]}"
+            }
+            for row in canonical['rows']
+        ],
+        'attribution': ATTRIBUTION,
+    }
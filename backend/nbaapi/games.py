@@ -1,9 +1,18 @@
-from flask import Flask, jsonify, Response, send_file, request
+from flask import Flask, jsonify, Response, send_file, request, make_response, g, has_request_context
+from werkzeug.middleware.proxy_fix import ProxyFix
 import io
 from flask_cors import CORS
 import pandas as pd
+from nba_api.stats.library.http import NBAStatsHTTP
 from nba_api.stats.endpoints import leaguegamefinder, playergamelog, leaguestandings, commonteamroster, playercareerstats, commonplayerinfo, leaguedashplayerstats, leaguehustlestatsplayer, playerestimatedmetrics, scoreboardv2, scheduleleaguev2
-from nba_boxscore_safe import get_boxscore_client
+from nba_boxscore_safe import get_boxscore_client, boxscore_ttl, UNAVAILABLE_TTL
+from live_games import LivePoller, sse_stream
+from boxscore_views import canonical_boxscore, full_view, simple_view
+from player_lines import PlayerLineStore, STAT_COLUMNS, RATIO_STATS
+from rate_limiter import create_rate_limiter
+from shared_cache import SharedCache, MISS as SHARED_MISS
+from offline import offline_mode, UpstreamOffline, UPSTREAMS
+import local_stores
 import requests
 import numpy as np
 import time
@@ -11,20 +20,32 @@ import random
 import pickle
 import json
 import os
+import hmac
 from datetime import datetime, timedelta
 from functools import wraps, lru_cache
+from collections import OrderedDict
+from contextlib import nullcontext
+from contextvars import ContextVar
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 app = Flask(__name__)
+CORS_ORIGINS = ["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5173", "http://127.0.0.1:5173"]
 CORS(app, 
-     origins=["http://localhost:3000", "http://127.0.0.1:3000", "http://localhost:5173", "http://127.0.0.1:5173"],
+     origins=CORS_ORIGINS,
      supports_credentials=True,
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
      allow_headers=["Content-Type", "Authorization", "Accept"])
 
+# ========== UPSTREAMS ==========
+# Override to point at a local stand-in (upstream_standin.py) for benchmarks and replays
+NBA_STATS_BASE_URL = os.environ.get('NBA_STATS_BASE_URL')
+if NBA_STATS_BASE_URL:
+    NBAStatsHTTP.base_url = NBA_STATS_BASE_URL.rstrip('/') + '/stats/{endpoint}'
+NBA_CDN_BASE_URL = os.environ.get('NBA_CDN_BASE_URL', 'https://cdn.nba.com').rstrip('/')
+
 # ========== CACHE CONFIGURATION ==========
-CACHE_DIR = 'nba_cache'
+CACHE_DIR = os.environ.get('NBA_CACHE_DIR', 'nba_cache')
 os.makedirs(CACHE_DIR, exist_ok=True)
 
 # Cache durations in minutes
@@ -38,74 +59,223 @@ CACHE_DURATIONS = {
     'player_image': 10080,            # 7 days
     'team_logo': 10080,               # 7 days
     'nba_games': 180,                 # 3 hours
-    'boxscore': 1440,                 # 24 hours
+    'boxscore': 1440,                 # 24 hours, only for payloads without a game status (see boxscore_payload_ttl)
     'player_stats_ranks': 180,
     'player_hustle_stats': 180,
     'player_estimated_metrics': 180,
     'player_stats_percentiles': 180,
 }
 
-# In-memory cache
-memory_cache = {}
+# In-memory cache (per process); NBA_MEMORY_CACHE_ITEMS bounds it as an LRU, 0 = unbounded
+MEMORY_CACHE_MAX_ITEMS = int(os.environ.get('NBA_MEMORY_CACHE_ITEMS', '0'))
+memory_cache = OrderedDict()
 cache_lock = threading.Lock()
 
+# Cross-process tier, shared by every worker when NBA_SHARED_CACHE_DB is set
+SHARED_CACHE_DB = os.environ.get('NBA_SHARED_CACHE_DB')
+shared_cache = SharedCache(SHARED_CACHE_DB) if SHARED_CACHE_DB else None
+if shared_cache is not None:
+    # The manual offline switch then holds for every worker, not just the one that was asked
+    offline_mode.share(shared_cache)
+
 # ========== OPTIMIZED CACHING SYSTEM ==========
-def cached_nba_data(cache_key, fetch_func, cache_minutes=30, force_refresh=False):
+_CACHE_MISS = object()
+
+def lookup_cached(cache_key, cache_minutes=None, ttl_func=None):
     """
-    Advanced caching with memory and disk layers
+    Find a cache key in the memory, shared and disk layers without fetching.
+    cache_minutes=None accepts an entry of any age. ttl_func(data, stored_at),
+    when given, decides the lifetime per value instead: a timedelta, or None
+    for a value that never expires.
+    Returns (data, stored_at, source) or _CACHE_MISS.
     """
+    max_age = None if cache_minutes is None else timedelta(minutes=cache_minutes)
     cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
     
+    def fresh(data, stored_at):
+        ttl = ttl_func(data, stored_at) if ttl_func is not None else max_age
+        return ttl is None or datetime.now() - stored_at < ttl
+    
     # Check memory cache first
     with cache_lock:
-        if not force_refresh and cache_key in memory_cache:
+        if cache_key in memory_cache:
             cached_item = memory_cache[cache_key]
-            if datetime.now() - cached_item['timestamp'] < timedelta(minutes=cache_minutes):
-                return cached_item['data']
+            if fresh(cached_item['data'], cached_item['timestamp']):
+                memory_cache.move_to_end(cache_key)
+                return cached_item['data'], cached_item['timestamp'], 'memory'
+    
+    # Check the shared tier
+    if shared_cache is not None:
+        shared_max_age = None if max_age is None or ttl_func is not None else max_age.total_seconds()
+        entry = shared_cache.get_entry(cache_key, max_age=shared_max_age)
+        if entry is not SHARED_MISS:
+            data, stored_at = entry
+            stored_at = datetime.fromtimestamp(stored_at)
+            if fresh(data, stored_at):
+                remember(cache_key, data, stored_at)
+                return data, stored_at, 'shared'
     
     # Check disk cache
-    if not force_refresh and os.path.exists(cache_file):
-        file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-        if file_age < timedelta(minutes=cache_minutes):
+    if os.path.exists(cache_file):
+        stored_at = datetime.fromtimestamp(os.path.getmtime(cache_file))
+        if ttl_func is not None or max_age is None or datetime.now() - stored_at < max_age:
             try:
                 with open(cache_file, 'rb') as f:
                     data = pickle.load(f)
-                with cache_lock:
-                    memory_cache[cache_key] = {'data': data, 'timestamp': datetime.now()}
-                return data
+                if fresh(data, stored_at):
+                    remember(cache_key, data, stored_at)
+                    return data, stored_at, 'disk'
             except Exception as e:
-                os.remove(cache_file)
+                if max_age is not None:
+                    os.remove(cache_file)
     
-    # Fetch fresh data
-    try:
-        data = fetch_func()
-        
-        # Save to disk
+    return _CACHE_MISS
+
+def read_cached(cache_key, cache_minutes=30, force_refresh=False, ttl_func=None):
+    """
+    Look up a fresh value in the memory, shared and disk layers without fetching.
+    Returns _CACHE_MISS when no layer has a fresh value.
+    """
+    if force_refresh:
+        return _CACHE_MISS
+    entry = lookup_cached(cache_key, cache_minutes, ttl_func)
+    if entry is _CACHE_MISS:
+        return _CACHE_MISS
+    data, stored_at, source = entry
+    note_data_source(source, stored_at)
+    return data
+
+def remember(cache_key, data, stored_at=None):
+    """Put a value in this process's memory layer, evicting the least recently used past the bound"""
+    with cache_lock:
+        memory_cache[cache_key] = {'data': data, 'timestamp': stored_at or datetime.now()}
+        memory_cache.move_to_end(cache_key)
+        if MEMORY_CACHE_MAX_ITEMS:
+            while len(memory_cache) > MEMORY_CACHE_MAX_ITEMS:
+                memory_cache.popitem(last=False)
+
+def write_cached(cache_key, data):
+    """Store a freshly fetched value in the shared (or disk) and memory layers"""
+    if shared_cache is not None:
+        try:
+            shared_cache.set(cache_key, data)
+        except Exception as e:
+            print(f"[CACHE] Error saving to shared cache {cache_key}: {e}")
+    else:
+        cache_file = os.path.join(CACHE_DIR, f"{cache_key}.pkl")
         try:
             with open(cache_file, 'wb') as f:
                 pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
         except Exception as e:
             print(f"[CACHE] Error saving to disk {cache_key}: {e}")
-        
-        # Save to memory
-        with cache_lock:
-            memory_cache[cache_key] = {'data': data, 'timestamp': datetime.now()}
-        
+    
+    remember(cache_key, data)
+
+def read_stale_cached(cache_key):
+    """Return whatever any layer has for a key regardless of age, or _CACHE_MISS"""
+    entry = lookup_cached(cache_key)
+    if entry is _CACHE_MISS:
+        return _CACHE_MISS
+    data, stored_at, source = entry
+    note_data_source(f'stale-{source}', stored_at)
+    return data
+
+def read_local_fallback(local_fallback):
+    """Run a local-store fallback, returning its data or _CACHE_MISS"""
+    if local_fallback is None:
+        return _CACHE_MISS
+    try:
+        result = local_fallback()
+    except Exception as e:
+        print(f"[OFFLINE] Local fallback failed: {e}")
+        return _CACHE_MISS
+    if result is None:
+        return _CACHE_MISS
+    data, scraped_at = result
+    note_data_source('local-store', datetime.fromtimestamp(scraped_at))
+    return data
+
+def cached_nba_data(cache_key, fetch_func, cache_minutes=30, force_refresh=False,
+                    upstream='stats', local_fallback=None, ttl_func=None):
+    """
+    Advanced caching with memory, shared and disk layers.
+    `ttl_func(data, stored_at)` replaces cache_minutes for values whose lifetime
+    depends on their content (see lookup_cached).
+    While `upstream` is offline the fetch is skipped entirely: stale cache first,
+    then `local_fallback` (returning (data, scraped_at) from a local store).
+    """
+    data = read_cached(cache_key, cache_minutes, force_refresh, ttl_func)
+    if data is not _CACHE_MISS:
         return data
+    
+    if offline_mode.is_offline(upstream):
+        for data in (read_stale_cached(cache_key), read_local_fallback(local_fallback)):
+            if data is not _CACHE_MISS:
+                return data
+        raise UpstreamOffline(f"{UPSTREAMS[upstream]} is offline and no local copy of {cache_key} exists")
+    
+    with cache_fill_lock(cache_key):
+        # Another worker may have fetched it while we waited for the lock
+        if not force_refresh:
+            data = read_cached(cache_key, cache_minutes, ttl_func=ttl_func)
+            if data is not _CACHE_MISS:
+                return data
         
-    except Exception as e:
-        # If fetch fails, try to use stale cache
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'rb') as f:
-                    return pickle.load(f)
-            except:
-                pass
-        raise e
+        # Fetch fresh data
+        try:
+            data = fetch_func()
+            write_cached(cache_key, data)
+            note_data_source('upstream', datetime.now())
+            return data
+            
+        except Exception as e:
+            # If fetch fails, try to use stale cache, then the local stores
+            for data in (read_stale_cached(cache_key), read_local_fallback(local_fallback)):
+                if data is not _CACHE_MISS:
+                    return data
+            raise e
+
+def cache_fill_lock(cache_key):
+    """Single-flight lock for fetching a key: across processes with the shared tier, a no-op without it"""
+    if shared_cache is not None:
+        return shared_cache.fill_lock(cache_key)
+    return nullcontext()
+
+# ========== DATA PROVENANCE ==========
+# Per-request record for requests served outside Flask (the ASGI box score routes)
+data_provenance = ContextVar('data_provenance', default=None)
+
+def note_data_source(source, stored_at):
+    """Record where this request's data came from; the oldest piece sets X-Data-Age"""
+    if has_request_context():
+        record = g.setdefault('data_provenance', {'sources': [], 'stored_at': None})
+    else:
+        record = data_provenance.get()
+        if record is None:
+            return
+    if source not in record['sources']:
+        record['sources'].append(source)
+    if record['stored_at'] is None or stored_at < record['stored_at']:
+        record['stored_at'] = stored_at
+
+def provenance_headers(record):
+    """X-Offline-Mode plus X-Data-Source / X-Data-Age for a provenance record"""
+    headers = {'X-Offline-Mode': 'true' if offline_mode.is_offline() else 'false'}
+    if record and record['sources']:
+        headers['X-Data-Source'] = ','.join(record['sources'])
+        age = datetime.now() - record['stored_at']
+        headers['X-Data-Age'] = str(max(0, int(age.total_seconds())))
+    return headers
+
+@app.after_request
+def label_data_provenance(response):
+    """Label every response with where its data came from and how old it is"""
+    response.headers.update(provenance_headers(g.get('data_provenance')))
+    return response
 
 # ========== OPTIMIZED NBA API CALLS ==========
 def safe_nba_call(api_func, *args, **kwargs):
-    """Optimized wrapper with retry logic"""
+    """Optimized wrapper with retry logic; fails fast while stats.nba.com is offline"""
     max_retries = 3
     last_error = None
     
@@ -120,44 +290,48 @@ def safe_nba_call(api_func, *args, **kwargs):
         }
     
     for attempt in range(max_retries):
+        if offline_mode.is_offline('stats'):
+            raise last_error or UpstreamOffline(f"{UPSTREAMS['stats']} is offline")
         try:
-            return api_func(*args, **kwargs)
+            result = api_func(*args, **kwargs)
+            offline_mode.record('stats', ok=True)
+            return result
         except Exception as e:
             last_error = e
-            if attempt < max_retries - 1:
+            offline_mode.record('stats', ok=False)
+            if attempt < max_retries - 1 and not offline_mode.is_offline('stats'):
                 wait_time = (2 ** attempt) + random.uniform(0, 1)
                 time.sleep(wait_time)
     
     raise last_error
 
 # ========== RATE LIMITING ==========
-request_times = {}
-rate_lock = threading.Lock()
+RATE_LIMIT_REQUESTS = 100   # per client per window
+RATE_LIMIT_WINDOW = 60      # seconds
+rate_limiter = create_rate_limiter(limit=RATE_LIMIT_REQUESTS, window=RATE_LIMIT_WINDOW, namespace='games')
+
+# Behind a load balancer, trust this many X-Forwarded-For hops for the client address
+PROXY_HOPS = int(os.environ.get('NBA_PROXY_HOPS', '0'))
+if PROXY_HOPS:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=PROXY_HOPS)
 
 def rate_limit_decorator(func):
-    """Optimized rate limiting decorator"""
+    """Sliding-window rate limiting per client address"""
     @wraps(func)
     def wrapper(*args, **kwargs):
-        ip = request.remote_addr
-        current_time = time.time()
-        
-        with rate_lock:
-            if ip in request_times:
-                request_times[ip] = [t for t in request_times[ip] if current_time - t < 60]
-            else:
-                request_times[ip] = []
-            
-            if len(request_times[ip]) >= 100:
-                return jsonify({
-                    'success': False,
-                    'error': 'Rate limit exceeded',
-                    'message': 'Please wait 60 seconds before making more requests',
-                    'timestamp': datetime.now().isoformat()
-                }), 429
-            
-            request_times[ip].append(current_time)
-        
-        return func(*args, **kwargs)
+        result = rate_limiter.hit(request.remote_addr)
+        
+        if not result.allowed:
+            return jsonify({
+                'success': False,
+                'error': 'Rate limit exceeded',
+                'message': f'Please wait {result.headers()["Retry-After"]} seconds before making more requests',
+                'timestamp': datetime.now().isoformat()
+            }), 429, result.headers()
+        
+        response = make_response(func(*args, **kwargs))
+        response.headers.update(result.headers())
+        return response
     
     return wrapper
 
@@ -198,9 +372,65 @@ def format_season_id(season_id):
             return season_id
     return season_id
 
+def boxscore_payload_ttl(data, stored_at):
+    """Lifetime of a cached canonical box score, following the client's finality-aware policy"""
+    if not isinstance(data, dict) or not data.get('success'):
+        return UNAVAILABLE_TTL
+    game = data['game']
+    return boxscore_ttl(game.get('game_status'), game.get('date'), stored_at,
+                        default=timedelta(minutes=CACHE_DURATIONS['boxscore']))
+
+def boxscore_from_local_cache(game_id):
+    """Canonical box score from the client's JSON cache at any age, as (data, cached_at) for offline mode"""
+    boxscore = boxscore_client._load_from_cache(game_id, any_age=True)
+    if not boxscore:
+        return None
+    data = boxscore_client.build_player_stats(game_id, boxscore)
+    if not data['success']:
+        return None
+    cached_at = datetime.fromisoformat(boxscore['_cache_metadata']['cached_at']).timestamp()
+    return canonical_boxscore(data), cached_at
+
+def boxscore_cache_key(game_id):
+    """The one cache entry per game that every box score response shape is projected from"""
+    return f"canonical_boxscore_{game_id}"
+
+def fetch_canonical_boxscore(game_id):
+    """Fetch a game's canonical box score and append its player lines to the columnar store"""
+    data = canonical_boxscore(boxscore_client.get_player_stats(game_id))
+    player_lines.add(data)
+    return data
+
+def cached_boxscore(game_id):
+    """Canonical box score for a game through the cache layers (see boxscore_views)"""
+    return cached_nba_data(boxscore_cache_key(game_id),
+                           lambda: fetch_canonical_boxscore(game_id),
+                           ttl_func=boxscore_payload_ttl,
+                           upstream='cdn',
+                           local_fallback=lambda: boxscore_from_local_cache(game_id))
+
 # Create the boxscore client instance
 boxscore_client = get_boxscore_client()
 
+# Every player line of the cached box scores, for season-level queries
+player_lines = PlayerLineStore()
+# Seconds between scans of the box score cache index for games cached by other processes
+PLAYER_LINES_SYNC_INTERVAL = float(os.environ.get('NBA_PLAYER_LINES_SYNC_INTERVAL', '60'))
+
+def synced_player_lines():
+    """The columnar store, after picking up games cached since the last scan"""
+    player_lines.sync_from_client(boxscore_client, min_interval=PLAYER_LINES_SYNC_INTERVAL)
+    return player_lines
+
+def refresh_live_caches(game_id, payload):
+    """Every live poll refreshes the box score endpoints' cache, so REST pollers share it"""
+    canonical = canonical_boxscore(payload)
+    write_cached(boxscore_cache_key(game_id), canonical)
+    player_lines.add(canonical)
+
+# One upstream poller per watched live game, shared by every /live viewer
+live_poller = LivePoller(boxscore_client, on_update=refresh_live_caches)
+
 # ========== YOUR EXISTING ENDPOINTS (OPTIMIZED) ==========
 
 @app.route('/api/nba-games', methods=['GET'])
@@ -431,17 +661,10 @@ def get_nba_games_fixed():
 def get_game_boxscore(game_id):
     """Get detailed box score for a specific game"""
     try:
-        cache_key = f"boxscore_{game_id}"
-        
-        def fetch_boxscore():
-            data = boxscore_client.get_player_stats(game_id)
-            return data
-        
-        data = cached_nba_data(cache_key, fetch_boxscore,
-                              cache_minutes=CACHE_DURATIONS['boxscore'])
+        data = cached_boxscore(game_id)
         
         if data['success']:
-            return jsonify(data)
+            return jsonify(full_view(data))
         else:
             return jsonify({
                 'success': False,
@@ -460,68 +683,12 @@ def get_game_boxscore(game_id):
 def get_simple_boxscore(game_id):
     """Get simplified box score for frontend display"""
     try:
-        cache_key = f"simple_boxscore_{game_id}"
-        
-        def fetch_simple_boxscore():
-            data = boxscore_client.get_player_stats(game_id)
-            
-            if not data:
-                raise Exception('No data returned from boxscore client')
-            
-            if isinstance(data, dict) and data.get('success', False):
-                simplified = {
-                    'success': True,
-                    'game_id': game_id,
-                    'home_team': {
-                        'name': data['game']['home_team']['name'],
-                        'city': data['game']['home_team']['city'],
-                        'score': data['game']['home_team']['score']
-                    },
-                    'away_team': {
-                        'name': data['game']['away_team']['name'],
-                        'city': data['game']['away_team']['city'],
-                        'score': data['game']['away_team']['score']
-                    },
-                    'players': [
-                        {
-                            'name': p['name'],
-                            'player_id': p['player_id'],
-                            'team_id': p['team_id'],
-                            'team_city': p['team_city'],
-                            'position': p['position'],
-                            'jersey': p['jersey'],
-                            'starter': p['starter'],
-                            'minutes': p['minutes'],
-                            'points': p['points'],
-                            'rebounds': p['rebounds'],
-                            'assists': p['assists'],
-                            'steals': p['steals'],
-                            'blocks': p['blocks'],
-                            'turnovers': p['turnovers'],
-                            'fouls': p['fouls'],
-                            'fg_made': p['fg_made'],
-                            'fg_attempted': p['fg_attempted'],
-                            'fg_percentage': p['fg_percentage'],
-                            'three_made': p['three_made'],
-                            'three_attempted': p['three_attempted'],
-                            'three_percentage': p['three_percentage'],
-                            'ft_made': p['ft_made'],
-                            'ft_attempted': p['ft_attempted'],
-                            'ft_percentage': p['ft_percentage'],
-                            'plus_minus': p['plus_minus']
-                        }
-                        for p in data['players']
-                    ]
-                }
-                return simplified
-            else:
-                error_msg = data.get('error', 'Unknown error') if isinstance(data, dict) else 'Invalid response format'
-                raise Exception(error_msg)
+        data = cached_boxscore(game_id)
         
-        data = cached_nba_data(cache_key, fetch_simple_boxscore,
-                              cache_minutes=CACHE_DURATIONS['boxscore'])
+        if not data.get('success', False):
+            raise Exception(data.get('error', 'Unknown error'))
         
-        return jsonify(data)
+        return jsonify(simple_view(game_id, data))
             
     except KeyError as e:
         return jsonify({
@@ -536,6 +703,70 @@ def get_simple_boxscore(game_id):
             'game_id': game_id
         }), 500
 
+@app.route('/api/game/<game_id>/live', methods=['GET'])
+def get_live_boxscore(game_id):
+    """Stream a game's box score as server-sent events: a snapshot, then per-player deltas"""
+    if not boxscore_client.is_valid_game_id(game_id):
+        return jsonify({
+            'success': False,
+            'error': 'Invalid game id',
+            'game_id': game_id
+        }), 400
+    
+    return Response(sse_stream(live_poller, game_id), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/api/boxscores/leaders', methods=['GET'])
+def get_boxscore_leaders():
+    """
+    Top players by a box score stat over every cached game, e.g.
+    ?stat=plus_minus&agg=avg&last=10&min_games=5&limit=10 (optional team_id, since=YYYY-MM-DD, order=asc)
+    """
+    stat = request.args.get('stat', 'points')
+    agg = request.args.get('agg', 'avg')
+    since = request.args.get('since')
+    try:
+        since_ts = int(datetime.strptime(since, '%Y-%m-%d').timestamp()) if since else None
+        store = synced_player_lines()
+        leaders = store.leaders(
+            stat, agg,
+            limit=min(request.args.get('limit', 10, type=int), 100),
+            team_id=request.args.get('team_id', type=int),
+            last_games=request.args.get('last', type=int),
+            since=since_ts,
+            min_games=request.args.get('min_games', 1, type=int),
+            ascending=request.args.get('order') == 'asc'
+        )
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'stats': list(STAT_COLUMNS) + list(RATIO_STATS)
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'stat': stat,
+        'agg': 'ratio' if stat in RATIO_STATS else agg,
+        'leaders': leaders,
+        'store': store.status()
+    })
+
+@app.route('/api/boxscores/player/<int:player_id>', methods=['GET'])
+def get_boxscore_player_summary(player_id):
+    """A player's totals and averages over cached box scores (?last=N for the most recent N games)"""
+    summary = synced_player_lines().player_summary(player_id, last_games=request.args.get('last', type=int))
+    if summary is None:
+        return jsonify({
+            'success': False,
+            'error': 'No cached box scores for this player',
+            'player_id': player_id
+        }), 404
+    
+    return jsonify({'success': True, **summary})
+
 @app.route('/api/standings', methods=['GET'])
 def get_standings():
     """Get NBA standings for current season"""
@@ -636,7 +867,8 @@ def get_standings():
             }
         
         data = cached_nba_data(cache_key, fetch_standings,
-                              cache_minutes=CACHE_DURATIONS['standings'])
+                              cache_minutes=CACHE_DURATIONS['standings'],
+                              local_fallback=lambda: local_stores.standings(season))
         
         return jsonify({
             'success': True,
@@ -718,7 +950,8 @@ def get_simple_standings():
             }
         
         data = cached_nba_data(cache_key, fetch_simple_standings,
-                              cache_minutes=CACHE_DURATIONS['standings'])
+                              cache_minutes=CACHE_DURATIONS['standings'],
+                              local_fallback=lambda: local_stores.simple_standings(season))
         
         return jsonify({
             'success': True,
@@ -780,7 +1013,8 @@ def get_minimal_standings():
             }
         
         data = cached_nba_data(cache_key, fetch_minimal_standings,
-                              cache_minutes=CACHE_DURATIONS['standings'])
+                              cache_minutes=CACHE_DURATIONS['standings'],
+                              local_fallback=lambda: local_stores.minimal_standings(season))
         
         return jsonify({
             'success': True,
@@ -975,7 +1209,8 @@ def get_team_roster(team_id):
             }
         
         data = cached_nba_data(cache_key, fetch_roster,
-                              cache_minutes=CACHE_DURATIONS['team_roster'])
+                              cache_minutes=CACHE_DURATIONS['team_roster'],
+                              local_fallback=lambda: local_stores.team_roster(team_id, season))
         
         return jsonify({
             'success': True,
@@ -998,8 +1233,9 @@ def get_team_logo(team_id):
         cache_file = os.path.join(CACHE_DIR, f"{cache_key}.svg")
         
         if os.path.exists(cache_file):
-            file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if file_age < timedelta(minutes=CACHE_DURATIONS['team_logo']):
+            stored_at = datetime.fromtimestamp(os.path.getmtime(cache_file))
+            if datetime.now() - stored_at < timedelta(minutes=CACHE_DURATIONS['team_logo']) or offline_mode.is_offline('cdn'):
+                note_data_source('disk', stored_at)
                 with open(cache_file, 'rb') as f:
                     return Response(
                         f.read(),
@@ -1010,7 +1246,10 @@ def get_team_logo(team_id):
                         }
                     )
         
-        logo_url = f"https://cdn.nba.com/logos/nba/{team_id}/primary/L/logo.svg"
+        if offline_mode.is_offline('cdn'):
+            return Response(b'<svg><!-- Placeholder --></svg>', mimetype='image/svg+xml')
+        
+        logo_url = f"{NBA_CDN_BASE_URL}/logos/nba/{team_id}/primary/L/logo.svg"
         
         headers = {
             'User-Agent': 'Mozilla/5.0',
@@ -1520,8 +1759,9 @@ def player_image(player_id):
         cache_file = os.path.join(CACHE_DIR, f"{cache_key}.png")
         
         if os.path.exists(cache_file):
-            file_age = datetime.now() - datetime.fromtimestamp(os.path.getmtime(cache_file))
-            if file_age < timedelta(minutes=CACHE_DURATIONS['player_image']):
+            stored_at = datetime.fromtimestamp(os.path.getmtime(cache_file))
+            if datetime.now() - stored_at < timedelta(minutes=CACHE_DURATIONS['player_image']) or offline_mode.is_offline('cdn'):
+                note_data_source('disk', stored_at)
                 with open(cache_file, 'rb') as f:
                     return Response(
                         f.read(),
@@ -1532,8 +1772,11 @@ def player_image(player_id):
                         }
                     )
         
+        if offline_mode.is_offline('cdn'):
+            return Response(b'Image not available', status=404)
+        
         image_sources = [
-            f"https://cdn.nba.com/headshots/nba/latest/260x190/{player_id}.png",
+            f"{NBA_CDN_BASE_URL}/headshots/nba/latest/260x190/{player_id}.png",
             f"https://ak-static.cms.nba.com/wp-content/uploads/headshots/nba/latest/260x190/{player_id}.png",
         ]
         
@@ -1570,7 +1813,10 @@ def player_image(player_id):
 def nba_image_proxy(player_id):
     """Proxy NBA images to avoid CORS issues"""
     try:
-        nba_url = f"https://cdn.nba.com/headshots/nba/latest/260x190/{player_id}.png"
+        if offline_mode.is_offline('cdn'):
+            return player_image(player_id)
+        
+        nba_url = f"{NBA_CDN_BASE_URL}/headshots/nba/latest/260x190/{player_id}.png"
         
         headers = {
             'X-Data-Source': 'NBA.com',
@@ -2425,13 +2671,43 @@ def health_check():
     """Health check endpoint"""
     memory_items = len(memory_cache)
     return jsonify({
-        'status': 'healthy',
+        'status': 'degraded' if offline_mode.is_offline() else 'healthy',
         'service': 'nba_games_api',
         'timestamp': pd.Timestamp.now().isoformat(),
         'cache': {
             'memory_items': memory_items,
-            'cache_dir': CACHE_DIR
-        }
+            'cache_dir': CACHE_DIR,
+            'shared_cache_db': SHARED_CACHE_DB
+        },
+        'offline_mode': offline_mode.status(),
+        'live_games': live_poller.live_games(),
+        'boxscore_queue': boxscore_client.queue_depth(),
+        'player_lines': player_lines.status()
+    })
+
+# Bearer token for POST /api/admin/offline; switching is disabled while unset
+ADMIN_TOKEN = os.environ.get('NBA_ADMIN_TOKEN', '')
+
+@app.route('/api/admin/offline', methods=['GET', 'POST'])
+def offline_mode_switch():
+    """
+    Show or set the manual offline switch (POST {"enabled": true|false} with
+    "Authorization: Bearer $NBA_ADMIN_TOKEN"; disabled without NBA_ADMIN_TOKEN).
+    Shared by every worker with NBA_SHARED_CACHE_DB, per process without it.
+    """
+    if request.method == 'POST':
+        if not ADMIN_TOKEN:
+            return jsonify({'success': False, 'error': 'Offline switching is disabled (NBA_ADMIN_TOKEN not set)'}), 403
+        token = request.headers.get('Authorization', '').removeprefix('Bearer ').strip()
+        if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+            return jsonify({'success': False, 'error': 'Invalid admin token'}), 403
+        body = request.get_json(silent=True) or {}
+        offline_mode.set_manual(bool(body.get('enabled', True)))
+        print(f"[OFFLINE] Manual offline mode {'on' if offline_mode.manual else 'off'}")
+    
+    return jsonify({
+        'success': True,
+        **offline_mode.status()
     })
 
 if __name__ == '__main__':
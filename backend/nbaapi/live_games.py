@@ -0,0 +1,242 @@
+"""
+Live box score polling with server-sent event fan-out
+
+A LivePoller keeps one background thread per game that has viewers. Each
+thread polls the cdn.nba.com box score with conditional requests (ETag /
+If-Modified-Since), diffs the processed payload against the previous one and
+hands the changes to every subscriber of that game. However many viewers
+watch a game, upstream sees one poll per interval for it. A tracker stops
+when the game goes final or its last viewer leaves.
+
+Events are dicts {'event': name, 'data': payload}:
+    snapshot     the full player stats payload, first event a viewer gets
+    delta        only what changed since the previous poll (see boxscore_delta)
+    unavailable  cdn has no box score for the game yet
+    final        the final payload; the stream ends after it
+"""
+import json
+import logging
+import os
+import queue
+import threading
+from typing import Callable, Dict, List, Optional
+
+from nba_boxscore_safe import NBABoxScoreClient, GAME_FINAL, PREGAME_RECHECK
+
+logger = logging.getLogger(__name__)
+
+# Seconds between polls of a game in progress; polls also wait for the client's shared request slots
+LIVE_POLL_INTERVAL = float(os.environ.get('NBA_LIVE_POLL_INTERVAL', '10'))
+# Seconds between SSE keepalive comments on an idle stream
+SSE_HEARTBEAT = float(os.environ.get('NBA_LIVE_SSE_HEARTBEAT', '15'))
+
+GAME_FIELDS = ['status', 'game_status', 'period', 'game_clock']
+
+
+def boxscore_delta(previous: Dict, current: Dict) -> Optional[Dict]:
+    """
+    Changes between two player stats payloads, or None if nothing changed:
+    {'game': {field: value}, 'scores': {'home': n, 'away': n},
+     'players': {player_id: {stat: value}}, 'removed': [player_id]}
+    New players appear in 'players' with all their fields.
+    """
+    delta = {}
+
+    game = {field: current['game'].get(field) for field in GAME_FIELDS
+            if current['game'].get(field) != previous['game'].get(field)}
+    if game:
+        delta['game'] = game
+
+    scores = {side: current['game'][f'{side}_team']['score'] for side in ('home', 'away')
+              if current['game'][f'{side}_team']['score'] != previous['game'][f'{side}_team']['score']}
+    if scores:
+        delta['scores'] = scores
+
+    before = {p['player_id']: p for p in previous['players']}
+    players = {}
+    for player in current['players']:
+        old = before.get(player['player_id'], {})
+        changed = {key: value for key, value in player.items() if old.get(key) != value}
+        if changed:
+            players[player['player_id']] = changed
+    if players:
+        delta['players'] = players
+
+    removed = set(before) - {p['player_id'] for p in current['players']}
+    if removed:
+        delta['removed'] = sorted(removed)
+
+    return delta or None
+
+
+def format_sse(event: Dict) -> str:
+    """One server-sent event frame"""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'], separators=(',', ':'))}\n\n"
+
+
+class _GameTracker:
+    def __init__(self, game_id: str):
+        self.game_id = game_id
+        self.subscribers: List[Callable[[Dict], None]] = []
+        self.payload: Optional[Dict] = None
+        self.validators: Dict[str, str] = {}
+        self.unavailable = False
+        self.polls = 0
+        self.thread: Optional[threading.Thread] = None
+
+
+class LivePoller:
+    """One upstream poller per watched game, fanning events out to its subscribers"""
+
+    def __init__(self, client: NBABoxScoreClient, interval: float = LIVE_POLL_INTERVAL,
+                 on_update: Optional[Callable[[str, Dict], None]] = None):
+        """
+        Args:
+            client: Box score client used for the conditional fetches
+            interval: Seconds between polls while a game is live
+            on_update: Called with (game_id, payload) after every changed poll, e.g. to refresh a cache
+        """
+        self.client = client
+        self.interval = interval
+        self.on_update = on_update
+        self._trackers: Dict[str, _GameTracker] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self.stats = {'polls': 0, 'not_modified': 0, 'deltas': 0, 'events_delivered': 0}
+
+    def subscribe(self, game_id: str, deliver: Callable[[Dict], None]):
+        """
+        Start receiving a game's events through `deliver`, which must not block
+        (it runs on the poller thread). The current snapshot, if any, is delivered at once.
+        """
+        with self._lock:
+            tracker = self._trackers.get(game_id)
+            if tracker is None:
+                tracker = self._trackers[game_id] = _GameTracker(game_id)
+                tracker.thread = threading.Thread(target=self._run, args=(tracker,),
+                                                  name=f'live-{game_id}', daemon=True)
+                tracker.thread.start()
+            tracker.subscribers.append(deliver)
+            if tracker.payload is not None:
+                self._deliver(deliver, {'event': 'snapshot', 'data': tracker.payload})
+            elif tracker.unavailable:
+                self._deliver(deliver, {'event': 'unavailable', 'data': {'game_id': game_id}})
+
+    def unsubscribe(self, game_id: str, deliver: Callable[[Dict], None]):
+        with self._lock:
+            tracker = self._trackers.get(game_id)
+            if tracker is not None and deliver in tracker.subscribers:
+                tracker.subscribers.remove(deliver)
+
+    def live_games(self) -> Dict[str, Dict]:
+        """Tracked games with their viewer and poll counts"""
+        with self._lock:
+            return {game_id: {'viewers': len(t.subscribers), 'polls': t.polls}
+                    for game_id, t in self._trackers.items()}
+
+    def stop(self):
+        """Stop every tracker; current viewers get a final event"""
+        self._stopping.set()
+
+    def _deliver(self, deliver, event: Dict):
+        try:
+            deliver(event)
+            self.stats['events_delivered'] += 1
+        except Exception as e:
+            logger.warning(f"Dropping live event for a subscriber: {e}")
+
+    def _publish(self, tracker: _GameTracker, event: Dict):
+        with self._lock:
+            for deliver in list(tracker.subscribers):
+                self._deliver(deliver, event)
+
+    def _run(self, tracker: _GameTracker):
+        game_id = tracker.game_id
+        while not self._stopping.is_set():
+            with self._lock:
+                if not tracker.subscribers:
+                    del self._trackers[game_id]
+                    return
+            try:
+                wait = self._poll(tracker)
+            except Exception as e:
+                logger.error(f"Live poll failed for game {game_id}: {e}")
+                wait = self.interval
+            if wait is None:
+                break
+            self._stopping.wait(wait)
+
+        with self._lock:
+            self._trackers.pop(game_id, None)
+            for deliver in tracker.subscribers:
+                self._deliver(deliver, {'event': 'final', 'data': tracker.payload or {'game_id': game_id}})
+
+    def _poll(self, tracker: _GameTracker) -> Optional[float]:
+        """Poll once and publish what changed; returns seconds until the next poll, None when done"""
+        game_id = tracker.game_id
+        if tracker.payload is None:
+            # A final box score is cached for good; no need to ask upstream
+            cached = self.client._load_from_cache(game_id)
+            if cached and cached['game'].get('gameStatus') == GAME_FINAL:
+                tracker.payload = self.client.build_player_stats(game_id, cached)
+                self._publish(tracker, {'event': 'snapshot', 'data': tracker.payload})
+                return None
+
+        status, boxscore, tracker.validators = self.client.fetch_if_changed(game_id, tracker.validators)
+        tracker.polls += 1
+        self.stats['polls'] += 1
+
+        if status == 304:
+            self.stats['not_modified'] += 1
+            return self.interval
+        if boxscore is None:
+            if status == 404 and not tracker.unavailable and tracker.payload is None:
+                tracker.unavailable = True
+                self._publish(tracker, {'event': 'unavailable', 'data': {'game_id': game_id}})
+            # Not published yet, rate limited or offline: back off to the pregame cadence
+            return max(self.interval, PREGAME_RECHECK.total_seconds())
+
+        payload = self.client.build_player_stats(game_id, boxscore)
+        if not payload['success']:
+            return self.interval
+        tracker.unavailable = False
+
+        previous, tracker.payload = tracker.payload, payload
+        if previous is None:
+            self._publish(tracker, {'event': 'snapshot', 'data': payload})
+            changed = True
+        else:
+            delta = boxscore_delta(previous, payload)
+            changed = delta is not None
+            if changed:
+                self.stats['deltas'] += 1
+                self._publish(tracker, {'event': 'delta', 'data': {'game_id': game_id, **delta}})
+
+        if changed and self.on_update is not None:
+            try:
+                self.on_update(game_id, payload)
+            except Exception as e:
+                logger.warning(f"Live update hook failed for game {game_id}: {e}")
+
+        if payload['game'].get('game_status') == GAME_FINAL:
+            return None
+        return self.interval
+
+
+def sse_stream(poller: LivePoller, game_id: str, heartbeat: float = SSE_HEARTBEAT):
+    """Blocking generator of SSE frames for one viewer (for a threaded WSGI server)"""
+    events = queue.Queue()
+    poller.subscribe(game_id, events.put)
+    try:
+        yield 'retry: 5000\n\n'
+        while True:
+            try:
+                event = events.get(timeout=heartbeat)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            yield format_sse(event)
+            if event['event'] == 'final':
+                return
+    finally:
+        poller.unsubscribe(game_id, events.put)
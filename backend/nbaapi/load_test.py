@@ -0,0 +1,124 @@
+"""
+Load test for the ASGI serving mode against a local cdn.nba.com stand-in
+
+Starts upstream_standin.py in replay mode, answering box score requests from
+the documents in boxscore_cache after a fixed upstream latency. Runs one
+async_app worker in-process against it with empty temporary caches and fires
+concurrent cold box score requests, then reports what that single worker
+sustained. --mode executor routes the same requests through
+the Flask app on the bounded executor, which is the ceiling the threaded
+server has.
+
+Usage:
+    python load_test.py --requests 400 --concurrency 200 --latency 0.5
+    python load_test.py --mode executor
+"""
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import tempfile
+import time
+
+import aiohttp
+
+from upstream_standin import UpstreamStandIn, load_boxscore_corpus
+
+CORPUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'boxscore_cache')
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+async def fire(url, total, concurrency, route):
+    """Send `total` requests for distinct games, at most `concurrency` at a time"""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    statuses = {}
+
+    async def one(session, i):
+        async with semaphore:
+            start = time.perf_counter()
+            async with session.get(f"{url}/api/game/00259{i:05d}/{route}") as response:
+                await response.read()
+                statuses[response.status] = statuses.get(response.status, 0) + 1
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=600)) as session:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(session, i) for i in range(total)))
+        elapsed = time.perf_counter() - start
+    return elapsed, latencies, statuses
+
+
+async def run(args):
+    import uvicorn
+
+    documents = load_boxscore_corpus(CORPUS_DIR)
+    standin = UpstreamStandIn(tempfile.mkdtemp(prefix='cassette_'), mode='replay', latency=args.latency,
+                              error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=0)
+    standin.synthesize_boxscores(documents)
+    root_url = standin.start()
+
+    # The app reads these at import time
+    os.environ.update(standin.client_env(root_url))
+    os.environ['NBA_CACHE_DIR'] = tempfile.mkdtemp(prefix='nba_cache_')
+    os.environ['NBA_BOXSCORE_CACHE_DIR'] = tempfile.mkdtemp(prefix='boxscore_cache_')
+    import async_app
+    import games
+
+    # No politeness delay needed against a local stand-in
+    games.boxscore_client.min_delay = 0
+    games.boxscore_client.request_jitter = (0, 0)
+
+    app = async_app.AsyncNBAApp(games.app, executor_workers=args.executor_workers,
+                                native_boxscore=args.mode == 'native')
+    api_port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host='127.0.0.1', port=api_port,
+                                           log_level='warning', lifespan='on'))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    elapsed, latencies, statuses = await fire(f"http://127.0.0.1:{api_port}",
+                                              args.requests, args.concurrency, args.route)
+
+    server.should_exit = True
+    await serve_task
+    standin.stop()
+
+    latencies.sort()
+    print(f"mode={args.mode} route={args.route} corpus={len(documents)} games "
+          f"upstream_latency={args.latency}s executor_workers={args.executor_workers}")
+    print(f"  requests:            {args.requests} at concurrency {args.concurrency}")
+    print(f"  statuses:            {statuses}")
+    print(f"  elapsed:             {elapsed:.2f}s")
+    print(f"  throughput:          {args.requests / elapsed:.1f} req/s")
+    print(f"  latency p50/p95:     {statistics.median(latencies):.3f}s / "
+          f"{latencies[int(len(latencies) * 0.95) - 1]:.3f}s")
+    print(f"  peak in flight:      {app.stats['peak_in_flight']} (worker), "
+          f"{standin.stats['peak_in_flight']} (upstream)")
+    print(f"  injected faults:     {standin.stats['injected_errors']} x 500, {standin.stats['injected_429s']} x 429")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the ASGI serving mode')
+    parser.add_argument('--mode', choices=['native', 'executor'], default='native')
+    parser.add_argument('--route', choices=['boxscore', 'simple-boxscore'], default='boxscore')
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.5, help='Stand-in upstream latency in seconds')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of upstream requests failing with 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of upstream requests failing with 429')
+    parser.add_argument('--executor-workers', type=int, default=8)
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Read-only views over the local SQLite scrape stores for offline mode
+
+The Rotowire scrapers in backend/database write nba_standings.db and
+team_stats.db at the repository root. These helpers reshape their latest
+snapshot into the same payloads the games.py endpoints return, so the
+frontend keeps rendering when stats.nba.com is unreachable. Fields the
+scrapes do not capture come back as None.
+
+Each helper returns (data, scraped_at) where scraped_at is a Unix timestamp,
+or None when the store is missing or empty.
+"""
+import os
+import sqlite3
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from nba_api.stats.static import players as static_players
+from nba_api.stats.static import teams as static_teams
+
+LOCAL_DB_DIR = os.environ.get(
+    'NBA_LOCAL_DB_DIR',
+    os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..'))
+)
+
+CONFERENCES = {'Eastern Conference': 'East', 'Western Conference': 'West'}
+
+
+def _connect(db_name: str) -> Optional[sqlite3.Connection]:
+    path = os.path.join(LOCAL_DB_DIR, db_name)
+    if not os.path.exists(path):
+        return None
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+def _parse_record(record_str) -> Tuple[int, int]:
+    if isinstance(record_str, str) and '-' in record_str:
+        try:
+            wins_str, losses_str = record_str.split('-')
+            return int(wins_str), int(losses_str)
+        except ValueError:
+            return 0, 0
+    return 0, 0
+
+
+def _standings_rows() -> Optional[Tuple[List[Dict], float]]:
+    """Latest standings snapshot joined with NBA team ids and conference seeds"""
+    conn = _connect('nba_standings.db')
+    if conn is None:
+        return None
+    try:
+        basic = conn.execute('SELECT * FROM basic_standings').fetchall()
+        seeds = {row['team_short']: row for row in conn.execute('SELECT * FROM conference_standings')}
+    finally:
+        conn.close()
+    if not basic:
+        return None
+
+    teams_by_name = {team['full_name']: team for team in static_teams.get_teams()}
+    rows = []
+    for row in basic:
+        team = teams_by_name.get(row['team_name'])
+        seed = seeds.get(row['team_short'])
+        rows.append({
+            'team_id': team['id'] if team else None,
+            'team_city': team['city'] if team else None,
+            'team_nickname': team['nickname'] if team else row['team_name'],
+            'team_full_name': row['team_name'],
+            'conference': CONFERENCES.get(row['conference'], row['conference']),
+            'division': row['division'],
+            'wins': row['wins'],
+            'losses': row['losses'],
+            'win_pct': row['win_percentage'],
+            'playoff_rank': seed['conference_seed'] if seed else None,
+            'conference_games_back': seed['conference_games_back'] if seed else None,
+            'clinched_playoffs': bool(seed['clinched_playoffs']) if seed else False,
+            'home_record': row['home_record'],
+            'away_record': row['away_record'],
+            'last_10_record': row['last_ten_record'],
+            'streak': row['streak'],
+            'points_per_game': row['points_for_per_game'],
+            'opp_points_per_game': row['points_against_per_game'],
+            'point_differential': row['point_differential'],
+        })
+
+    # Division rank and games back are not scraped; derive them from the records
+    for division in {r['division'] for r in rows}:
+        members = sorted([r for r in rows if r['division'] == division], key=lambda r: -r['win_pct'])
+        leader = members[0]
+        for rank, r in enumerate(members, 1):
+            r['division_rank'] = rank
+            r['division_games_back'] = ((leader['wins'] - r['wins']) + (r['losses'] - leader['losses'])) / 2
+
+    scraped_at = max(_timestamp(row['scraped_timestamp']) for row in basic)
+    return rows, scraped_at
+
+
+def standings(season: str) -> Optional[Tuple[Dict, float]]:
+    """Payload of /api/standings built from nba_standings.db"""
+    snapshot = _standings_rows()
+    if snapshot is None:
+        return None
+    rows, scraped_at = snapshot
+
+    standings_list = []
+    for r in rows:
+        home_wins, home_losses = _parse_record(r['home_record'])
+        away_wins, away_losses = _parse_record(r['away_record'])
+        last10_wins, last10_losses = _parse_record(r['last_10_record'])
+        standings_list.append({
+            'team_id': r['team_id'],
+            'team_city': r['team_city'],
+            'team_name': r['team_nickname'],
+            'team_conference': r['conference'],
+            'team_division': r['division'],
+            'wins': r['wins'],
+            'losses': r['losses'],
+            'win_pct': r['win_pct'],
+            'playoff_rank': r['playoff_rank'],
+            'division_rank': r['division_rank'],
+            'home_wins': home_wins,
+            'home_losses': home_losses,
+            'home_record': r['home_record'],
+            'away_wins': away_wins,
+            'away_losses': away_losses,
+            'away_record': r['away_record'],
+            'last_10_wins': last10_wins,
+            'last_10_losses': last10_losses,
+            'last_10_record': r['last_10_record'],
+            'streak': r['streak'],
+            'points_per_game': r['points_per_game'],
+            'opp_points_per_game': r['opp_points_per_game'],
+            'point_differential': r['point_differential'],
+            'conference_games_back': r['conference_games_back'],
+            'division_games_back': r['division_games_back'],
+            'record': f"{r['wins']}-{r['losses']}",
+            'vs_east': None,
+            'vs_west': None,
+            'clinched_playoffs': r['clinched_playoffs']
+        })
+
+    eastern_conf = sorted([t for t in standings_list if t['team_conference'] == 'East'],
+                          key=lambda x: x['playoff_rank'] or 99)
+    western_conf = sorted([t for t in standings_list if t['team_conference'] == 'West'],
+                          key=lambda x: x['playoff_rank'] or 99)
+
+    return {
+        'season': season,
+        'last_updated': datetime.fromtimestamp(scraped_at).isoformat(),
+        'eastern_conference': {
+            'name': 'Eastern Conference',
+            'teams': eastern_conf,
+            'count': len(eastern_conf)
+        },
+        'western_conference': {
+            'name': 'Western Conference',
+            'teams': western_conf,
+            'count': len(western_conf)
+        },
+        'overall': {
+            'teams': standings_list,
+            'count': len(standings_list)
+        }
+    }, scraped_at
+
+
+def simple_standings(season: str) -> Optional[Tuple[Dict, float]]:
+    """Payload of /api/standings/simple built from nba_standings.db"""
+    snapshot = _standings_rows()
+    if snapshot is None:
+        return None
+    rows, scraped_at = snapshot
+
+    simple_list = []
+    for r in rows:
+        home_wins, home_losses = _parse_record(r['home_record'])
+        away_wins, away_losses = _parse_record(r['away_record'])
+        last10_wins, last10_losses = _parse_record(r['last_10_record'])
+        simple_list.append({
+            'team_id': r['team_id'],
+            'team_name': r['team_full_name'],
+            'team_abbreviation': r['team_nickname'],
+            'team_city': r['team_city'],
+            'team_conference': r['conference'],
+            'team_division': r['division'],
+            'wins': r['wins'],
+            'losses': r['losses'],
+            'win_pct': r['win_pct'],
+            'conference_rank': r['playoff_rank'],
+            'division_rank': r['division_rank'],
+            'games_back': r['conference_games_back'],
+            'streak': r['streak'],
+            'record': f"{r['wins']}-{r['losses']}",
+            'home_record': r['home_record'],
+            'home_wins': home_wins,
+            'home_losses': home_losses,
+            'away_record': r['away_record'],
+            'away_wins': away_wins,
+            'away_losses': away_losses,
+            'last_10_record': r['last_10_record'],
+            'last_10_wins': last10_wins,
+            'last_10_losses': last10_losses,
+            'points_per_game': r['points_per_game'],
+            'opp_points_per_game': r['opp_points_per_game'],
+            'point_differential': r['point_differential']
+        })
+
+    return {'season': season, 'standings': simple_list}, scraped_at
+
+
+def minimal_standings(season: str) -> Optional[Tuple[Dict, float]]:
+    """Payload of /api/standings/minimal built from nba_standings.db"""
+    snapshot = _standings_rows()
+    if snapshot is None:
+        return None
+    rows, scraped_at = snapshot
+
+    minimal_list = [{
+        'team_id': r['team_id'],
+        'team_name': r['team_full_name'],
+        'wins': r['wins'],
+        'losses': r['losses'],
+        'win_pct': r['win_pct'],
+        'conference': r['conference'],
+        'conference_rank': r['playoff_rank'],
+        'streak': r['streak'],
+        'record': f"{r['wins']}-{r['losses']}",
+        'games_back': r['conference_games_back']
+    } for r in rows]
+
+    return {
+        'season': season,
+        'eastern_conference': sorted([t for t in minimal_list if t['conference'] == 'East'],
+                                     key=lambda x: x['conference_rank'] or 99),
+        'western_conference': sorted([t for t in minimal_list if t['conference'] == 'West'],
+                                     key=lambda x: x['conference_rank'] or 99)
+    }, scraped_at
+
+
+def team_roster(team_id, season: str) -> Optional[Tuple[Dict, float]]:
+    """Payload of /api/team/<team_id>/roster built from team_stats.db"""
+    team = static_teams.find_team_name_by_id(int(team_id))
+    if not team:
+        return None
+    conn = _connect('team_stats.db')
+    if conn is None:
+        return None
+    try:
+        rows = conn.execute('SELECT * FROM team_roster_bio WHERE team_code = ? ORDER BY id',
+                            (team['abbreviation'],)).fetchall()
+    finally:
+        conn.close()
+    if not rows:
+        return None
+
+    # The scrape stores Rotowire player ids; the frontend needs NBA ones
+    nba_ids = {p['full_name']: p['id'] for p in static_players.get_players()}
+
+    players = []
+    for row in rows:
+        height = row['height'] or ''
+        height_display = height
+        if '-' in height:
+            feet, inches = height.split('-')
+            height_display = f"{feet}'{inches}\""
+        try:
+            weight_raw = float(row['weight'])
+            weight_display = f"{int(weight_raw)} lbs"
+        except (TypeError, ValueError):
+            weight_raw = None
+            weight_display = 'N/A'
+
+        players.append({
+            'player_id': nba_ids.get(row['name_long']),
+            'player_name': row['name_long'],
+            'display_name': row['name_long'],
+            'player_slug': '',
+            'jersey_number': row['jersey'] or '',
+            'position': row['position'],
+            'height': height_display,
+            'height_raw': height,
+            'weight': weight_display,
+            'weight_raw': weight_raw,
+            'birth_date': 'N/A',
+            'age': row['age'],
+            'experience': 'N/A',
+            'experience_raw': '',
+            'college': row['school'] or 'Not Available',
+            'country': None,
+            'how_acquired': ''
+        })
+
+    scraped_at = max(_timestamp(row['scraped_timestamp']) for row in rows)
+    return {
+        'team_id': int(team_id),
+        'season': season,
+        'last_updated': datetime.fromtimestamp(scraped_at).isoformat(),
+        'roster': {
+            'players': players,
+            'player_count': len(players),
+            'coaches': [],
+            'coach_count': 0
+        }
+    }, scraped_at
@@ -9,32 +9,132 @@ import time
 import random
 import json
 import hashlib
+import heapq
+import itertools
+import glob
+import gzip
+import shutil
+import sqlite3
 from datetime import datetime, timedelta
 import os
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Tuple
 import logging
 
+from offline import offline_mode
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Fields of a cdn.nba.com box score kept in the compact cache: what
+# build_player_stats reads, plus the status fields freshness decisions use.
+# Same nesting as the raw document, so either can be processed.
+PLAYER_STATISTICS = [
+    'minutes', 'points', 'reboundsTotal', 'assists', 'steals', 'blocks', 'turnovers', 'foulsPersonal',
+    'fieldGoalsMade', 'fieldGoalsAttempted', 'fieldGoalsPercentage',
+    'threePointersMade', 'threePointersAttempted', 'threePointersPercentage',
+    'freeThrowsMade', 'freeThrowsAttempted', 'freeThrowsPercentage', 'plusMinusPoints',
+]
+TEAM_FIELDS = {
+    'teamId': True, 'teamName': True, 'teamCity': True, 'teamTricode': True, 'score': True,
+    'players': {
+        'personId': True, 'name': True, 'firstName': True, 'familyName': True, 'jerseyNum': True,
+        'position': True, 'starter': True, 'statistics': {name: True for name in PLAYER_STATISTICS},
+    },
+}
+COMPACT_FIELDS = {
+    'game': {
+        'gameId': True, 'gameCode': True, 'gameStatus': True, 'gameStatusText': True, 'period': True,
+        'gameClock': True, 'gameTimeUTC': True, 'attendance': True, 'arena': {'arenaName': True},
+        'homeTeam': TEAM_FIELDS, 'awayTeam': TEAM_FIELDS,
+    },
+}
+
+# Cache lifetime by cdn gameStatus. A final box score never changes, a live
+# one changes every possession, and a scheduled one has nothing to show until
+# tip-off, so one fixed age fits none of them.
+GAME_SCHEDULED, GAME_LIVE, GAME_FINAL = 1, 2, 3
+LIVE_TTL = timedelta(seconds=int(os.environ.get('NBA_BOXSCORE_LIVE_TTL', '20')))
+PREGAME_RECHECK = timedelta(seconds=int(os.environ.get('NBA_BOXSCORE_PREGAME_RECHECK', '60')))
+UNAVAILABLE_TTL = timedelta(seconds=int(os.environ.get('NBA_BOXSCORE_UNAVAILABLE_TTL', '300')))
+
+def boxscore_ttl(game_status, game_time_utc=None, cached_at=None, default=UNAVAILABLE_TTL) -> Optional[timedelta]:
+    """
+    How long a box score cached at `cached_at` stays fresh; None means it never expires.
+    Final: never. Live: LIVE_TTL. Scheduled: until tip-off, then every
+    PREGAME_RECHECK while cdn still reports it scheduled. Anything else: `default`.
+    """
+    if game_status == GAME_FINAL:
+        return None
+    if game_status == GAME_LIVE:
+        return LIVE_TTL
+    if game_status == GAME_SCHEDULED:
+        if game_time_utc and cached_at:
+            tip_off = datetime.fromisoformat(game_time_utc.replace('Z', '+00:00'))
+            until_tip_off = tip_off - cached_at.astimezone(tip_off.tzinfo)
+            return max(until_tip_off, PREGAME_RECHECK)
+        return PREGAME_RECHECK
+    return default
+
+# Dispatcher lanes: a lower number is sent first
+PRIORITY_USER, PRIORITY_BACKFILL = 0, 1
+# Upstream requests allowed in flight at once; spacing still comes from the request slots
+SENDER_THREADS = int(os.environ.get('NBA_BOXSCORE_SENDER_THREADS', '4'))
+
+class _QueuedRequest:
+    def __init__(self, game_id: str, priority: int, validators: Dict[str, str]):
+        self.game_id = game_id
+        self.priority = priority
+        self.validators = validators
+        self.future = Future()
+
+def _prune(value, spec):
+    """Keep only the keys named in `spec`; lists are pruned element by element"""
+    if spec is True:
+        return value
+    if isinstance(value, list):
+        return [_prune(item, spec) for item in value]
+    if isinstance(value, dict):
+        return {key: _prune(value[key], sub) for key, sub in spec.items() if key in value}
+    return value
+
+def compact_boxscore(boxscore: Dict) -> Dict:
+    """Reduce a raw cdn box score to COMPACT_FIELDS"""
+    return _prune(boxscore, COMPACT_FIELDS)
+
+def _atomic_write(path: str, content: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
 class NBABoxScoreClient:
     """
     Safe client for accessing NBA box score data
     with rate limiting, caching, and error handling
     """
     
-    def __init__(self, cache_dir='./boxscore_cache', max_cache_days=7):
+    def __init__(self, cache_dir=None, max_cache_days=7, base_url=None, keep_raw=True):
         """
         Initialize the safe client
         
         Args:
-            cache_dir: Directory to cache responses
-            max_cache_days: How long to keep cache files (days)
+            cache_dir: Directory to cache responses (NBA_BOXSCORE_CACHE_DIR or ./boxscore_cache)
+            max_cache_days: How long to keep a cached document whose game status is unknown (days);
+                known statuses follow boxscore_ttl()
+            base_url: cdn.nba.com origin override (NBA_CDN_BASE_URL), e.g. a local stand-in
+            keep_raw: Also keep the full response gzipped, beside the compact copy
         """
         self.session = requests.Session()
-        self.cache_dir = cache_dir
+        self.cache_dir = cache_dir or os.environ.get('NBA_BOXSCORE_CACHE_DIR', './boxscore_cache')
         self.max_cache_age = timedelta(days=max_cache_days)
+        self.keep_raw = keep_raw
+        self._index_local = threading.local()
+        self._index_generation = 0
+        self.base_url = (base_url or os.environ.get('NBA_CDN_BASE_URL', 'https://cdn.nba.com')).rstrip('/')
         
         # Setup session headers
         self.session.headers.update({
@@ -46,60 +146,309 @@ class NBABoxScoreClient:
         # Rate limiting settings
         self.min_delay = 2.0
         self.max_delay = 4.0
+        self.request_jitter = (0.1, 0.5)
         self.last_request_time = 0
+        self._rate_lock = threading.Lock()
+        
+        # Request dispatcher: callers queue, one thread paces, a small pool sends
+        self._queue = []
+        self._queued: Dict[str, _QueuedRequest] = {}
+        self._in_flight: Dict[str, _QueuedRequest] = {}
+        self._queue_cond = threading.Condition()
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._sender = ThreadPoolExecutor(max_workers=SENDER_THREADS, thread_name_prefix='boxscore-send')
         
         # Create cache directory
-        os.makedirs(cache_dir, exist_ok=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
         
-        logger.info(f"NBA Box Score Client initialized. Cache dir: {cache_dir}")
+        logger.info(f"NBA Box Score Client initialized. Cache dir: {self.cache_dir}")
     
-    def _make_safe_request(self, url: str, game_id: str) -> Optional[Dict]:
-        """Make a safe HTTP request with rate limiting"""
-        try:
-            # Rate limiting
-            current_time = time.time()
-            time_since_last = current_time - self.last_request_time
-            
-            if time_since_last < self.min_delay:
-                sleep_time = self.min_delay - time_since_last + random.uniform(0, 1.0)
-                time.sleep(sleep_time)
+    def reserve_request_slot(self) -> float:
+        """
+        Claim the next upstream request slot and return how long to wait for it.
+        
+        Slots are spaced min_delay apart across every caller (threads and the
+        async serving mode alike), so the wait can be slept or awaited.
+        """
+        with self._rate_lock:
+            now = time.time()
+            start = now
+            if now - self.last_request_time < self.min_delay:
+                start = self.last_request_time + self.min_delay + random.uniform(0, 1.0)
+            self.last_request_time = start
+        return start - now + random.uniform(*self.request_jitter)
+    
+    def defer_requests(self, seconds: float):
+        """Push every caller's next request slot back, e.g. after a 429"""
+        with self._rate_lock:
+            self.last_request_time = max(self.last_request_time, time.time() + seconds)
+    
+    def boxscore_url(self, game_id: str) -> str:
+        """Upstream URL for a game's live box score JSON"""
+        return f"{self.base_url}/static/json/liveData/boxscore/boxscore_{game_id}.json"
+    
+    def request_headers(self, game_id: str) -> Dict[str, str]:
+        """Per-request headers sent along with the session headers"""
+        return {
+            'Referer': f'https://www.nba.com/game/{game_id}',
+            'Origin': 'https://www.nba.com',
+        }
+    
+    # ========== REQUEST DISPATCHER ==========
+    
+    def request_boxscore(self, game_id: str, priority: int = PRIORITY_USER,
+                         validators: Optional[Dict[str, str]] = None) -> Future:
+        """
+        Queue an upstream fetch of a game's box score without blocking.
+        
+        The dispatcher thread sends queued requests one request slot apart,
+        user-facing ones (PRIORITY_USER) ahead of PRIORITY_BACKFILL. A game that
+        is already queued or in flight shares that request's future.
+        
+        Returns:
+            Future resolving to (status, document, validators) as fetch_if_changed describes
+        """
+        validators = validators or {}
+        if offline_mode.is_offline('cdn'):
+            future = Future()
+            future.set_result((None, None, validators))
+            return future
+        
+        with self._queue_cond:
+            entry = self._queued.get(game_id)
+            if entry is not None:
+                if entry.validators != validators:
+                    entry.validators = {}  # a caller needs the full document, not a 304
+                if priority < entry.priority:
+                    entry.priority = priority
+                    heapq.heappush(self._queue, (priority, next(self._sequence), entry))
+                return entry.future
             
-            time.sleep(random.uniform(0.1, 0.5))
+            entry = self._in_flight.get(game_id)
+            if entry is not None and entry.validators in ({}, validators):
+                return entry.future
             
-            headers = {
-                'Referer': f'https://www.nba.com/game/{game_id}',
-                'Origin': 'https://www.nba.com',
-            }
+            entry = _QueuedRequest(game_id, priority, validators)
+            self._queued[game_id] = entry
+            heapq.heappush(self._queue, (priority, next(self._sequence), entry))
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name='boxscore-dispatch', daemon=True)
+                self._dispatcher.start()
+            self._queue_cond.notify()
+            return entry.future
+    
+    def queue_depth(self) -> Dict[str, int]:
+        """Queued requests per lane"""
+        with self._queue_cond:
+            lanes = {'user': 0, 'backfill': 0}
+            for entry in self._queued.values():
+                lanes['user' if entry.priority == PRIORITY_USER else 'backfill'] += 1
+            return lanes
+    
+    def _dispatch(self):
+        """Dispatcher thread: wait for a request slot, then send the most urgent queued request"""
+        while True:
+            with self._queue_cond:
+                while not self._queued:
+                    self._queue_cond.wait()
             
-            logger.info(f"Requesting box score for game {game_id}")
-            response = self.session.get(url, headers=headers, timeout=30)
+            # Take the slot first so a user request queued during the wait still goes ahead
+            time.sleep(self.reserve_request_slot())
             
-            self.last_request_time = time.time()
+            with self._queue_cond:
+                entry = None
+                while self._queue:
+                    priority, _, candidate = heapq.heappop(self._queue)
+                    # Skip heap items left behind by a priority upgrade
+                    if self._queued.get(candidate.game_id) is candidate and candidate.priority == priority:
+                        entry = candidate
+                        break
+                if entry is None:
+                    continue
+                del self._queued[entry.game_id]
+                self._in_flight[entry.game_id] = entry
             
-            if response.status_code == 200:
-                return response.json()
-            elif response.status_code == 429:
-                logger.warning(f"Rate limited (429) for game {game_id}")
-                time.sleep(5 + random.uniform(0, 5))
-                return None
-            elif response.status_code == 404:
-                logger.info(f"Box score not found (404) for game {game_id}")
-                return None
-            else:
-                logger.warning(f"HTTP {response.status_code} for game {game_id}")
-                return None
-                
+            self._sender.submit(self._send, entry)
+    
+    def _send(self, entry: _QueuedRequest):
+        try:
+            result = self._make_safe_request(entry.game_id, entry.validators)
         except Exception as e:
+            logger.error(f"Error for game {entry.game_id}: {e}")
+            result = (None, None, entry.validators)
+        with self._queue_cond:
+            if self._in_flight.get(entry.game_id) is entry:
+                del self._in_flight[entry.game_id]
+        entry.future.set_result(result)
+    
+    def _make_safe_request(self, game_id: str, validators: Dict[str, str]
+                           ) -> Tuple[Optional[int], Optional[Dict], Dict[str, str]]:
+        """Send one (optionally conditional) request; pacing is the dispatcher's job"""
+        if offline_mode.is_offline('cdn'):
+            logger.info(f"cdn.nba.com offline, not requesting game {game_id}")
+            return None, None, validators
+        
+        headers = self.request_headers(game_id)
+        if validators.get('ETag'):
+            headers['If-None-Match'] = validators['ETag']
+        if validators.get('Last-Modified'):
+            headers['If-Modified-Since'] = validators['Last-Modified']
+        
+        try:
+            logger.info(f"Requesting box score for game {game_id}")
+            response = self.session.get(self.boxscore_url(game_id), headers=headers, timeout=30)
+            self.record_upstream_status(response.status_code)
+        except Exception as e:
+            offline_mode.record('cdn', ok=False)
             logger.error(f"Error for game {game_id}: {e}")
-            return None
+            return None, None, validators
+        
+        if response.status_code == 304:
+            self.touch_cache(game_id)
+            return 304, None, validators
+        
+        new_validators = {name: response.headers[name] for name in ('ETag', 'Last-Modified') if name in response.headers}
+        if response.status_code == 200:
+            return 200, self.accept_boxscore(game_id, response.json()), new_validators
+        elif response.status_code == 429:
+            logger.warning(f"Rate limited (429) for game {game_id}")
+            self.defer_requests(5 + random.uniform(0, 5))
+        elif response.status_code == 404:
+            logger.info(f"Box score not found (404) for game {game_id}")
+            self.mark_unavailable(game_id)
+        else:
+            logger.warning(f"HTTP {response.status_code} for game {game_id}")
+        return response.status_code, None, {}
+    
+    @staticmethod
+    def record_upstream_status(status_code: int):
+        """Feed an HTTP status into the cdn.nba.com health breaker (404 still means it is up)"""
+        offline_mode.record('cdn', ok=status_code in (200, 304, 404))
+    
+    # ========== CACHE ==========
+    # Layout under cache_dir:
+    #   compact/<game_id>.json   the fields build_player_stats reads, minified
+    #   raw/<game_id>.json.gz    the full cdn document, optional cold storage
+    #   index.db                 cached_at and game status per game, so a
+    #                            freshness check never opens a document; a
+    #                            row without a document records a 404
+    # <md5>.json files from the old pretty-printed format are still read and
+    # converted on first use.
     
     def _get_cache_path(self, game_id: str) -> str:
-        """Get cache file path for a game ID"""
+        """Get the legacy (pretty-printed, MD5-named) cache file path for a game ID"""
         cache_key = hashlib.md5(game_id.encode()).hexdigest()
         return os.path.join(self.cache_dir, f"{cache_key}.json")
     
-    def _load_from_cache(self, game_id: str) -> Optional[Dict]:
-        """Load data from cache if valid"""
+    def _compact_path(self, game_id: str) -> str:
+        return os.path.join(self.cache_dir, 'compact', f"{game_id}.json")
+    
+    def _raw_path(self, game_id: str) -> str:
+        return os.path.join(self.cache_dir, 'raw', f"{game_id}.json.gz")
+    
+    def _index(self) -> sqlite3.Connection:
+        """This thread's connection to the cache index, reopened after clear_cache()"""
+        conn = getattr(self._index_local, 'conn', None)
+        if conn is not None and self._index_local.generation == self._index_generation:
+            return conn
+        if conn is not None:
+            conn.close()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        conn = sqlite3.connect(os.path.join(self.cache_dir, 'index.db'), timeout=30)
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS boxscores (
+                game_id TEXT PRIMARY KEY,
+                cached_at TEXT NOT NULL,
+                game_status INTEGER,
+                game_status_text TEXT,
+                compact_bytes INTEGER,
+                raw_bytes INTEGER,
+                game_time_utc TEXT
+            )
+        ''')
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(boxscores)')}
+        if 'game_time_utc' not in columns:
+            conn.execute('ALTER TABLE boxscores ADD COLUMN game_time_utc TEXT')
+        self._index_local.conn = conn
+        self._index_local.generation = self._index_generation
+        return conn
+    
+    def cache_entry(self, game_id: str) -> Optional[Dict]:
+        """Index row for a cached game (cached_at, game_status, ...) without loading the document"""
+        row = self._index().execute(
+            'SELECT cached_at, game_status, game_status_text, compact_bytes, raw_bytes, game_time_utc '
+            'FROM boxscores WHERE game_id = ?',
+            (game_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return dict(zip(('cached_at', 'game_status', 'game_status_text', 'compact_bytes', 'raw_bytes',
+                         'game_time_utc'), row))
+
+    def cached_games(self, since: str = '') -> List[Tuple[str, str]]:
+        """(game_id, cached_at) of every cached document written or touched after `since`, oldest first"""
+        return self._index().execute(
+            'SELECT game_id, cached_at FROM boxscores WHERE compact_bytes IS NOT NULL AND cached_at > ? '
+            'ORDER BY cached_at',
+            (since,)
+        ).fetchall()
+
+    def is_fresh(self, entry: Dict) -> bool:
+        """Whether an index entry is still within its boxscore_ttl()"""
+        cached_at = datetime.fromisoformat(entry['cached_at'])
+        if entry['compact_bytes'] is None:
+            ttl = UNAVAILABLE_TTL
+        else:
+            ttl = boxscore_ttl(entry['game_status'], entry['game_time_utc'], cached_at, default=self.max_cache_age)
+        return ttl is None or datetime.now() - cached_at < ttl
+    
+    def cached_unavailable(self, game_id: str) -> bool:
+        """Whether cdn recently answered 404 for this game (negative cache, e.g. before tip-off)"""
+        entry = self.cache_entry(game_id)
+        return entry is not None and entry['compact_bytes'] is None and self.is_fresh(entry)
+    
+    def touch_cache(self, game_id: str):
+        """Restart a cached document's lifetime (upstream confirmed it unchanged)"""
+        conn = self._index()
+        with conn:
+            conn.execute('UPDATE boxscores SET cached_at = ? WHERE game_id = ? AND compact_bytes IS NOT NULL',
+                         (datetime.now().isoformat(), game_id))
+    
+    def mark_unavailable(self, game_id: str):
+        """Remember a 404 for UNAVAILABLE_TTL, unless a real document is already cached"""
+        conn = self._index()
+        with conn:
+            conn.execute(
+                'INSERT INTO boxscores (game_id, cached_at) VALUES (?, ?) '
+                'ON CONFLICT(game_id) DO UPDATE SET cached_at = excluded.cached_at WHERE compact_bytes IS NULL',
+                (game_id, datetime.now().isoformat())
+            )
+    
+    def _load_from_cache(self, game_id: str, any_age: bool = False) -> Optional[Dict]:
+        """Load data from cache if valid (any age when `any_age`)"""
+        entry = self.cache_entry(game_id)
+        if entry is None:
+            return self._load_legacy(game_id, any_age)
+        
+        if entry['compact_bytes'] is None or not (any_age or self.is_fresh(entry)):
+            return None
+        
+        try:
+            with open(self._compact_path(game_id), 'r') as f:
+                cached_data = json.load(f)
+        except Exception:
+            return None
+        
+        cached_data['_cache_metadata'] = {
+            'cached_at': entry['cached_at'],
+            'game_id': game_id,
+            'source': 'cdn.nba.com'
+        }
+        return cached_data
+    
+    def _load_legacy(self, game_id: str, any_age: bool = False) -> Optional[Dict]:
+        """Read an old-format cache file, converting it to the compact format"""
         cache_path = self._get_cache_path(game_id)
         
         if os.path.exists(cache_path):
@@ -109,9 +458,9 @@ class NBABoxScoreClient:
                 
                 cache_time_str = cached_data.get('_cache_metadata', {}).get('cached_at')
                 if cache_time_str:
-                    cache_time = datetime.fromisoformat(cache_time_str)
-                    if datetime.now() - cache_time < self.max_cache_age:
-                        return cached_data
+                    self._write_cache(game_id, cached_data, cache_time_str)
+                    os.remove(cache_path)
+                    return self._load_from_cache(game_id, any_age)
                     
             except Exception:
                 pass
@@ -120,47 +469,111 @@ class NBABoxScoreClient:
     
     def _save_to_cache(self, game_id: str, data: Dict):
         """Save data to cache with metadata"""
-        cache_path = self._get_cache_path(game_id)
+        try:
+            self._write_cache(game_id, data, datetime.now().isoformat())
+        except Exception as e:
+            logger.warning(f"Could not cache game {game_id}: {e}")
+    
+    def _write_cache(self, game_id: str, data: Dict, cached_at: str):
+        raw = {k: v for k, v in data.items() if k != '_cache_metadata'}
+        compact = json.dumps(compact_boxscore(raw), separators=(',', ':')).encode('utf-8')
+        _atomic_write(self._compact_path(game_id), compact)
         
+        raw_bytes = None
+        if self.keep_raw:
+            raw_gz = gzip.compress(json.dumps(raw, separators=(',', ':')).encode('utf-8'), compresslevel=6)
+            _atomic_write(self._raw_path(game_id), raw_gz)
+            raw_bytes = len(raw_gz)
+        
+        game = raw.get('game', {})
+        conn = self._index()
+        with conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO boxscores (game_id, cached_at, game_status, game_status_text, '
+                'compact_bytes, raw_bytes, game_time_utc) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (game_id, cached_at, game.get('gameStatus'), game.get('gameStatusText'), len(compact), raw_bytes,
+                 game.get('gameTimeUTC'))
+            )
+    
+    def load_raw(self, game_id: str) -> Optional[Dict]:
+        """The full cdn document from cold storage, if it was kept"""
         try:
-            if '_cache_metadata' not in data:
-                data['_cache_metadata'] = {}
-            
-            data['_cache_metadata'].update({
-                'cached_at': datetime.now().isoformat(),
-                'game_id': game_id,
-                'source': 'cdn.nba.com'
-            })
-            
-            with open(cache_path, 'w') as f:
-                json.dump(data, f, indent=2)
-            
-        except Exception:
-            pass
+            with gzip.open(self._raw_path(game_id), 'rt') as f:
+                return json.load(f)
+        except OSError:
+            return None
+    
+    def migrate_legacy_cache(self) -> int:
+        """Convert every old-format file in cache_dir; returns how many were converted"""
+        converted = 0
+        for path in glob.glob(os.path.join(self.cache_dir, '*.json')):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                metadata = data.get('_cache_metadata', {})
+                self._write_cache(metadata['game_id'], data, metadata['cached_at'])
+                os.remove(path)
+                converted += 1
+            except Exception as e:
+                logger.warning(f"Could not convert {path}: {e}")
+        return converted
+    
+    def clear_cache(self):
+        """Remove every cached box score"""
+        self._index_generation += 1
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+        os.makedirs(self.cache_dir, exist_ok=True)
+    
+    @staticmethod
+    def is_valid_game_id(game_id: str) -> bool:
+        """NBA game ids are 10 digits starting with '00'"""
+        return game_id.startswith('00') and len(game_id) == 10
+    
+    def accept_boxscore(self, game_id: str, data: Optional[Dict]) -> Optional[Dict]:
+        """Cache a freshly fetched box score if it looks valid"""
+        if data and 'game' in data:
+            self._save_to_cache(game_id, data)
+            return data
+        return None
+    
+    def fetch_if_changed(self, game_id: str, validators: Optional[Dict[str, str]] = None,
+                         priority: int = PRIORITY_USER) -> Tuple[Optional[int], Optional[Dict], Dict[str, str]]:
+        """
+        Conditional GET of a game's box score, waiting for the dispatcher.
+        
+        Args:
+            validators: ETag / Last-Modified from the previous response
+            priority: PRIORITY_USER or PRIORITY_BACKFILL
+        
+        Returns:
+            (status, document, validators): the document only on a 200 (it is cached
+            too), the validators to send next time, and status None when offline or on error
+        """
+        return self.request_boxscore(game_id, priority, validators).result()
     
     def get_boxscore(self, game_id: str, force_refresh: bool = False) -> Optional[Dict]:
         """Get box score data for a game with caching"""
-        if not game_id.startswith('00') or len(game_id) != 10:
+        if not self.is_valid_game_id(game_id):
             return None
         
-        if not force_refresh:
-            cached_data = self._load_from_cache(game_id)
+        # While cdn.nba.com is offline an expired copy beats none
+        offline = offline_mode.is_offline('cdn')
+        if not force_refresh or offline:
+            if not offline and self.cached_unavailable(game_id):
+                return None
+            cached_data = self._load_from_cache(game_id, any_age=offline)
             if cached_data:
                 return cached_data
         
-        url = f"https://cdn.nba.com/static/json/liveData/boxscore/boxscore_{game_id}.json"
-        data = self._make_safe_request(url, game_id)
-        
-        if data and 'game' in data:
-            self._save_to_cache(game_id, data)
-            return data
-        
-        return None
+        _, data, _ = self.fetch_if_changed(game_id)
+        return data
     
     def get_player_stats(self, game_id: str) -> Dict[str, Any]:
         """Extract player statistics from box score data"""
-        boxscore = self.get_boxscore(game_id)
-        
+        return self.build_player_stats(game_id, self.get_boxscore(game_id))
+    
+    def build_player_stats(self, game_id: str, boxscore: Optional[Dict]) -> Dict[str, Any]:
+        """Turn a raw box score document into the player stats payload"""
         if not boxscore:
             return {
                 'success': False,
@@ -174,6 +587,9 @@ class NBABoxScoreClient:
             game_info = {
                 'game_id': game_data['gameId'],
                 'status': game_data['gameStatusText'],
+                'game_status': game_data.get('gameStatus'),
+                'period': game_data.get('period'),
+                'game_clock': game_data.get('gameClock'),
                 'date': game_data['gameTimeUTC'],
                 'arena': game_data['arena']['arenaName'],
                 'attendance': game_data.get('attendance', 0),
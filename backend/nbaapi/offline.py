@@ -0,0 +1,139 @@
+"""
+Offline / degraded mode for the NBA API servers
+
+Offline mode means: never call an upstream, answer from whatever is stored
+locally, and say how old it is. It is on when switched manually
+(NBA_OFFLINE_MODE=1 or the admin endpoint) or, per upstream, when that
+upstream's circuit breaker has tripped after repeated failures.
+
+The manual switch is per process unless it is shared (share(), which games.py
+calls with its cross-process tier when NBA_SHARED_CACHE_DB is set); then a
+switch made through any worker reaches every worker within a second. The
+breakers stay per process.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+# Upstreams tracked separately: an outage on one should not take the other offline
+UPSTREAMS = {
+    'stats': 'stats.nba.com',
+    'cdn': 'cdn.nba.com',
+}
+# Name of the manual switch in a shared settings store
+MANUAL_SETTING = 'offline_mode.manual'
+
+
+class UpstreamOffline(Exception):
+    """Raised instead of calling an upstream that is offline"""
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and stays open for
+    `cooldown` seconds. After the cooldown calls go through again; the next
+    failure reopens it straight away, the next success closes it.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, cooldown: float = 60):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._lock = threading.Lock()
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.consecutive_failures >= self.failure_threshold:
+                self.opened_at = time.time()
+
+    def is_open(self) -> bool:
+        opened_at = self.opened_at
+        return opened_at is not None and time.time() - opened_at < self.cooldown
+
+    def status(self) -> Dict:
+        # Read once: another thread may reset opened_at to None in between
+        opened_at = self.opened_at
+        now = time.time()
+        is_open = opened_at is not None and now - opened_at < self.cooldown
+        return {
+            'upstream': self.name,
+            'open': is_open,
+            'consecutive_failures': self.consecutive_failures,
+            'retry_in_seconds': max(0, round(opened_at + self.cooldown - now)) if is_open else 0,
+        }
+
+
+class OfflineMode:
+    """Manual switch plus one circuit breaker per upstream"""
+
+    def __init__(self, refresh_interval: float = 1.0):
+        """
+        Args:
+            refresh_interval: Seconds between reads of a shared manual switch
+        """
+        # NBA_OFFLINE_MODE is the switch's value until one is set (here or, when shared, in any worker)
+        self._default_manual = os.environ.get('NBA_OFFLINE_MODE', '').lower() in ('1', 'true', 'yes')
+        self._manual = self._default_manual
+        self.settings = None
+        self.refresh_interval = refresh_interval
+        self._read_at = 0.0
+        self.breakers = {key: CircuitBreaker(host) for key, host in UPSTREAMS.items()}
+
+    def share(self, settings):
+        """Keep the manual switch in `settings` (get_setting / set_setting, e.g. a SharedCache) for every worker"""
+        self.settings = settings
+        self._read_at = 0.0
+
+    @property
+    def manual(self) -> bool:
+        settings = self.settings
+        if settings is not None and time.time() - self._read_at >= self.refresh_interval:
+            try:
+                value: Optional[str] = settings.get_setting(MANUAL_SETTING)
+            except Exception as e:
+                print(f"[OFFLINE] Could not read the shared offline switch: {e}")
+            else:
+                self._manual = self._default_manual if value is None else value == '1'
+            self._read_at = time.time()
+        return self._manual
+
+    def set_manual(self, enabled: bool):
+        self._manual = bool(enabled)
+        if self.settings is not None:
+            self.settings.set_setting(MANUAL_SETTING, '1' if enabled else '0')
+            self._read_at = time.time()
+
+    def is_offline(self, upstream: str = None) -> bool:
+        """True if `upstream` must not be called (any upstream when None)"""
+        if self.manual:
+            return True
+        if upstream is None:
+            return any(breaker.is_open() for breaker in self.breakers.values())
+        return self.breakers[upstream].is_open()
+
+    def record(self, upstream: str, ok: bool):
+        """Feed the outcome of one upstream call into its breaker"""
+        if ok:
+            self.breakers[upstream].record_success()
+        else:
+            self.breakers[upstream].record_failure()
+
+    def status(self) -> Dict:
+        return {
+            'offline': self.is_offline(),
+            'manual': self.manual,
+            'upstreams': {key: breaker.status() for key, breaker in self.breakers.items()},
+        }
+
+
+offline_mode = OfflineMode()
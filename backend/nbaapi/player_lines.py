@@ -0,0 +1,352 @@
+"""
+Column-oriented store of every player line from cached box scores
+
+Season-level questions ("who leads in plus-minus over the last 10 games")
+would otherwise load one box score file per game. PlayerLineStore keeps one
+NumPy array per stat plus integer-coded player, team and game columns, so a
+filtered sum, average or top-K over a full season is a few vectorized passes.
+
+Box scores are appended as they arrive (canonical form, see boxscore_views).
+A game that is appended again replaces its earlier lines, which is how live
+games stay current. Lines with no minutes played (DNP, inactive) are left
+out, so they never count as games. sync_from_client() picks up games other
+processes wrote to the box score cache, such as the backfill CLI.
+
+Usage:
+    python player_lines.py --cache-dir ./boxscore_cache --replicate 9
+"""
+import argparse
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from boxscore_views import PLAYER_COLUMNS, canonical_boxscore
+from nba_boxscore_safe import GAME_FINAL
+
+# Per-line numeric columns, all float32
+STAT_COLUMNS = (
+    'minutes', 'points', 'rebounds', 'assists', 'steals', 'blocks', 'turnovers', 'fouls',
+    'fg_made', 'fg_attempted', 'three_made', 'three_attempted', 'ft_made', 'ft_attempted', 'plus_minus',
+)
+# Stats computed from summed columns rather than stored
+RATIO_STATS = {
+    'fg_pct': ('fg_made', 'fg_attempted'),
+    'three_pct': ('three_made', 'three_attempted'),
+    'ft_pct': ('ft_made', 'ft_attempted'),
+}
+AGGREGATES = ('sum', 'avg')
+
+_COLUMN = {name: index for index, name in enumerate(PLAYER_COLUMNS)}
+
+
+def _minutes(display: str) -> float:
+    """'34:12' -> 34.2"""
+    try:
+        minutes, seconds = display.split(':')
+        return int(minutes) + int(seconds) / 60
+    except (AttributeError, ValueError):
+        return 0.0
+
+
+def _timestamp(game_time_utc: str) -> int:
+    try:
+        return int(datetime.fromisoformat(game_time_utc.replace('Z', '+00:00')).timestamp())
+    except (AttributeError, ValueError):
+        return 0
+
+
+class _Codes:
+    """Dense integer codes for external ids, in first-seen order"""
+
+    def __init__(self):
+        self.ids: List = []
+        self.labels: List[str] = []
+        self._codes: Dict = {}
+
+    def code(self, external_id, label: str = '') -> int:
+        code = self._codes.get(external_id)
+        if code is None:
+            code = self._codes[external_id] = len(self.ids)
+            self.ids.append(external_id)
+            self.labels.append(label)
+        elif label:
+            self.labels[code] = label
+        return code
+
+    def get(self, external_id) -> Optional[int]:
+        return self._codes.get(external_id)
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class PlayerLineStore:
+    """Every player line of the appended box scores as NumPy columns"""
+
+    def __init__(self, capacity: int = 4096):
+        self._lock = threading.RLock()
+        self.size = 0
+        self.columns = {name: np.zeros(capacity, dtype=np.float32) for name in STAT_COLUMNS}
+        self.player = np.zeros(capacity, dtype=np.int32)
+        self.team = np.zeros(capacity, dtype=np.int32)
+        self.game = np.zeros(capacity, dtype=np.int32)
+        self.players = _Codes()
+        self.teams = _Codes()
+        self.games = _Codes()
+        self.game_time = np.zeros(256, dtype=np.int64)  # by game code
+        self.game_final: Dict[str, bool] = {}
+        self._synced_until = ''
+        self._last_sync = 0.0
+
+    # ========== APPEND ==========
+
+    def _grow(self, needed: int):
+        capacity = len(self.player)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, array in self.columns.items():
+            self.columns[name] = np.resize(array, capacity)
+        self.player = np.resize(self.player, capacity)
+        self.team = np.resize(self.team, capacity)
+        self.game = np.resize(self.game, capacity)
+
+    def _drop_game(self, game_code: int):
+        keep = np.flatnonzero(self.game[:self.size] != game_code)
+        for array in (*self.columns.values(), self.player, self.team, self.game):
+            array[:len(keep)] = array[keep]
+        self.size = len(keep)
+
+    def add(self, canonical: Dict) -> int:
+        """
+        Append a canonical box score's player lines (those with minutes played), replacing
+        the game's earlier lines; returns lines added
+        """
+        if not canonical.get('success'):
+            return 0
+        game = canonical['game']
+        game_id = game['game_id']
+        final = game.get('game_status') == GAME_FINAL
+        minutes_index = _COLUMN['minutes']
+        played = [(row, minutes) for row in canonical['rows']
+                  for minutes in [_minutes(row[minutes_index])] if minutes > 0]
+        rows = [row for row, _ in played]
+
+        with self._lock:
+            if self.game_final.get(game_id):
+                return 0  # a final box score never changes
+            existing = self.games.get(game_id)
+            if existing is not None:
+                self._drop_game(existing)
+            game_code = self.games.code(game_id)
+            if game_code >= len(self.game_time):
+                self.game_time = np.resize(self.game_time, len(self.game_time) * 2)
+            self.game_time[game_code] = _timestamp(game.get('date'))
+            self.game_final[game_id] = final
+
+            start, end = self.size, self.size + len(rows)
+            self._grow(end)
+            team_codes = {
+                team['id']: self.teams.code(team['id'], f"{team['city']} {team['name']}")
+                for team in (game['home_team'], game['away_team'])
+            }
+            for name in STAT_COLUMNS:
+                index = _COLUMN[name]
+                if name == 'minutes':
+                    values = [minutes for _, minutes in played]
+                else:
+                    values = [row[index] or 0 for row in rows]
+                self.columns[name][start:end] = values
+            self.player[start:end] = [self.players.code(row[_COLUMN['player_id']], row[_COLUMN['name']])
+                                      for row in rows]
+            self.team[start:end] = [team_codes[row[_COLUMN['team_id']]] for row in rows]
+            self.game[start:end] = game_code
+            self.size = end
+            return len(rows)
+
+    def sync_from_client(self, client, min_interval: float = 0) -> int:
+        """
+        Append every game the box score client cached since the last sync.
+        Skipped if the last sync was under `min_interval` seconds ago. Returns games added.
+        """
+        if time.time() - self._last_sync < min_interval:
+            return 0
+        with self._lock:
+            self._last_sync = time.time()
+            added = 0
+            for game_id, cached_at in client.cached_games(since=self._synced_until):
+                boxscore = client._load_from_cache(game_id, any_age=True)
+                if boxscore and self.add(canonical_boxscore(client.build_player_stats(game_id, boxscore))):
+                    added += 1
+                self._synced_until = max(self._synced_until, cached_at)
+            return added
+
+    # ========== QUERIES ==========
+
+    def _rows(self, team_id=None, player_id=None, since: Optional[int] = None,
+              last_games: Optional[int] = None) -> np.ndarray:
+        """Indexes of the lines passing the filters; last_games keeps each player's most recent N"""
+        size = self.size
+        mask = np.ones(size, dtype=bool)
+        if team_id is not None:
+            code = self.teams.get(team_id)
+            mask &= self.team[:size] == (-1 if code is None else code)
+        if player_id is not None:
+            code = self.players.get(player_id)
+            mask &= self.player[:size] == (-1 if code is None else code)
+        if since is not None:
+            mask &= self.game_time[self.game[:size]] >= since
+        rows = np.flatnonzero(mask)
+
+        if last_games is not None and len(rows):
+            # Sort by player, newest game first, and keep each player's first N
+            players = self.player[rows]
+            order = np.lexsort((-self.game_time[self.game[rows]], players))
+            rows, players = rows[order], players[order]
+            positions = np.arange(len(rows))
+            group_start = np.maximum.accumulate(np.where(np.r_[True, players[1:] != players[:-1]], positions, 0))
+            rows = rows[positions - group_start < last_games]
+        return rows
+
+    def _per_player(self, rows: np.ndarray, stat: str, agg: str):
+        """(value, games) arrays indexed by player code"""
+        players = self.player[rows]
+        length = len(self.players)
+        games = np.bincount(players, minlength=length)
+        if stat in RATIO_STATS:
+            made, attempted = RATIO_STATS[stat]
+            made_sum = np.bincount(players, weights=self.columns[made][rows], minlength=length)
+            attempted_sum = np.bincount(players, weights=self.columns[attempted][rows], minlength=length)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                values = np.where(attempted_sum > 0, made_sum / attempted_sum, 0.0)
+            return values, games
+        sums = np.bincount(players, weights=self.columns[stat][rows], minlength=length)
+        if agg == 'sum':
+            return sums, games
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(games > 0, sums / games, 0.0), games
+
+    def leaders(self, stat: str = 'points', agg: str = 'avg', limit: int = 10, team_id=None,
+                last_games: Optional[int] = None, since: Optional[int] = None, min_games: int = 1,
+                ascending: bool = False) -> List[Dict]:
+        """
+        Top `limit` players by `stat` (a STAT_COLUMNS or RATIO_STATS name) summed or averaged
+        over the lines passing the filters; players with fewer than `min_games` lines are left out.
+        """
+        if stat not in STAT_COLUMNS and stat not in RATIO_STATS:
+            raise ValueError(f"Unknown stat '{stat}'")
+        if agg not in AGGREGATES:
+            raise ValueError(f"Unknown aggregate '{agg}'")
+
+        with self._lock:
+            rows = self._rows(team_id=team_id, since=since, last_games=last_games)
+            if not len(rows):
+                return []
+            values, games = self._per_player(rows, stat, agg)
+            eligible = np.flatnonzero(games >= max(min_games, 1))
+            if not len(eligible):
+                return []
+            scores = values[eligible] if ascending else -values[eligible]
+            limit = min(limit, len(eligible))
+            top = np.argpartition(scores, limit - 1)[:limit]
+            top = top[np.argsort(scores[top], kind='stable')]
+            return [{
+                'player_id': self.players.ids[code],
+                'player_name': self.players.labels[code],
+                'value': round(float(values[code]), 3),
+                'games': int(games[code]),
+            } for code in eligible[top]]
+
+    def player_summary(self, player_id, last_games: Optional[int] = None, since: Optional[int] = None) -> Optional[Dict]:
+        """Totals and per-game averages of every stat for one player, or None if no lines match"""
+        with self._lock:
+            rows = self._rows(player_id=player_id, since=since, last_games=last_games)
+            if not len(rows):
+                return None
+            games = len(rows)
+            totals = {name: float(self.columns[name][rows].sum()) for name in STAT_COLUMNS}
+            code = self.players.get(player_id)
+            return {
+                'player_id': player_id,
+                'player_name': self.players.labels[code],
+                'games': games,
+                'totals': {name: round(value, 2) for name, value in totals.items()},
+                'averages': {name: round(value / games, 2) for name, value in totals.items()},
+                'percentages': {
+                    name: round(totals[made] / totals[attempted], 3) if totals[attempted] else 0.0
+                    for name, (made, attempted) in RATIO_STATS.items()
+                },
+                'last_game_time': datetime.fromtimestamp(int(self.game_time[self.game[rows]].max())).isoformat(),
+            }
+
+    def status(self) -> Dict:
+        with self._lock:
+            return {
+                'lines': self.size,
+                'games': len(self.games),
+                'players': len(self.players),
+                'bytes': int(sum(a.nbytes for a in self.columns.values())
+                             + self.player.nbytes + self.team.nbytes + self.game.nbytes),
+            }
+
+
+def main():
+    """Load a box score cache, optionally replicated to a season's size, and time some queries"""
+    import copy
+    import shutil
+    import tempfile
+
+    from nba_boxscore_safe import NBABoxScoreClient
+
+    parser = argparse.ArgumentParser(description='Time PlayerLineStore queries over a box score cache')
+    parser.add_argument('--cache-dir', default='./boxscore_cache')
+    parser.add_argument('--replicate', type=int, default=1, help='Copies of every game (9 x 137 games ~ one season)')
+    args = parser.parse_args()
+
+    if os.path.exists(os.path.join(args.cache_dir, 'index.db')):
+        source = NBABoxScoreClient(cache_dir=args.cache_dir)
+    else:
+        # An old-format cache: read a converted copy so the source is left alone
+        work = tempfile.mkdtemp(prefix='player_lines_')
+        shutil.copytree(args.cache_dir, work, dirs_exist_ok=True)
+        source = NBABoxScoreClient(cache_dir=work)
+        source.migrate_legacy_cache()
+
+    canonicals = []
+    for game_id, _ in source.cached_games():
+        canonicals.append(canonical_boxscore(source.build_player_stats(game_id, source._load_from_cache(game_id, any_age=True))))
+
+    store = PlayerLineStore()
+    start = time.perf_counter()
+    for copy_number in range(args.replicate):
+        for canonical in canonicals:
+            canonical = copy.copy(canonical)
+            canonical['game'] = dict(canonical['game'], game_id=f"{canonical['game']['game_id']}-{copy_number}")
+            store.add(canonical)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"store: {store.status()} loaded in {load_ms:.0f} ms")
+
+    player_id = store.players.ids[0]
+    queries = {
+        'plus_minus avg, last 10 games': lambda: store.leaders('plus_minus', 'avg', last_games=10, min_games=5),
+        'points sum, top 10': lambda: store.leaders('points', 'sum'),
+        'fg_pct, min 20 games': lambda: store.leaders('fg_pct', min_games=20),
+        'one team, assists avg': lambda: store.leaders('assists', team_id=store.teams.ids[0]),
+        'player summary, last 10': lambda: store.player_summary(player_id, last_games=10),
+    }
+    for name, query in queries.items():
+        samples = []
+        for _ in range(20):
+            begin = time.perf_counter()
+            query()
+            samples.append(time.perf_counter() - begin)
+        print(f"{name:32s} median {sorted(samples)[len(samples) // 2] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
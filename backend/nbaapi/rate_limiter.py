@@ -0,0 +1,211 @@
+"""
+Sliding-window rate limiting for the NBA API servers
+
+Each client keeps two counters: requests in the current fixed window and in
+the previous one. The previous window's count is weighted by how much of it
+still overlaps the sliding window, so a check is O(1) no matter how many
+requests the client has made.
+
+Memory is bounded: clients live in an LRU and anyone idle for two windows is
+evicted (their counters would read as zero anyway). Set NBA_RATE_LIMIT_DB to
+a SQLite path to share counters between worker processes; each limiter counts
+under its own namespace there, so apps with different limits never share counts.
+"""
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Shared counter store for multi-process deployments (unset = per-process memory)
+RATE_LIMIT_DB = os.environ.get('NBA_RATE_LIMIT_DB')
+
+
+class RateLimitResult:
+    """Outcome of one rate limit check"""
+
+    __slots__ = ('allowed', 'limit', 'remaining', 'reset', 'retry_after')
+
+    def __init__(self, allowed: bool, limit: int, remaining: int, reset: float, retry_after: float):
+        self.allowed = allowed
+        self.limit = limit
+        self.remaining = remaining
+        self.reset = reset
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        """X-RateLimit-* headers describing this result"""
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(math.ceil(self.reset)),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(max(1, math.ceil(self.retry_after)))
+        return headers
+
+
+class SlidingWindowLimiter:
+    """In-process sliding-window counter limiter"""
+
+    def __init__(self, limit: int = 100, window: int = 60, max_clients: int = 10000):
+        """
+        Args:
+            limit: Requests allowed per window
+            window: Window length in seconds
+            max_clients: Most clients tracked at once before the least recent is dropped
+        """
+        self.limit = limit
+        self.window = window
+        self.max_clients = max_clients
+        self._clients = OrderedDict()  # key -> [window_index, current, previous]
+        self._lock = threading.Lock()
+
+    def hit(self, key: str, now: Optional[float] = None) -> RateLimitResult:
+        """Count one request for `key` if it is within the limit"""
+        now = time.time() if now is None else now
+        index = int(now // self.window)
+
+        with self._lock:
+            state = self._clients.get(key)
+            if state is None:
+                state = [index, 0, 0]
+                self._clients[key] = state
+            else:
+                self._clients.move_to_end(key)
+            state[0], state[1], state[2] = self._roll(state, index)
+            result = self._decide(state, now, index)
+            self._evict(index)
+        return result
+
+    def _roll(self, state, index: int):
+        """Shift the counters forward to the window containing `index`"""
+        stored_index, current, previous = state
+        if stored_index == index:
+            return index, current, previous
+        if stored_index == index - 1:
+            return index, 0, current
+        return index, 0, 0
+
+    def _decide(self, state, now: float, index: int) -> RateLimitResult:
+        window_start = index * self.window
+        elapsed = now - window_start
+        weight = 1 - elapsed / self.window
+        current, previous = state[1], state[2]
+        estimated = previous * weight + current
+
+        if estimated + 1 > self.limit:
+            return RateLimitResult(False, self.limit, 0, self.window - elapsed,
+                                   self._retry_after(current, previous, elapsed))
+
+        state[1] = current + 1
+        remaining = max(0, int(self.limit - estimated - 1))
+        return RateLimitResult(True, self.limit, remaining, self.window - elapsed, 0)
+
+    def _retry_after(self, current: int, previous: int, elapsed: float) -> float:
+        """Seconds until one more request would fit in the sliding window"""
+        room = self.limit - 1 - current
+        if room >= 0 and previous > 0:
+            # previous * (1 - t / window) + current <= limit - 1
+            return max(0.0, self.window * (1 - room / previous) - elapsed)
+        # The current window alone is full; it becomes the weighted previous one next
+        room = self.limit - 1
+        until_next = self.window - elapsed
+        if current > 0 and room < current:
+            return until_next + self.window * (1 - room / current)
+        return until_next
+
+    def _evict(self, index: int):
+        """Drop clients idle for two windows, then enforce the size bound"""
+        clients = self._clients
+        while clients:
+            key, state = next(iter(clients.items()))
+            if state[0] >= index - 1 and len(clients) <= self.max_clients:
+                break
+            clients.popitem(last=False)
+
+    def __len__(self):
+        return len(self._clients)
+
+
+class SQLiteRateLimiter(SlidingWindowLimiter):
+    """Sliding-window limiter whose counters live in a shared SQLite database"""
+
+    def __init__(self, db_path: str, limit: int = 100, window: int = 60, prune_every: int = 1000,
+                 namespace: str = 'default'):
+        """
+        Args:
+            db_path: SQLite file shared by every worker process
+            limit: Requests allowed per window
+            window: Window length in seconds
+            prune_every: Delete idle clients after this many checks in a process
+            namespace: Prefix of this limiter's client keys; limiters sharing one counts together
+        """
+        super().__init__(limit=limit, window=window)
+        self.db_path = db_path
+        self.prune_every = prune_every
+        self.namespace = namespace
+        self._local = threading.local()
+        self._hits = 0
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS rate_limits (
+                client TEXT PRIMARY KEY,
+                window_index INTEGER NOT NULL,
+                current INTEGER NOT NULL,
+                previous INTEGER NOT NULL
+            )
+        ''')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def hit(self, key: str, now: Optional[float] = None) -> RateLimitResult:
+        now = time.time() if now is None else now
+        index = int(now // self.window)
+        conn = self._connection()
+        key = f"{self.namespace}:{key}"
+
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT window_index, current, previous FROM rate_limits WHERE client = ?',
+                               (key,)).fetchone()
+            state = list(self._roll(row, index)) if row else [index, 0, 0]
+            result = self._decide(state, now, index)
+            conn.execute('''
+                INSERT INTO rate_limits (client, window_index, current, previous) VALUES (?, ?, ?, ?)
+                ON CONFLICT(client) DO UPDATE SET
+                    window_index = excluded.window_index,
+                    current = excluded.current,
+                    previous = excluded.previous
+            ''', (key, state[0], state[1], state[2]))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        self._hits += 1
+        if self._hits % self.prune_every == 0:
+            conn.execute('DELETE FROM rate_limits WHERE window_index < ?', (index - 1,))
+        return result
+
+    def __len__(self):
+        return self._connection().execute('SELECT COUNT(*) FROM rate_limits WHERE client LIKE ?',
+                                          (f"{self.namespace}:%",)).fetchone()[0]
+
+
+def create_rate_limiter(limit: int = 100, window: int = 60, db_path: Optional[str] = RATE_LIMIT_DB,
+                        namespace: str = 'default') -> SlidingWindowLimiter:
+    """Shared SQLite limiter (counting under `namespace`) when a database path is configured, in-process otherwise"""
+    if db_path:
+        return SQLiteRateLimiter(db_path, limit=limit, window=window, namespace=namespace)
+    return SlidingWindowLimiter(limit=limit, window=window)
@@ -0,0 +1,162 @@
+"""
+Cross-process cache tier for running games.py under several workers
+
+Values live in one SQLite database in WAL mode, so a frame fetched by any
+worker is visible to all of them, readers never block the writer, and a
+reader can never see a half-written entry the way it can with a pickle file
+that is still being written.
+
+A small settings table holds switches every worker must agree on, such as
+the manual offline switch (offline.py).
+
+fill_lock() gives single-flight across processes: the first worker to miss a
+key takes an exclusive file lock and fetches; the others wait on the lock and
+then find the value already stored.
+"""
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+MISS = object()
+
+
+class SharedCache:
+    """Pickled values in a WAL-mode SQLite table, keyed by cache key"""
+
+    def __init__(self, db_path: str, lock_timeout: float = 60):
+        """
+        Args:
+            db_path: SQLite file shared by every worker process
+            lock_timeout: Longest a worker waits for another worker's fetch before fetching itself
+        """
+        self.db_path = db_path
+        self.lock_dir = f"{db_path}.locks"
+        self.lock_timeout = lock_timeout
+        self._local = threading.local()
+        self._thread_locks = {}
+        self._thread_locks_guard = threading.Lock()
+        os.makedirs(self.lock_dir, exist_ok=True)
+
+        conn = self._connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                stored_at REAL NOT NULL,
+                data BLOB NOT NULL
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS settings (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            )
+        ''')
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str, max_age: float = None):
+        """Value stored under `key` if younger than `max_age` seconds (any age if None), else MISS"""
+        entry = self.get_entry(key, max_age)
+        return entry if entry is MISS else entry[0]
+
+    def get_entry(self, key: str, max_age: float = None):
+        """(value, stored_at) for `key` under the same rules as get(), else MISS"""
+        row = self._connection().execute(
+            'SELECT stored_at, data FROM cache WHERE key = ?', (key,)
+        ).fetchone()
+        if row is None:
+            return MISS
+        stored_at, blob = row
+        if max_age is not None and time.time() - stored_at >= max_age:
+            return MISS
+        try:
+            return pickle.loads(blob), stored_at
+        except Exception:
+            self.delete(key)
+            return MISS
+
+    def age(self, key: str):
+        """Seconds since `key` was stored, or None if it is not stored"""
+        row = self._connection().execute('SELECT stored_at FROM cache WHERE key = ?', (key,)).fetchone()
+        return None if row is None else time.time() - row[0]
+
+    def set(self, key: str, data):
+        blob = pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+        self._connection().execute(
+            'INSERT OR REPLACE INTO cache (key, stored_at, data) VALUES (?, ?, ?)',
+            (key, time.time(), sqlite3.Binary(blob))
+        )
+
+    def delete(self, key: str):
+        self._connection().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connection().execute('DELETE FROM cache')
+
+    def get_setting(self, name: str):
+        """A shared setting's value, or None if it was never set"""
+        row = self._connection().execute('SELECT value FROM settings WHERE name = ?', (name,)).fetchone()
+        return None if row is None else row[0]
+
+    def set_setting(self, name: str, value: str):
+        self._connection().execute(
+            'INSERT OR REPLACE INTO settings (name, value, updated_at) VALUES (?, ?, ?)',
+            (name, value, time.time())
+        )
+
+    def _thread_lock(self, key: str) -> threading.Lock:
+        with self._thread_locks_guard:
+            return self._thread_locks.setdefault(key, threading.Lock())
+
+    @contextmanager
+    def fill_lock(self, key: str):
+        """
+        Hold the fetch lock for `key` across threads and processes.
+        Gives up waiting after lock_timeout so a hung fetch elsewhere cannot stall this worker.
+        """
+        thread_lock = self._thread_lock(key)
+        if not thread_lock.acquire(timeout=self.lock_timeout):
+            yield
+            return
+        try:
+            if fcntl is None:
+                yield
+                return
+
+            lock_name = hashlib.sha1(key.encode('utf-8')).hexdigest()
+            with open(os.path.join(self.lock_dir, f"{lock_name}.lock"), 'w') as lock_file:
+                deadline = time.time() + self.lock_timeout
+                locked = False
+                while True:
+                    try:
+                        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                        locked = True
+                        break
+                    except BlockingIOError:
+                        if time.time() >= deadline:
+                            break
+                        time.sleep(0.05)
+                try:
+                    yield
+                finally:
+                    if locked:
+                        fcntl.flock(lock_file, fcntl.LOCK_UN)
+        finally:
+            thread_lock.release()
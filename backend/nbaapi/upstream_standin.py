@@ -0,0 +1,381 @@
+"""
+Record/replay stand-in for the upstreams the scrapers and APIs call
+
+One local HTTP server fronts all three upstreams under a path prefix:
+
+    /rotowire/...   -> https://www.rotowire.com/...   (ROTOWIRE_BASE_URL)
+    /nba-stats/...  -> https://stats.nba.com/...      (NBA_STATS_BASE_URL)
+    /nba-cdn/...    -> https://cdn.nba.com/...        (NBA_CDN_BASE_URL)
+
+Point a client at it by setting the env var on the right to
+http://127.0.0.1:<port>/<prefix>.
+
+In record mode every request is forwarded to the real upstream and the
+response is written to the cassette directory (one JSON file per distinct
+method + URL + query). In replay mode responses come only from the cassette,
+so benchmarks run offline and deterministically. Either way the stand-in can
+add latency and inject 500s and 429s at configurable rates.
+
+Usage:
+    python upstream_standin.py --mode record --cassette cassettes/
+    python upstream_standin.py --mode replay --cassette cassettes/ --latency 0.2 --error-rate 0.05
+"""
+import argparse
+import base64
+import glob
+import gzip
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+
+UPSTREAMS = {
+    'rotowire': 'https://www.rotowire.com',
+    'nba-stats': 'https://stats.nba.com',
+    'nba-cdn': 'https://cdn.nba.com',
+}
+
+# Headers that describe one hop, not the resource
+HOP_HEADERS = {'host', 'connection', 'keep-alive', 'transfer-encoding', 'te', 'trailers',
+               'upgrade', 'proxy-authorization', 'proxy-authenticate', 'accept-encoding',
+               'content-encoding', 'content-length'}
+
+BOXSCORE_PATH = re.compile(r'^/static/json/liveData/boxscore/boxscore_(?P<game_id>\d{10})\.json$')
+
+
+def cassette_key(method: str, upstream: str, path: str, query: str) -> str:
+    """Stable name for a request: query parameters are sorted so their order does not matter"""
+    normalized = urlencode(sorted(parse_qsl(query, keep_blank_values=True)))
+    raw = f"{method} {upstream} {path}?{normalized}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+class Cassette:
+    """Directory of recorded responses"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key: str) -> Optional[Dict]:
+        try:
+            with open(self._path(key), 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get('body_base64'):
+            entry['body'] = base64.b64decode(entry['body_base64'])
+        else:
+            entry['body'] = entry.get('body_text', '').encode('utf-8')
+        return entry
+
+    def save(self, key: str, request_line: str, status: int, headers: Dict[str, str], body: bytes):
+        entry = {'request': request_line, 'status': status, 'headers': headers}
+        try:
+            entry['body_text'] = body.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_base64'] = base64.b64encode(body).decode('ascii')
+        with self._lock:
+            tmp_path = self._path(key) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+
+    def __len__(self):
+        return len(glob.glob(os.path.join(self.directory, '*.json')))
+
+
+class UpstreamStandIn:
+    """Stand-in server state: mode, fault injection settings and counters"""
+
+    def __init__(self, cassette_dir: str, mode: str = 'replay', latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0, upstreams: Dict[str, str] = None,
+                 seed: Optional[int] = None):
+        """
+        Args:
+            cassette_dir: Where recorded responses are read from / written to
+            mode: 'record' (forward and save) or 'replay' (cassette only)
+            latency: Seconds added before every response
+            jitter: Extra uniform random delay of up to this many seconds
+            error_rate: Fraction of requests answered with a 500
+            rate_limit_rate: Fraction of requests answered with a 429
+            upstreams: Prefix -> origin overrides for record mode
+            seed: Random seed for reproducible fault injection
+        """
+        self.cassette = Cassette(cassette_dir)
+        self.mode = mode
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.upstreams = dict(UPSTREAMS, **(upstreams or {}))
+        self.random = random.Random(seed)
+        self.session = requests.Session()
+        self.boxscore_templates: List[Dict] = []
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'in_flight': 0,
+            'peak_in_flight': 0,
+            'replayed': 0,
+            'recorded': 0,
+            'missing': 0,
+            'injected_errors': 0,
+            'injected_429s': 0,
+        }
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def synthesize_boxscores(self, documents: List[Dict]):
+        """
+        Answer any cdn box score URL missing from the cassette with one of
+        `documents`, its gameId rewritten. Lets load tests request an unlimited
+        number of distinct, uncached games.
+        """
+        self.boxscore_templates = documents
+
+    def _count(self, name: str, delta: int = 1):
+        with self._lock:
+            self.stats[name] += delta
+            if name == 'in_flight':
+                self.stats['peak_in_flight'] = max(self.stats['peak_in_flight'], self.stats['in_flight'])
+
+    def _fault(self) -> Optional[int]:
+        with self._lock:
+            roll = self.random.random()
+        if roll < self.rate_limit_rate:
+            self._count('injected_429s')
+            return 429
+        if roll < self.rate_limit_rate + self.error_rate:
+            self._count('injected_errors')
+            return 500
+        return None
+
+    def _delay(self):
+        delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self.random.uniform(0, self.jitter)
+        if delay:
+            time.sleep(delay)
+
+    def handle(self, method: str, raw_path: str, headers: Dict[str, str], body: bytes):
+        """Return (status, headers, body) for one request"""
+        parts = urlsplit(raw_path)
+        prefix, _, rest = parts.path.lstrip('/').partition('/')
+        path = '/' + rest
+
+        if prefix == '__standin__':
+            return self._control(method, path, body)
+        if prefix not in self.upstreams:
+            return 404, {'Content-Type': 'text/plain'}, f"Unknown upstream prefix '{prefix}'".encode('utf-8')
+
+        self._count('requests')
+        self._count('in_flight')
+        try:
+            self._delay()
+            fault = self._fault()
+            if fault == 429:
+                return 429, {'Content-Type': 'application/json', 'Retry-After': '5'}, b'{"message": "Too Many Requests"}'
+            if fault == 500:
+                return 500, {'Content-Type': 'application/json'}, b'{"message": "An error has occurred."}'
+
+            key = cassette_key(method, prefix, path, parts.query)
+            if self.mode == 'record':
+                status, response_headers, content = self._record(key, method, prefix, path, parts.query, headers, body)
+            else:
+                status, response_headers, content = self._replay(key, prefix, path)
+            return status, self._rewrite_location(response_headers, prefix, headers.get('Host')), content
+        finally:
+            self._count('in_flight', -1)
+
+    def _rewrite_location(self, headers: Dict[str, str], prefix: str, host: Optional[str]) -> Dict[str, str]:
+        """Keep redirects on the stand-in so clients that follow them never reach the real upstream"""
+        headers = dict(headers)
+        for name in [k for k in headers if k.lower() == 'location']:
+            location = headers[name]
+            for origin in (self.upstreams[prefix], UPSTREAMS[prefix]):
+                if location.startswith(origin):
+                    location = location[len(origin):]
+                    break
+            if location.startswith('/'):
+                headers[name] = f"http://{host}/{prefix}{location}" if host else f"/{prefix}{location}"
+        return headers
+
+    def _replay(self, key: str, prefix: str, path: str):
+        entry = self.cassette.load(key)
+        if entry is not None:
+            self._count('replayed')
+            return entry['status'], entry['headers'], entry['body']
+
+        match = BOXSCORE_PATH.match(path)
+        if prefix == 'nba-cdn' and match and self.boxscore_templates:
+            game_id = match.group('game_id')
+            doc = self.boxscore_templates[int(game_id[-5:]) % len(self.boxscore_templates)]
+            doc = dict(doc, game=dict(doc['game'], gameId=game_id))
+            self._count('replayed')
+            return 200, {'Content-Type': 'application/json'}, json.dumps(doc).encode('utf-8')
+
+        self._count('missing')
+        return 404, {'Content-Type': 'application/json'}, b'{"message": "Not in cassette"}'
+
+    def _record(self, key: str, method: str, prefix: str, path: str, query: str, headers: Dict[str, str], body: bytes):
+        url = f"{self.upstreams[prefix]}{path}" + (f"?{query}" if query else '')
+        forward = {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS}
+        try:
+            # Redirects are recorded as-is; some scrapers read the date out of the redirect target
+            response = self.session.request(method, url, headers=forward, data=body or None,
+                                            timeout=60, allow_redirects=False)
+        except requests.RequestException as e:
+            return 502, {'Content-Type': 'text/plain'}, f"Upstream error: {e}".encode('utf-8')
+
+        response_headers = {k: v for k, v in response.headers.items() if k.lower() not in HOP_HEADERS}
+        self.cassette.save(key, f"{method} {url}", response.status_code, response_headers, response.content)
+        self._count('recorded')
+        return response.status_code, response_headers, response.content
+
+    def _control(self, method: str, path: str, body: bytes):
+        """GET /__standin__/stats, POST /__standin__/config to change injection settings at runtime"""
+        if path == '/stats':
+            payload = dict(self.stats, mode=self.mode, cassette_entries=len(self.cassette))
+        elif path == '/config' and method == 'POST':
+            settings = json.loads(body or b'{}')
+            for name in ('latency', 'jitter', 'error_rate', 'rate_limit_rate'):
+                if name in settings:
+                    setattr(self, name, float(settings[name]))
+            if settings.get('mode') in ('record', 'replay'):
+                self.mode = settings['mode']
+            payload = {name: getattr(self, name) for name in ('mode', 'latency', 'jitter', 'error_rate', 'rate_limit_rate')}
+        else:
+            return 404, {'Content-Type': 'text/plain'}, b'Unknown control endpoint'
+        return 200, {'Content-Type': 'application/json'}, json.dumps(payload).encode('utf-8')
+
+    def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Serve on a background thread; returns the root URL"""
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _serve(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                status, headers, content = standin.handle(self.command, self.path, dict(self.headers), body)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+            do_GET = do_POST = do_HEAD = _serve
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return f"http://{host}:{self.server.server_address[1]}"
+
+    def stop(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def client_env(self, root_url: str) -> Dict[str, str]:
+        """Environment variables that point every client at this stand-in"""
+        return {
+            'ROTOWIRE_BASE_URL': f"{root_url}/rotowire",
+            'NBA_STATS_BASE_URL': f"{root_url}/nba-stats",
+            'NBA_CDN_BASE_URL': f"{root_url}/nba-cdn",
+        }
+
+
+def load_boxscore_corpus(cache_dir: str) -> List[Dict]:
+    """
+    Raw cdn documents from a box score client cache directory (cache metadata stripped):
+    old-format <md5>.json files and the gzipped originals under raw/
+    """
+    documents = []
+    for path in sorted(glob.glob(os.path.join(cache_dir, '*.json'))):
+        with open(path, 'r') as f:
+            doc = json.load(f)
+        doc.pop('_cache_metadata', None)
+        if 'game' in doc:
+            documents.append(doc)
+    for path in sorted(glob.glob(os.path.join(cache_dir, 'raw', '*.json.gz'))):
+        with gzip.open(path, 'rt') as f:
+            doc = json.load(f)
+        if 'game' in doc:
+            documents.append(doc)
+    return documents
+
+
+def seed_boxscores(cassette_dir: str, cache_dir: str) -> int:
+    """Write the box scores in a client cache directory into a cassette as cdn replies"""
+    cassette = Cassette(cassette_dir)
+    count = 0
+    for doc in load_boxscore_corpus(cache_dir):
+        game_id = doc['game']['gameId']
+        path = f"/static/json/liveData/boxscore/boxscore_{game_id}.json"
+        cassette.save(cassette_key('GET', 'nba-cdn', path, ''), f"GET {UPSTREAMS['nba-cdn']}{path}",
+                      200, {'Content-Type': 'application/json'}, json.dumps(doc).encode('utf-8'))
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Record/replay stand-in for Rotowire and NBA upstreams')
+    parser.add_argument('--mode', choices=['record', 'replay'], default='replay')
+    parser.add_argument('--cassette', default='cassettes')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--jitter', type=float, default=0.0)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--upstream', action='append', default=[], metavar='PREFIX=ORIGIN',
+                        help='Override an upstream origin, e.g. rotowire=http://localhost:9000')
+    parser.add_argument('--seed-boxscores', metavar='CACHE_DIR',
+                        help='Import a box score client cache into the cassette before serving')
+    parser.add_argument('--synthesize-boxscores', metavar='CACHE_DIR',
+                        help='Answer unknown box score ids from the documents in this cache directory')
+    args = parser.parse_args()
+
+    if args.seed_boxscores:
+        print(f"Seeded {seed_boxscores(args.cassette, args.seed_boxscores)} box scores into {args.cassette}")
+
+    standin = UpstreamStandIn(
+        args.cassette, mode=args.mode, latency=args.latency, jitter=args.jitter,
+        error_rate=args.error_rate, rate_limit_rate=args.rate_limit_rate, seed=args.seed,
+        upstreams=dict(item.split('=', 1) for item in args.upstream),
+    )
+    if args.synthesize_boxscores:
+        standin.synthesize_boxscores(load_boxscore_corpus(args.synthesize_boxscores))
+
+    root_url = standin.start(args.host, args.port)
+    print(f"Upstream stand-in ({args.mode}) on {root_url}, cassette {args.cassette} ({len(standin.cassette)} entries)")
+    for name, value in standin.client_env(root_url).items():
+        print(f"  export {name}={value}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        standin.stop()
+
+
+if __name__ == "__main__":
+    main()